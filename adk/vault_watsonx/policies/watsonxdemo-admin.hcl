@@ -18,7 +18,7 @@ path "sys/mounts" {
 
 # Full access to watsonxdemo application secrets
 path "kv/data/watsonxdemo/*" {
-    capabilities = ["create", "read", "update", "delete", "list"]
+    capabilities = ["create", "read", "update", "patch", "delete", "list"]
 }
 
 path "kv/metadata/watsonxdemo/*" {
@@ -28,7 +28,7 @@ path "kv/metadata/watsonxdemo/*" {
 # Admin access to group-specific secrets using group alias templating
 # This allows admins to manage secrets for their group
 path "kv/data/groups/{{identity.groups.names.vault-admins.metadata.name}}/*" {
-    capabilities = ["create", "read", "update", "delete", "list"]
+    capabilities = ["create", "read", "update", "patch", "delete", "list"]
 }
 
 path "kv/metadata/groups/{{identity.groups.names.vault-admins.metadata.name}}/*" {
@@ -37,7 +37,7 @@ path "kv/metadata/groups/{{identity.groups.names.vault-admins.metadata.name}}/*"
 
 # Allow admins to manage configuration and shared secrets
 path "kv/data/config/*" {
-    capabilities = ["create", "read", "update", "delete", "list"]
+    capabilities = ["create", "read", "update", "patch", "delete", "list"]
 }
 
 path "kv/metadata/config/*" {
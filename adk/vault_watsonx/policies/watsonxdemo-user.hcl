@@ -32,7 +32,7 @@ path "kv/metadata/watsonxdemo/admin/*" {
 # Group-specific secrets using group alias templating
 # Users can read/write secrets for their specific group
 path "kv/data/groups/{{identity.groups.names.vault-users.metadata.name}}/*" {
-    capabilities = ["create", "read", "update", "delete"]
+    capabilities = ["create", "read", "update", "patch", "delete"]
 }
 
 path "kv/metadata/groups/{{identity.groups.names.vault-users.metadata.name}}/*" {
@@ -41,7 +41,7 @@ path "kv/metadata/groups/{{identity.groups.names.vault-users.metadata.name}}/*"
 
 # Personal user workspace using user identity
 path "kv/data/users/{{identity.entity.name}}/*" {
-    capabilities = ["create", "read", "update", "delete"]
+    capabilities = ["create", "read", "update", "patch", "delete"]
 }
 
 path "kv/metadata/users/{{identity.entity.name}}/*" {
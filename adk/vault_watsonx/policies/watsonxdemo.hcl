@@ -12,6 +12,12 @@ path "auth/token/renew-self" {
     capabilities = ["update"]
 }
 
+# Allow revoking the watsonxdemo database credential leases by lease id
+# (used by LeaseManager)
+path "sys/leases/revoke/database/creds/watsonxdemo/*" {
+    capabilities = ["update"]
+}
+
 # Allow listing mounted secret engines (used by _debug_available_mounts)
 path "sys/mounts" {
     capabilities = ["read"]
@@ -28,17 +34,17 @@ path "kv/metadata" {
 }
 
 path "kv/data/watsonxdemo" {
-    capabilities = ["create", "read", "update", "delete", "list"]
+    capabilities = ["create", "read", "update", "patch", "delete", "list"]
 }
 
 # KV-v2 secrets engine access using entity templating for tenant isolation
 # Each entity can only access secrets under their own path
 path "kv/data/{{identity.entity.name}}" {
-    capabilities = ["create", "read", "update", "delete"]
+    capabilities = ["create", "read", "update", "patch", "delete"]
 }
 
 path "kv/data/{{identity.entity.name}}/*" {
-    capabilities = ["create", "read", "update", "delete"]
+    capabilities = ["create", "read", "update", "patch", "delete"]
 }
 
 path "kv/metadata/{{identity.entity.name}}" {
@@ -0,0 +1,17 @@
+#!/usr/bin/env python3
+"""
+Import path setup for the modules in this directory
+
+tools/vault_transport.py is shipped next to the Orchestrate tools, which
+import it with tools/ as their package root. Importing this module once
+makes it importable from here too, so no other module edits sys.path.
+"""
+
+import os
+import sys
+
+TEST_DIR = os.path.abspath(os.path.dirname(__file__))
+TOOLS_DIR = os.path.abspath(os.path.join(TEST_DIR, '..', '..', '..', 'tools'))
+
+if TOOLS_DIR not in sys.path:
+    sys.path.append(TOOLS_DIR)
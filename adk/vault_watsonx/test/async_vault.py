@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+Asynchronous HashiCorp Vault client
+
+An asyncio counterpart of VaultAppRoleAuth built on an httpx connection
+pool, so a single event loop can serve many concurrent tool calls without
+a thread per request. It supports:
+- AppRole and JWT login
+- KV v1/v2 read and write (with the same mount discovery as VaultAppRoleAuth)
+- Token renewal and lookup_self
+
+Requirements:
+- httpx library (pip install httpx)
+"""
+
+import asyncio
+import time
+import logging
+from typing import Optional, Dict, Any, List, Tuple
+
+import httpx
+import hvac
+
+from secret_cache import SecretCache
+from kv_mounts import KV_MOUNT_POINTS, KV_STRATEGIES, MOUNT_UNKNOWN
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncVaultAppRoleAuth:
+    """Asynchronous HashiCorp Vault client with AppRole and JWT authentication"""
+
+    def __init__(
+        self,
+        vault_url: str,
+        namespace: str,
+        role_id: Optional[str] = None,
+        secret_id: Optional[str] = None,
+        verify_ssl: bool = True,
+        mount_cache_ttl: float = 300,
+        secret_cache: Optional[SecretCache] = None,
+        max_connections: int = 100,
+        timeout: float = 30
+    ):
+        """
+        Initialize the async Vault client
+
+        Args:
+            vault_url: Vault server URL (e.g., https://vault.example.com:8200)
+            namespace: Vault namespace
+            role_id: AppRole role ID (not needed for JWT login)
+            secret_id: AppRole secret ID (not needed for JWT login)
+            verify_ssl: Whether to verify SSL certificates
+            mount_cache_ttl: Seconds a resolved mount/KV version is reused
+            secret_cache: Optional read-through cache for read_secret()
+            max_connections: Size of the HTTP connection pool
+            timeout: Request timeout in seconds
+        """
+        self.vault_url = vault_url.rstrip('/')
+        self.namespace = namespace
+        self.role_id = role_id
+        self.secret_id = secret_id
+        self.token = None
+        self.mount_cache_ttl = mount_cache_ttl
+        self.secret_cache = secret_cache
+        self._mount_versions: Dict[str, Tuple[Any, float]] = {}
+        self._prefix_mounts: Dict[str, Tuple[str, Optional[int], float]] = {}
+        self._mount_discovery: Dict[str, "asyncio.Task"] = {}
+        self.http = httpx.AsyncClient(
+            base_url=f"{self.vault_url}/v1/",
+            verify=verify_ssl,
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections
+            )
+        )
+
+    async def __aenter__(self) -> "AsyncVaultAppRoleAuth":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        """Close the underlying connection pool"""
+        await self.http.aclose()
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        json: Optional[Dict[str, Any]] = None,
+        authenticated: bool = True
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Send a request to the Vault HTTP API
+
+        Args:
+            method: HTTP method
+            path: API path relative to /v1/ (e.g., 'kv/data/myapp/config')
+            json: Optional JSON body
+            authenticated: Whether to send the client token
+
+        Returns:
+            The decoded JSON response, or None for an empty response
+
+        Raises:
+            hvac.exceptions.VaultError: The matching hvac exception for error statuses
+        """
+        headers = {}
+        if self.namespace:
+            headers['X-Vault-Namespace'] = self.namespace
+        if authenticated and self.token:
+            headers['X-Vault-Token'] = self.token
+
+        response = await self.http.request(method, path, json=json, headers=headers)
+        if response.status_code >= 400:
+            errors = None
+            try:
+                errors = response.json().get('errors')
+            except ValueError:
+                pass
+            raise hvac.exceptions.VaultError.from_status(
+                response.status_code,
+                errors=errors,
+                method=method,
+                url=str(response.url),
+                text=response.text
+            )
+        if response.status_code == 204 or not response.content:
+            return None
+        return response.json()
+
+    async def _login(self, mount: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Log in against an auth mount and install the resulting token"""
+        response = await self._request('POST', f"auth/{mount}/login", json=payload, authenticated=False)
+        auth = response['auth']
+        self.token = auth['client_token']
+        logger.info("Token policies: %s", auth.get('policies', []))
+        logger.info("Token TTL: %s seconds", auth.get('lease_duration', 'N/A'))
+        return auth
+
+    async def authenticate(self) -> bool:
+        """
+        Authenticate with Vault using AppRole
+
+        Returns:
+            bool: True if authentication successful, False otherwise
+        """
+        try:
+            logger.info("Authenticating with AppRole...")
+            await self._login('approle', {'role_id': self.role_id, 'secret_id': self.secret_id})
+            logger.info("Successfully authenticated with Vault")
+            return True
+        except hvac.exceptions.VaultError as e:
+            logger.error("Vault error during authentication: %s", e)
+            return False
+        except Exception as e:
+            logger.error("Unexpected error during authentication: %s", e)
+            return False
+
+    async def authenticate_jwt(self, jwt: str, role: str = 'default', mount: str = 'jwt') -> bool:
+        """
+        Authenticate with Vault using a JWT
+
+        Args:
+            jwt: Signed JWT (e.g., an OAuth access token)
+            role: JWT auth role name
+            mount: JWT auth mount path
+
+        Returns:
+            bool: True if authentication successful, False otherwise
+        """
+        try:
+            logger.info("Authenticating with JWT...")
+            await self._login(mount, {'role': role, 'jwt': jwt})
+            logger.info("Successfully authenticated with Vault")
+            return True
+        except hvac.exceptions.VaultError as e:
+            logger.error("Vault error during JWT authentication: %s", e)
+            return False
+        except Exception as e:
+            logger.error("Unexpected error during JWT authentication: %s", e)
+            return False
+
+    async def lookup_self(self) -> Optional[Dict[str, Any]]:
+        """
+        Look up the current token
+
+        Returns:
+            Dict containing the token data or None if error
+        """
+        try:
+            response = await self._request('GET', 'auth/token/lookup-self')
+            return response['data']
+        except Exception as e:
+            logger.warning("Could not retrieve token info: %s", e)
+            return None
+
+    async def renew_token(self) -> bool:
+        """
+        Renew the current token
+
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        if not self.token:
+            logger.error("Not authenticated with Vault")
+            return False
+
+        try:
+            logger.info("Renewing token...")
+            await self._request('POST', 'auth/token/renew-self', json={})
+            logger.info("Token renewed successfully")
+            return True
+        except Exception as e:
+            logger.error("Error renewing token: %s", e)
+            return False
+
+    async def _mount_version(self, mount: str) -> Any:
+        """Return the KV version of a mount, discovering it once per mount_cache_ttl"""
+        cached = self._mount_versions.get(mount)
+        if cached and cached[1] > time.monotonic():
+            return cached[0]
+
+        # Concurrent readers of an undiscovered mount share one lookup
+        task = self._mount_discovery.get(mount)
+        if task is None:
+            task = asyncio.ensure_future(self._discover_mount(mount))
+            self._mount_discovery[mount] = task
+            task.add_done_callback(lambda _: self._mount_discovery.pop(mount, None))
+        return await asyncio.shield(task)
+
+    async def _discover_mount(self, mount: str) -> Any:
+        """Look up the engine type and KV version of a mount"""
+        version = MOUNT_UNKNOWN
+        try:
+            response = await self._request('GET', f"sys/internal/ui/mounts/{mount}")
+            data = (response or {}).get('data') or {}
+            if data.get('type') == 'kv':
+                version = int((data.get('options') or {}).get('version') or 1)
+            elif data.get('type'):
+                version = None
+        except Exception as e:
+            logger.debug("Could not discover mount %s/: %s", mount, e)
+
+        self._mount_versions[mount] = (version, time.monotonic() + self.mount_cache_ttl)
+        return version
+
+    async def _strategies_for(self, path: str) -> List[Tuple[str, Optional[int]]]:
+        """Build the ordered (mount point, KV version) strategies for a path"""
+        strategies = []
+        remembered = self._prefix_mounts.get(path.split('/', 1)[0])
+        if remembered and remembered[2] > time.monotonic():
+            strategies.append((remembered[0], remembered[1]))
+
+        for mount in KV_MOUNT_POINTS:
+            version = await self._mount_version(mount)
+            if version is MOUNT_UNKNOWN:
+                candidates = [s for s in KV_STRATEGIES if s[0] == mount]
+            else:
+                candidates = [(mount, version)]
+            strategies.extend(s for s in candidates if s not in strategies)
+        return strategies
+
+    def _remember_mount(self, path: str, mount: str, version: Optional[int]):
+        """Remember the strategy that served a path for its prefix"""
+        self._prefix_mounts[path.split('/', 1)[0]] = (
+            mount, version, time.monotonic() + self.mount_cache_ttl
+        )
+
+    async def read_secret(self, path: str) -> Optional[Dict[str, Any]]:
+        """
+        Read a secret from Vault
+
+        Args:
+            path: Secret path (e.g., 'myapp/config')
+
+        Returns:
+            Dict containing secret data or None if error
+        """
+        if self.secret_cache:
+            secret = self.secret_cache.get(path)
+            if secret is not None:
+                return secret
+
+        if not self.token:
+            logger.error("Not authenticated with Vault")
+            return None
+
+        # A write that lands while the read is in flight keeps its result out of the cache
+        generation = self.secret_cache.generation(path) if self.secret_cache else None
+        for i, (mount, version) in enumerate(await self._strategies_for(path)):
+            api_path = f"{mount}/data/{path}" if version == 2 else f"{mount}/{path}"
+            try:
+                logger.info("Reading secret from path: %s/%s (attempt %d)", mount, path, i + 1)
+                response = await self._request('GET', api_path)
+            except hvac.exceptions.InvalidPath:
+                logger.debug("Path not found with attempt %d", i + 1)
+                continue
+            except hvac.exceptions.Forbidden as e:
+                logger.debug("Permission denied with attempt %d: %s", i + 1, e)
+                continue
+            except Exception as e:
+                logger.debug("Error with attempt %d: %s", i + 1, e)
+                continue
+
+            data = (response or {}).get('data')
+            if data is None:
+                continue
+            secret = data['data'] if version == 2 else data
+            self._remember_mount(path, mount, version)
+            if self.secret_cache:
+                ttl = self.secret_cache.default_ttl
+                if response.get('lease_duration'):
+                    ttl = min(ttl, response['lease_duration'])
+                metadata = data.get('metadata') if version == 2 else None
+                self.secret_cache.put(path, secret, ttl=ttl, version=(metadata or {}).get('version'),
+                                      generation=generation)
+            return secret
+
+        logger.error("Secret not found at path: %s (tried all methods)", path)
+        return None
+
+    async def write_secret(self, path: str, secret: Dict[str, Any]) -> bool:
+        """
+        Write a secret to Vault
+
+        Args:
+            path: Secret path (e.g., 'myapp/config')
+            secret: Dictionary containing secret data
+
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        if not self.token:
+            logger.error("Not authenticated with Vault")
+            return False
+
+        for i, (mount, version) in enumerate(await self._strategies_for(path)):
+            if version == 2:
+                api_path, body = f"{mount}/data/{path}", {'data': secret}
+            else:
+                api_path, body = f"{mount}/{path}", secret
+            try:
+                logger.info("Writing secret to path: %s/%s (attempt %d)", mount, path, i + 1)
+                await self._request('POST', api_path, json=body)
+            except hvac.exceptions.Forbidden as e:
+                logger.debug("Permission denied with attempt %d: %s", i + 1, e)
+                continue
+            except Exception as e:
+                logger.debug("Error with attempt %d: %s", i + 1, e)
+                continue
+
+            logger.info("Secret written successfully using method %d", i + 1)
+            self._remember_mount(path, mount, version)
+            if self.secret_cache:
+                self.secret_cache.invalidate(path)
+            return True
+
+        logger.error("Failed to write secret to path: %s (tried all methods)", path)
+        return False
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Vault client benchmark against a local stand-in server
+
+Starts fake_vault.py in-process, then drives VaultAppRoleAuth and the
+helpers from tools/vault_tool.py at several concurrency levels. For every
+scenario it reports p50/p95/p99 latency, throughput and the number of
+upstream Vault requests per logical operation, which makes the cost of
+the KV fallback cascade and of per-call logins visible.
+
+Usage:
+    python benchmark.py --latency-ms 2 --ops 200 --concurrency 1 8 32
+"""
+
+import argparse
+import logging
+import math
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, NamedTuple, Optional
+
+import _paths  # noqa: F401
+from fake_vault import FakeVault, start_server
+
+
+class Scenario(NamedTuple):
+    """A named logical operation, plus an optional per-level setup hook"""
+    name: str
+    operation: Callable[[], object]
+    setup: Optional[Callable[[], None]] = None
+
+
+class Result(NamedTuple):
+    """Benchmark measurements for one scenario at one concurrency level"""
+    scenario: str
+    concurrency: int
+    ops: int
+    p50: float
+    p95: float
+    p99: float
+    throughput: float
+    upstream_per_op: float
+    errors: int
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def run_scenario(vault: FakeVault, scenario: Scenario, concurrency: int, ops: int) -> Result:
+    """
+    Run a scenario ops times with the given number of concurrent workers
+
+    Args:
+        vault: Fake Vault state, used to count upstream requests
+        scenario: Scenario to run
+        concurrency: Number of worker threads
+        ops: Number of operations to run
+
+    Returns:
+        Result with latency percentiles (ms), throughput (ops/s) and upstream requests per op
+    """
+    if scenario.setup:
+        scenario.setup()
+    latencies: List[float] = []
+    errors = 0
+
+    def timed():
+        start = time.perf_counter()
+        try:
+            ok = scenario.operation() not in (None, False)
+        except Exception:
+            ok = False
+        return time.perf_counter() - start, ok
+
+    vault.reset_counts()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for latency, ok in executor.map(lambda _: timed(), range(ops)):
+            latencies.append(latency * 1000)
+            errors += not ok
+    elapsed = time.perf_counter() - started
+    upstream = vault.total_requests()
+
+    latencies.sort()
+    return Result(
+        scenario=scenario.name,
+        concurrency=concurrency,
+        ops=ops,
+        p50=percentile(latencies, 50),
+        p95=percentile(latencies, 95),
+        p99=percentile(latencies, 99),
+        throughput=ops / elapsed if elapsed else 0.0,
+        upstream_per_op=upstream / ops,
+        errors=errors,
+    )
+
+
+def build_scenarios(url: str) -> List[Scenario]:
+    """Build the benchmark scenarios against a fake Vault at url"""
+    from test_approle import VaultAppRoleAuth
+
+    vault_client = VaultAppRoleAuth(url, '', 'bench-role', 'bench-secret', max_concurrency=64)
+    vault_client.authenticate()
+
+    scenarios = [
+        Scenario('VaultAppRoleAuth.authenticate', lambda: VaultAppRoleAuth(
+            url, '', 'bench-role', 'bench-secret').authenticate()),
+        Scenario('read_secret kv v2', lambda: vault_client.read_secret('watsonxdemo/shared/config')),
+        Scenario('read_secret kv v1 (secret/)', lambda: vault_client.read_secret('legacy/config')),
+        Scenario('read_secret missing', lambda: vault_client.read_secret('watsonxdemo/missing')),
+        Scenario('write_secret kv v2', lambda: vault_client.write_secret(
+            'watsonxdemo/shared/bench', {'value': 'x'})),
+    ]
+
+    # tools/vault_tool.py needs ibm_watsonx_orchestrate; skip its scenarios without it
+    os.environ['VAULT_ADDR'] = url
+    try:
+        import vault_tool
+    except ImportError as e:
+        print(f"Skipping tools/vault_tool.py scenarios: {e}", file=sys.stderr)
+        return scenarios
+
+    def per_call_login():
+        client = vault_tool.initialize_client()
+        return vault_tool.authenticate_approle(client, 'bench-role', 'bench-secret')
+
+    def message_tool_flow():
+        client = vault_tool.initialize_client()
+        return vault_tool.get_approle_token(client, 'bench-role', 'bench-secret')
+
+    scenarios[:0] = [
+        Scenario('authenticate_approle (per call)', per_call_login),
+        Scenario('message_tool flow (cached token)', message_tool_flow,
+                 setup=vault_tool._token_cache.clear),
+    ]
+    return scenarios
+
+
+def print_results(results: List[Result]):
+    """Print results as an aligned table"""
+    header = (f"{'scenario':<36} {'conc':>5} {'ops':>6} {'p50 ms':>8} {'p95 ms':>8} "
+              f"{'p99 ms':>8} {'ops/s':>9} {'upstream/op':>12} {'errors':>7}")
+    print(header)
+    print('-' * len(header))
+    for r in results:
+        print(f"{r.scenario:<36} {r.concurrency:>5} {r.ops:>6} {r.p50:>8.2f} {r.p95:>8.2f} "
+              f"{r.p99:>8.2f} {r.throughput:>9.1f} {r.upstream_per_op:>12.2f} {r.errors:>7}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Vault helpers against a fake Vault")
+    parser.add_argument('--latency-ms', type=float, default=2.0, help="latency injected per Vault request")
+    parser.add_argument('--jitter-ms', type=float, default=0.0, help="maximum random extra latency")
+    parser.add_argument('--ops', type=int, default=200, help="operations per scenario and concurrency level")
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32])
+    parser.add_argument('--scenario', action='append', help="only run scenarios containing this text")
+    args = parser.parse_args()
+
+    # Keep per-request logging (including expected misses) out of the measurements
+    logging.disable(logging.ERROR)
+
+    vault = FakeVault(latency=args.latency_ms / 1000, jitter=args.jitter_ms / 1000)
+    server, url = start_server(vault)
+    try:
+        results = []
+        for scenario in build_scenarios(url):
+            if args.scenario and not any(s in scenario.name for s in args.scenario):
+                continue
+            for concurrency in args.concurrency:
+                results.append(run_scenario(vault, scenario, concurrency, args.ops))
+        print_results(results)
+    finally:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -3,7 +3,8 @@
 Example usage of the VaultAppRoleAuth class
 """
 
-from test_approle import VaultAppRoleAuth
+from test_approle import LOG_FORMAT, VaultAppRoleAuth
+import logging
 import os, hvac
 from dotenv import load_dotenv
 
@@ -80,7 +81,16 @@ def example_usage():
     except Exception as e:
         print(f"❌ Error writing secret to {write_path}: {e}")
     
-    # Example 3: Renew token if needed
+    # Example 3: Read several secrets concurrently
+    try:
+        result = vault.read_tree("watsonxdemo/shared")
+        print(f"📚 Retrieved {len(result.secrets)} secrets under watsonxdemo/shared")
+        for path, error in result.errors.items():
+            print(f"⚠️  {path}: {error}")
+    except Exception as e:
+        print(f"❌ Error reading secrets under watsonxdemo/shared: {e}")
+    
+    # Example 4: Renew token if needed
     try:
         if vault.renew_token():
             print("🔄 Token renewed successfully")
@@ -92,4 +102,5 @@ def example_usage():
     return True
 
 if __name__ == '__main__':
+    logging.basicConfig(level=logging.DEBUG, format=LOG_FORMAT)
     example_usage()
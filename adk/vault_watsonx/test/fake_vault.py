@@ -0,0 +1,503 @@
+#!/usr/bin/env python3
+"""
+Local stand-in Vault server for benchmarks
+
+Implements just enough of the Vault HTTP API to drive the helpers in this
+directory and in tools/:
+- AppRole and JWT login
+- KV v1 and v2 read/write (plus KV v2 metadata and LIST)
+- Token lookup-self, renew-self and revoke-self
+- Dynamic database credentials (database/creds/<role>) with lease
+  renewal and revocation through sys/leases
+- sys/mounts and sys/internal/ui/mounts
+- sys/health, reporting the role of the server (several servers sharing
+  one FakeVault state act as the nodes of a cluster)
+- transit encrypt/decrypt/rewrap with batch_input (ciphertexts are
+  reversible encodings, not real encryption)
+- an optional rate-limit quota answering 429 with Retry-After
+
+Every request can be delayed by a configurable latency, and requests are
+counted per (method, path) so callers can measure upstream round trips.
+
+Usage:
+    python fake_vault.py --port 8200 --latency-ms 5
+"""
+
+import argparse
+import base64
+import json
+import random
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Dict, Any, List, Tuple
+
+# Seed data mirroring secrets_kv.tf, plus a KV v1 secret on secret/
+DEFAULT_MOUNTS = {
+    'kv': {'version': 2, 'secrets': {
+        'watsonxdemo/admin/database': {
+            'username': 'admin_user', 'password': 'super_secret_admin_password',
+            'host': 'admin-db.internal.com', 'port': '5432', 'database': 'admin_db',
+        },
+        'watsonxdemo/admin/api-keys': {
+            'production_api_key': 'prod-api-key', 'staging_api_key': 'stage-api-key',
+        },
+        'watsonxdemo/shared/application': {
+            'app_name': 'WatsonX Demo Application', 'version': '1.0.0',
+        },
+        'watsonxdemo/shared/config': {
+            'environment': 'demo', 'region': 'us-east-1',
+        },
+    }},
+    'secret': {'version': 1, 'secrets': {
+        'legacy/config': {'endpoint': 'https://legacy.internal.com'},
+    }},
+}
+
+# sys/health status code per server role
+HEALTH_STATUS = {'active': 200, 'standby': 429, 'perfstandby': 473, 'sealed': 503}
+
+
+class FakeVault:
+    """In-memory Vault state shared by all request handler threads"""
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        token_ttl: int = 3600,
+        mounts: Optional[Dict[str, Dict[str, Any]]] = None,
+        policies: Optional[List[str]] = None,
+        lease_ttl: int = 3600,
+        lease_max_ttl: int = 86400,
+        rate_limit: Optional[float] = None
+    ):
+        """
+        Initialize the fake Vault state
+
+        Args:
+            latency: Seconds added to every request
+            jitter: Maximum extra random seconds added to every request
+            token_ttl: TTL in seconds of issued tokens
+            mounts: Mount definitions ({mount: {'version': 1|2, 'secrets': {path: data}}})
+            policies: Policies attached to issued tokens
+            lease_ttl: Default TTL in seconds of dynamic credential leases
+            lease_max_ttl: Maximum TTL in seconds a lease can be renewed to
+            rate_limit: Requests per second allowed by a rate-limit quota
+                (sys/health is exempt); None disables it
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.token_ttl = token_ttl
+        self.policies = policies or ['default', 'watsonxdemo']
+        self.lock = threading.Lock()
+        self.counts: Counter = Counter()
+        self.tokens: Dict[str, Dict[str, Any]] = {}
+        self.lease_ttl = lease_ttl
+        self.lease_max_ttl = lease_max_ttl
+        # lease_id -> {'issued': monotonic time, 'expires': monotonic time}
+        self.leases: Dict[str, Dict[str, float]] = {}
+        self.rate_limit = rate_limit
+        # transit key name -> latest version; keys are created on first use
+        self.transit_keys: Dict[str, int] = {}
+        self.throttled = 0
+        # Token bucket holding up to one second of requests
+        self._tokens = rate_limit or 0.0
+        self._refilled = time.monotonic()
+        self.mounts: Dict[str, Dict[str, Any]] = {}
+        for mount, spec in json.loads(json.dumps(mounts or DEFAULT_MOUNTS)).items():
+            self.mounts[mount] = {
+                'version': spec['version'],
+                'secrets': {
+                    path: {'data': data, 'version': 1, 'updated_time': _now()}
+                    for path, data in spec['secrets'].items()
+                },
+            }
+
+    def total_requests(self) -> int:
+        """Return the number of requests served so far"""
+        with self.lock:
+            return sum(self.counts.values())
+
+    def reset_counts(self):
+        """Reset the per-request counters"""
+        with self.lock:
+            self.counts.clear()
+
+    def issue_token(self, policies) -> Dict[str, Any]:
+        """Create a token and return the 'auth' block of a login response"""
+        token = f"hvs.fake-{uuid.uuid4().hex}"
+        with self.lock:
+            self.tokens[token] = {'policies': policies, 'issued': time.time()}
+        return {
+            'client_token': token,
+            'accessor': uuid.uuid4().hex,
+            'policies': policies,
+            'token_policies': policies,
+            'lease_duration': self.token_ttl,
+            'renewable': True,
+        }
+
+    def take_quota(self) -> bool:
+        """Consume one request from the rate-limit quota; False when exhausted"""
+        if self.rate_limit is None:
+            return True
+        with self.lock:
+            now = time.monotonic()
+            self._tokens = min(self.rate_limit, self._tokens + (now - self._refilled) * self.rate_limit)
+            self._refilled = now
+            if self._tokens < 1:
+                self.throttled += 1
+                return False
+            self._tokens -= 1
+            return True
+
+    def issue_lease(self, role: str) -> Dict[str, Any]:
+        """Create database credentials and return the read response"""
+        lease_id = f"database/creds/{role}/{uuid.uuid4().hex}"
+        now = time.monotonic()
+        with self.lock:
+            self.leases[lease_id] = {'issued': now, 'expires': now + self.lease_ttl}
+        return {
+            'lease_id': lease_id,
+            'lease_duration': self.lease_ttl,
+            'renewable': True,
+            'data': {'username': f"v-{role}-{uuid.uuid4().hex[:8]}", 'password': uuid.uuid4().hex},
+        }
+
+    def renew_lease(self, lease_id: str, increment: Optional[int]) -> Optional[Dict[str, Any]]:
+        """Extend a live lease, capped at lease_max_ttl; None if it expired or was revoked"""
+        now = time.monotonic()
+        with self.lock:
+            lease = self.leases.get(lease_id)
+            if lease is None or lease['expires'] <= now:
+                self.leases.pop(lease_id, None)
+                return None
+            duration = int(min(increment or self.lease_ttl, lease['issued'] + self.lease_max_ttl - now))
+            lease['expires'] = now + duration
+        return {'lease_id': lease_id, 'lease_duration': duration, 'renewable': True}
+
+    def token_data(self, token: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Return the state of a known token"""
+        with self.lock:
+            return self.tokens.get(token) if token else None
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class FakeVaultHandler(BaseHTTPRequestHandler):
+    """HTTP handler dispatching Vault API paths to the FakeVault state"""
+
+    protocol_version = 'HTTP/1.1'
+    server_version = 'FakeVault/1.0'
+    # Headers and body are written separately; avoid delayed-ACK stalls
+    disable_nagle_algorithm = True
+
+    @property
+    def vault(self) -> FakeVault:
+        return self.server.vault
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self._handle('GET')
+
+    def do_POST(self):
+        self._handle('POST')
+
+    def do_PUT(self):
+        self._handle('POST')
+
+    def do_PATCH(self):
+        self._handle('PATCH')
+
+    def do_LIST(self):
+        self._handle('LIST')
+
+    def do_DELETE(self):
+        self._handle('DELETE')
+
+    def _send(self, status: int, body: Optional[Dict[str, Any]] = None,
+              headers: Optional[Dict[str, str]] = None):
+        payload = json.dumps(body).encode() if body is not None else b''
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _error(self, status: int, message: str = ''):
+        self._send(status, {'errors': [message] if message else []})
+
+    def _body(self) -> Dict[str, Any]:
+        length = int(self.headers.get('Content-Length') or 0)
+        if not length:
+            return {}
+        return json.loads(self.rfile.read(length))
+
+    def _handle(self, method: str):
+        path, _, query = self.path.partition('?')
+        if method == 'GET' and 'list=true' in query:
+            method = 'LIST'
+        path = path[len('/v1/'):] if path.startswith('/v1/') else path.lstrip('/')
+        body = self._body() if method in ('POST', 'PUT', 'PATCH') else {}
+
+        with self.vault.lock:
+            self.vault.counts[(method, path)] += 1
+            self.server.requests += 1
+        delay = self.vault.latency + random.uniform(0, self.vault.jitter)
+        if delay:
+            time.sleep(delay)
+
+        health = self.server.health
+        if path == 'sys/health':
+            return self._send(HEALTH_STATUS[health], {
+                'initialized': True,
+                'sealed': health == 'sealed',
+                'standby': health in ('standby', 'perfstandby'),
+                'performance_standby': health == 'perfstandby',
+            })
+        if health == 'sealed':
+            return self._error(503, 'Vault is sealed')
+        if not self.vault.take_quota():
+            return self._send(429, {'errors': ['request path "' + path + '": rate limit quota exceeded']},
+                              {'Retry-After': '1'})
+        if path.startswith('auth/') and path.endswith('/login'):
+            return self._login(path, body)
+
+        token = self.vault.token_data(self.headers.get('X-Vault-Token'))
+        if token is None:
+            return self._error(403, 'permission denied')
+
+        if path == 'auth/token/lookup-self':
+            return self._lookup_self(token)
+        if path == 'auth/token/revoke-self':
+            with self.vault.lock:
+                self.vault.tokens.pop(self.headers.get('X-Vault-Token'), None)
+            return self._send(204)
+        if path == 'auth/token/renew-self':
+            return self._send(200, {'auth': {
+                'client_token': self.headers.get('X-Vault-Token'),
+                'policies': token['policies'],
+                'lease_duration': self.vault.token_ttl,
+                'renewable': True,
+            }})
+        if path == 'sys/mounts':
+            return self._send(200, {'data': {
+                f"{mount}/": {'type': 'kv', 'options': {'version': str(spec['version'])}}
+                for mount, spec in self.vault.mounts.items()
+            }})
+        if path.startswith('sys/internal/ui/mounts/'):
+            mount = path[len('sys/internal/ui/mounts/'):].split('/', 1)[0]
+            spec = self.vault.mounts.get(mount)
+            if spec is None:
+                return self._error(403, 'permission denied')
+            return self._send(200, {'data': {
+                'path': f"{mount}/", 'type': 'kv', 'options': {'version': str(spec['version'])},
+            }})
+
+        if path.startswith('database/creds/') and method == 'GET':
+            return self._send(200, self.vault.issue_lease(path[len('database/creds/'):]))
+        if path == 'sys/leases/renew':
+            lease = self.vault.renew_lease(body.get('lease_id', ''), body.get('increment'))
+            if lease is None:
+                return self._error(400, 'lease not found')
+            return self._send(200, lease)
+        if path == 'sys/leases/revoke' or path.startswith('sys/leases/revoke/'):
+            lease_id = path[len('sys/leases/revoke/'):] or body.get('lease_id', '')
+            with self.vault.lock:
+                self.vault.leases.pop(lease_id, None)
+            return self._send(204)
+
+        if path.startswith('transit/') and method in ('POST', 'PUT'):
+            return self._transit(path, body)
+
+        mount, _, rest = path.partition('/')
+        spec = self.vault.mounts.get(mount)
+        if spec is None:
+            return self._error(404)
+        if spec['version'] == 2:
+            return self._kv2(method, spec, rest, body)
+        return self._kv1(method, spec, rest, body)
+
+    def _login(self, path: str, body: Dict[str, Any]):
+        if path == 'auth/approle/login':
+            if not body.get('role_id') or not body.get('secret_id'):
+                return self._error(400, 'missing role_id or secret_id')
+        elif not body.get('jwt'):
+            return self._error(400, 'missing jwt')
+        self._send(200, {'auth': self.vault.issue_token(self.vault.policies)})
+
+    def _transit(self, path: str, body: Dict[str, Any]):
+        _, operation, key = path.split('/', 2)
+        with self.vault.lock:
+            version = self.vault.transit_keys.setdefault(key, 1)
+        batch = body.get('batch_input') or [body]
+        results = []
+        for item in batch:
+            try:
+                if operation == 'encrypt':
+                    plaintext = item['plaintext']
+                    base64.b64decode(plaintext, validate=True)
+                else:
+                    prefix, key_version, encoded = item['ciphertext'].split(':', 2)
+                    owner, _, plaintext = base64.b64decode(encoded).decode().partition(':')
+                    if prefix != 'vault' or owner != key:
+                        raise ValueError
+                if operation == 'decrypt':
+                    results.append({'plaintext': plaintext})
+                else:
+                    encoded = base64.b64encode(f"{key}:{plaintext}".encode()).decode()
+                    results.append({'ciphertext': f"vault:v{version}:{encoded}", 'key_version': version})
+            except (KeyError, ValueError):
+                results.append({'error': 'invalid input'})
+        if 'batch_input' not in body:
+            if 'error' in results[0]:
+                return self._error(400, results[0]['error'])
+            return self._send(200, {'data': results[0]})
+        failed = any('error' in r for r in results)
+        status = int(body.get('partial_failure_response_code') or 400) if failed else 200
+        self._send(status, {'data': {'batch_results': results}})
+
+    def _lookup_self(self, token: Dict[str, Any]):
+        elapsed = int(time.time() - token['issued'])
+        self._send(200, {'data': {
+            'policies': token['policies'],
+            'ttl': max(self.vault.token_ttl - elapsed, 0),
+            'creation_ttl': self.vault.token_ttl,
+            'renewable': True,
+        }})
+
+    def _list(self, secrets: Dict[str, Any], folder: str):
+        folder = folder.strip('/')
+        folder = f"{folder}/" if folder else ''
+        keys = set()
+        for path in secrets:
+            if path.startswith(folder):
+                head, sep, _ = path[len(folder):].partition('/')
+                keys.add(head + sep)
+        if not keys:
+            return self._error(404)
+        self._send(200, {'data': {'keys': sorted(keys)}})
+
+    def _kv1(self, method: str, spec: Dict[str, Any], path: str, body: Dict[str, Any]):
+        secrets = spec['secrets']
+        if method == 'LIST':
+            return self._list(secrets, path)
+        if method == 'GET':
+            secret = secrets.get(path)
+            if secret is None:
+                return self._error(404)
+            return self._send(200, {'data': secret['data'], 'lease_duration': 2764800, 'renewable': False})
+        if method == 'POST':
+            secrets[path] = {'data': body, 'version': 1, 'updated_time': _now()}
+            return self._send(204)
+        self._error(405)
+
+    def _kv2(self, method: str, spec: Dict[str, Any], path: str, body: Dict[str, Any]):
+        secrets = spec['secrets']
+        kind, _, path = path.partition('/')
+        if kind == 'metadata':
+            if method == 'LIST':
+                return self._list(secrets, path)
+            secret = secrets.get(path)
+            if method != 'GET' or secret is None:
+                return self._error(404)
+            return self._send(200, {'data': {
+                'current_version': secret['version'],
+                'updated_time': secret['updated_time'],
+            }})
+        if kind != 'data':
+            return self._error(404)
+
+        secret = secrets.get(path)
+        if method == 'GET':
+            if secret is None:
+                return self._error(404)
+            return self._send(200, {'data': {
+                'data': secret['data'],
+                'metadata': {'version': secret['version'], 'created_time': secret['updated_time']},
+            }, 'lease_duration': 0})
+        if method in ('POST', 'PATCH'):
+            if method == 'PATCH' and secret is None:
+                return self._error(404)
+            cas = (body.get('options') or {}).get('cas')
+            current = secret['version'] if secret else 0
+            if cas is not None and cas != current:
+                return self._error(400, 'check-and-set parameter did not match the current version')
+            data = body.get('data') or {}
+            if method == 'PATCH':
+                # JSON merge patch: null removes a key
+                data = {k: v for k, v in {**secret['data'], **data}.items() if data.get(k, v) is not None}
+            secrets[path] = {'data': data, 'version': current + 1, 'updated_time': _now()}
+            return self._send(200, {'data': {'version': current + 1, 'created_time': _now()}})
+        self._error(405)
+
+
+class FakeVaultServer(ThreadingHTTPServer):
+    """Threading HTTP server holding the FakeVault state"""
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], vault: FakeVault, health: str = 'active'):
+        super().__init__(address, FakeVaultHandler)
+        self.vault = vault
+        # Role reported by sys/health: active, perfstandby, standby or sealed
+        self.health = health
+        self.requests = 0
+
+    def handle_error(self, request, client_address):
+        # Clients giving up on slow responses (deadlines) are expected
+        pass
+
+
+def start_server(
+    vault: FakeVault,
+    host: str = '127.0.0.1',
+    port: int = 0,
+    health: str = 'active'
+) -> Tuple[FakeVaultServer, str]:
+    """
+    Start a fake Vault server on a background thread
+
+    Args:
+        vault: FakeVault state to serve
+        host: Interface to bind
+        port: Port to bind (0 picks a free port)
+        health: Role reported by sys/health (active, perfstandby, standby or sealed)
+
+    Returns:
+        Tuple of (server, base URL)
+    """
+    server = FakeVaultServer((host, port), vault, health)
+    threading.Thread(target=server.serve_forever, name='fake-vault', daemon=True).start()
+    return server, f"http://{host}:{server.server_port}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local stand-in Vault server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8200)
+    parser.add_argument('--latency-ms', type=float, default=0.0, help="latency added to every request")
+    parser.add_argument('--jitter-ms', type=float, default=0.0, help="maximum random extra latency")
+    args = parser.parse_args()
+
+    vault = FakeVault(latency=args.latency_ms / 1000, jitter=args.jitter_ms / 1000)
+    server = FakeVaultServer((args.host, args.port), vault)
+    print(f"Fake Vault listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+"""
+KV mount discovery constants
+
+Shared by VaultAppRoleAuth and AsyncVaultAppRoleAuth, so both clients probe
+the same mounts in the same order. This module has no dependencies and is
+cheap to import.
+"""
+
+# Candidate KV mount points, in the order they are probed
+KV_MOUNT_POINTS = ('kv', 'secret')
+
+# (mount point, KV version) strategies tried when the mount of a path is
+# unknown: KV v2 on kv/ and secret/, KV v1 on kv/ and secret/, then a
+# direct read/write (for other engines)
+KV_STRATEGIES = (
+    ('kv', 2),
+    ('secret', 2),
+    ('kv', 1),
+    ('secret', 1),
+    ('secret', None),
+)
+
+# Sentinel for a mount whose engine version could not be discovered
+MOUNT_UNKNOWN = object()
@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+Version-aware refresh of watched KV v2 secrets
+
+KVRefresher keeps a set of watched secrets current without rereading their
+payloads:
+- every interval it reads only the KV v2 metadata of each watched path
+  (current_version, a few hundred bytes) in parallel
+- a path's data is read only when its version moved; subscribers are then
+  called with the new secret
+- unchanged secrets have their secret cache TTL extended, so reads keep
+  being served locally and are never more than about one interval stale
+  while Vault is reachable; if polling fails, entries expire as usual
+- watched prefixes are LISTed on a slower cadence (list_interval) to pick
+  up new secrets; deleted secrets are found through their metadata and
+  reported as None
+- paths that are not on a KV v2 mount, or whose metadata cannot be read,
+  are reread in full and compared instead
+"""
+
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Called with (path, secret, version); secret is None when it was deleted
+Subscriber = Callable[[str, Optional[Dict[str, Any]], Optional[int]], None]
+
+# Poll outcomes
+CHANGED = 'changed'
+UNCHANGED = 'unchanged'
+DELETED = 'deleted'
+FAILED = 'failed'
+
+
+class _Watched:
+    """Last known state of a watched path"""
+
+    __slots__ = ('version', 'fingerprint', 'checked_at', 'explicit')
+
+    def __init__(self, version: Optional[int], explicit: bool):
+        # KV v2 version; 0 once deleted, None until first seen
+        self.version = version
+        # Payload digest for paths without usable metadata
+        self.fingerprint: Optional[str] = None
+        self.checked_at = 0.0
+        # Watched by path, not only through a prefix
+        self.explicit = explicit
+
+
+class KVRefresher:
+    """Polls KV v2 metadata of watched secrets and rereads only the ones that changed"""
+
+    def __init__(
+        self,
+        vault: Any,
+        interval: float = 30,
+        max_concurrency: int = 8,
+        list_interval: float = 300
+    ):
+        """
+        Initialize the refresher
+
+        Args:
+            vault: VaultAppRoleAuth whose metadata reads, secret cache and metrics are used
+            interval: Seconds between polls; the bound on how stale a watched
+                secret can be while Vault is reachable
+            max_concurrency: Maximum parallel metadata and data reads
+            list_interval: Seconds between LISTs of watched prefixes, the
+                bound on how late a newly created secret is picked up
+        """
+        self.vault = vault
+        self.interval = interval
+        self.max_concurrency = max_concurrency
+        self.list_interval = list_interval
+        self._listed_at = float('-inf')
+        self._watched: Dict[str, _Watched] = {}
+        self._prefixes: List[str] = []
+        self._subscribers: List[Tuple[str, Subscriber]] = []
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._thread: Optional[threading.Thread] = None
+        self.cycles = 0
+        self.lists = 0
+        self.metadata_reads = 0
+        self.data_reads = 0
+        self.changes = 0
+        self.errors = 0
+
+    def watch(self, path: str, callback: Optional[Subscriber] = None):
+        """
+        Watch a secret path
+
+        Args:
+            path: Secret path (e.g., 'watsonxdemo/shared/config')
+            callback: Optional subscriber for changes of this path
+        """
+        path = path.strip('/')
+        with self._cond:
+            watched = self._watched.get(path)
+            if watched is None:
+                self._watched[path] = _Watched(self._cached_version(path), explicit=True)
+            else:
+                watched.explicit = True
+        if callback is not None:
+            self.subscribe(callback, path)
+        self.start()
+
+    def watch_prefix(self, prefix: str, callback: Optional[Subscriber] = None):
+        """
+        Watch every secret under a folder, including ones created later
+
+        Args:
+            prefix: Folder path (e.g., 'watsonxdemo/shared')
+            callback: Optional subscriber for changes under this prefix
+        """
+        prefix = prefix.strip('/') + '/'
+        with self._cond:
+            if prefix not in self._prefixes:
+                self._prefixes.append(prefix)
+        self._discover([prefix], created=False)
+        if callback is not None:
+            self.subscribe(callback, prefix)
+        self.start()
+
+    def subscribe(self, callback: Subscriber, prefix: str = ''):
+        """
+        Call callback(path, secret, version) for every change of a watched path
+
+        Args:
+            callback: Subscriber; secret is None when the path was deleted.
+                Callbacks run on the refresher thread and should return quickly
+            prefix: A secret path, or a folder ending in '/' ('' for all paths)
+        """
+        with self._cond:
+            self._subscribers.append((prefix, callback))
+
+    def unsubscribe(self, callback: Subscriber):
+        """Stop calling a subscriber"""
+        with self._cond:
+            self._subscribers = [(p, cb) for p, cb in self._subscribers if cb is not callback]
+
+    def _cached_version(self, path: str) -> Optional[int]:
+        cache = self.vault.secret_cache
+        return cache.version(path) if cache else None
+
+    def _discover(self, prefixes: List[str], created: bool = True):
+        """
+        LIST watched prefixes and start watching the secrets found there
+
+        Args:
+            prefixes: Folders to list
+            created: Whether new paths appeared since the prefix was first
+                listed, so their first poll is reported as a change
+        """
+        for prefix in prefixes:
+            errors: Dict[str, str] = {}
+            paths = self.vault.list_tree(prefix.rstrip('/'), errors=errors)
+            with self._cond:
+                self.lists += 1
+                # Folders that could not be listed are picked up by a later cycle
+                self.errors += len(errors)
+                for path in paths:
+                    if path not in self._watched:
+                        version = 0 if created else self._cached_version(path)
+                        self._watched[path] = _Watched(version, explicit=False)
+
+    def _poll(self, path: str, watched: _Watched) -> Tuple[str, Optional[int], Optional[Dict[str, Any]], Optional[str]]:
+        """
+        Check one path, reading its data only if it changed
+
+        Returns:
+            (outcome, version, secret, fingerprint) where outcome is CHANGED,
+            UNCHANGED, DELETED or FAILED; secret is None for a path seen for
+            the first time, which is only recorded
+        """
+        vault = self.vault
+        first = watched.version is None and watched.fingerprint is None
+        with self._cond:
+            self.metadata_reads += 1
+        try:
+            metadata = vault.read_secret_metadata(path)
+        except Exception as e:
+            logger.warning("Could not read metadata of %s: %s", path, e)
+            return FAILED, None, None, None
+        if metadata is not None:
+            version = metadata.get('current_version') or 0
+            current = (metadata.get('versions') or {}).get(str(version)) or {}
+            if not version or current.get('deletion_time') or current.get('destroyed'):
+                return (UNCHANGED if watched.version == 0 else DELETED), 0, None, None
+            if version == watched.version:
+                if vault.secret_cache:
+                    vault.secret_cache.touch(path, version)
+                return UNCHANGED, version, None, None
+            if first:
+                return CHANGED, version, None, None
+            secret = self._read(path)
+            if secret is None:
+                return FAILED, None, None, None
+            return CHANGED, self._cached_version(path) or version, secret, None
+
+        # No readable KV v2 metadata: reread the whole secret and compare
+        secret = self._read(path)
+        if secret is None:
+            return FAILED, None, None, None
+        fingerprint = json.dumps(secret, sort_keys=True, separators=(',', ':'))
+        if fingerprint == watched.fingerprint:
+            return UNCHANGED, watched.version, None, fingerprint
+        return CHANGED, self._cached_version(path), None if first else secret, fingerprint
+
+    def _read(self, path: str) -> Optional[Dict[str, Any]]:
+        """Read a secret bypassing the caches (the secret cache is updated)"""
+        with self._cond:
+            self.data_reads += 1
+        return self.vault.refresh_secret(path)
+
+    def refresh(self) -> List[str]:
+        """
+        Run one poll cycle now
+
+        Returns:
+            Paths that changed or were deleted in this cycle
+        """
+        now = time.monotonic()
+        with self._cond:
+            # New secrets are rare; LIST on a slower cadence than the metadata polls
+            prefixes = list(self._prefixes) if now - self._listed_at >= self.list_interval else []
+            if prefixes:
+                self._listed_at = now
+        if prefixes:
+            self._discover(prefixes)
+        with self._cond:
+            watched = list(self._watched.items())
+        if not watched:
+            return []
+
+        workers = min(self.max_concurrency, len(watched))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='vault-refresh') as executor:
+            results = list(executor.map(lambda item: self._poll(*item), watched))
+
+        now = time.monotonic()
+        changed = []
+        with self._cond:
+            self.cycles += 1
+            for (path, state), (outcome, version, secret, fingerprint) in zip(watched, results):
+                if outcome == FAILED:
+                    self.errors += 1
+                    continue
+                state.checked_at = now
+                if outcome == UNCHANGED:
+                    continue
+                first = state.version is None and state.fingerprint is None
+                state.version = version
+                state.fingerprint = fingerprint
+                if outcome == DELETED:
+                    if self.vault.secret_cache:
+                        self.vault.secret_cache.invalidate(path)
+                    if not state.explicit:
+                        # Watched again if a later LIST finds it recreated
+                        del self._watched[path]
+                if first:
+                    continue
+                self.changes += 1
+                changed.append((path, secret, version or None))
+            subscribers = list(self._subscribers)
+
+        if self.vault.metrics is not None and changed:
+            self.vault.metrics.inc('refresh_changes', len(changed))
+        for path, secret, version in changed:
+            for prefix, callback in subscribers:
+                if path == prefix or (not prefix or prefix.endswith('/')) and path.startswith(prefix):
+                    try:
+                        callback(path, secret, version)
+                    except Exception as e:
+                        logger.error("Refresh subscriber failed for %s: %s", path, e)
+        if changed:
+            logger.info("Refresh: %s of %s watched secrets changed", len(changed), len(watched))
+        return [path for path, _, _ in changed]
+
+    def start(self):
+        """Start the background poll thread (idempotent)"""
+        with self._cond:
+            if self._thread is not None or self._stopped:
+                return
+            self._thread = threading.Thread(target=self._loop, name='vault-kv-refresher', daemon=True)
+            self._thread.start()
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._stopped, self.interval)
+                if self._stopped:
+                    return
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error("Refresh cycle failed: %s", e)
+
+    def close(self):
+        """Stop the background poll thread"""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join()
+
+    def staleness(self, path: Optional[str] = None) -> float:
+        """Seconds since path (default: the least recently confirmed watched path) was confirmed current"""
+        now = time.monotonic()
+        with self._cond:
+            if path is not None:
+                watched = self._watched.get(path.strip('/'))
+                return now - watched.checked_at if watched else float('inf')
+            return max((now - w.checked_at for w in self._watched.values()), default=0.0)
+
+    def stats(self) -> Dict[str, int]:
+        """Return poll and read counters and the number of watched paths"""
+        with self._cond:
+            return {
+                'watched': len(self._watched),
+                'cycles': self.cycles,
+                'lists': self.lists,
+                'metadata_reads': self.metadata_reads,
+                'data_reads': self.data_reads,
+                'changes': self.changes,
+                'errors': self.errors,
+            }
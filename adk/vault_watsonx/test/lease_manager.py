@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Lease manager for dynamic secrets
+
+LeaseManager hands out credentials from dynamic secrets engines (e.g.
+database/creds/<role>) and keeps their leases alive, so many agent sessions
+share a few leases instead of each minting its own:
+- one lease per path is shared by every caller, and concurrent callers
+  without a usable lease share one read
+- leases are kept in a heap ordered by renewal deadline; a background
+  scheduler wakes at the earliest deadline and renews every lease due
+  within the batch window in parallel
+- a lease that can no longer be extended (max TTL reached, not renewable or
+  renewal rejected) is replaced by a fresh one before it expires; the old
+  one is retired, not revoked, so callers still using it are not cut off
+- leases not requested for idle_timeout seconds are revoked instead of
+  renewed, and close() revokes every remaining and retired lease in parallel
+"""
+
+import heapq
+import itertools
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+# Transport helpers shared with tools/vault_tool.py
+import _paths  # noqa: F401
+from vault_transport import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+
+class Lease:
+    """A dynamic secret and the state of its lease"""
+
+    __slots__ = ('lease_id', 'path', 'data', 'lease_duration', 'renewable',
+                 'expires_at', 'renew_at', 'last_used')
+
+    def __init__(self, path: str, response: Dict[str, Any], renew_fraction: float):
+        now = time.monotonic()
+        self.lease_id: str = response['lease_id']
+        self.path = path
+        self.data: Dict[str, Any] = response.get('data') or {}
+        self.lease_duration: int = response.get('lease_duration') or 0
+        self.renewable: bool = bool(response.get('renewable'))
+        self.expires_at = now + self.lease_duration
+        self.renew_at = now + self.lease_duration * renew_fraction
+        self.last_used = now
+
+    def ttl(self) -> float:
+        """Seconds until the lease expires"""
+        return self.expires_at - time.monotonic()
+
+    def __repr__(self):
+        return f"Lease({self.lease_id!r}, ttl={self.ttl():.0f}s, renewable={self.renewable})"
+
+
+class LeaseManager:
+    """Shares, renews and revokes the dynamic secret leases of one Vault client"""
+
+    def __init__(
+        self,
+        vault: Any,
+        renew_fraction: float = 2 / 3,
+        min_ttl: float = 30,
+        batch_window: float = 5.0,
+        retry_interval: float = 5.0,
+        idle_timeout: Optional[float] = 3600,
+        max_concurrency: int = 8
+    ):
+        """
+        Initialize the lease manager
+
+        Args:
+            vault: Authenticated VaultAppRoleAuth whose client and metrics are used
+            renew_fraction: Fraction of a lease's duration after which it is renewed
+            min_ttl: Leases with less TTL left are not handed out; a fresh one is read
+            batch_window: Leases due within this many seconds of the earliest
+                deadline are renewed in the same batch
+            retry_interval: Seconds before retrying a failed renewal or replacement
+            idle_timeout: Revoke leases not requested for this many seconds
+                (None keeps them until close())
+            max_concurrency: Maximum parallel renewal and revocation requests
+        """
+        if not 0 < renew_fraction < 1:
+            raise ValueError("renew_fraction must be between 0 and 1")
+        self.vault = vault
+        self.renew_fraction = renew_fraction
+        self.min_ttl = min_ttl
+        self.batch_window = batch_window
+        self.retry_interval = retry_interval
+        self.idle_timeout = idle_timeout
+        self.max_concurrency = max_concurrency
+        self._leases: Dict[str, Lease] = {}
+        # Replaced leases that have not expired yet; revoked by revoke_all()
+        self._retiring: List[Lease] = []
+        # (renew_at, sequence, lease); entries for replaced leases are skipped when popped
+        self._heap: List[Tuple[float, int, Lease]] = []
+        self._sequence = itertools.count()
+        self._cond = threading.Condition()
+        self._flight = SingleFlight()
+        self._stopped = False
+        self._thread: Optional[threading.Thread] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.renewed = 0
+        self.replaced = 0
+        self.revoked = 0
+
+    def get(self, path: str, min_ttl: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Return credentials for a dynamic secret path, reusing the current lease
+
+        Args:
+            path: Dynamic secret path (e.g., 'database/creds/watsonxdemo')
+            min_ttl: Minimum seconds the lease must remain valid (defaults to min_ttl)
+
+        Returns:
+            Copy of the credential data, or None if they could not be read
+        """
+        min_ttl = self.min_ttl if min_ttl is None else min_ttl
+        with self._cond:
+            lease = self._leases.get(path)
+            if lease is not None and lease.ttl() > min_ttl:
+                lease.last_used = time.monotonic()
+                return dict(lease.data)
+        try:
+            lease = self._flight.do(('lease', path), lambda: self._acquire(path))
+        except Exception as e:
+            logger.error("Could not read dynamic secret %s: %s", path, e)
+            return None
+        return dict(lease.data)
+
+    def _acquire(self, path: str) -> Lease:
+        """Read a fresh lease for path and schedule its renewal"""
+        response = self.vault._timed('lease', lambda: self.vault.client.read(path))
+        if not response or not response.get('lease_id'):
+            raise ValueError(f"{path} did not return a lease")
+        lease = Lease(path, response, self.renew_fraction)
+        with self._cond:
+            stopped = self._stopped
+            if not stopped:
+                previous = self._leases.get(path)
+                if previous is not None:
+                    # Callers may still hold the old credentials; revoke them only on close
+                    lease.last_used = previous.last_used
+                    self._retiring = [l for l in self._retiring if l.ttl() > 0]
+                    self._retiring.append(previous)
+                    self.replaced += 1
+                self._leases[path] = lease
+                self._push(lease)
+        if stopped:
+            # Closed while the read was in flight: nothing would revoke this lease
+            self._revoke(lease)
+            raise RuntimeError("Lease manager is closed")
+        self._start()
+        logger.info("Acquired lease for %s (TTL %ss)", path, lease.lease_duration)
+        return lease
+
+    def _push(self, lease: Lease):
+        """Schedule a lease's next renewal; the caller must hold the lock"""
+        heapq.heappush(self._heap, (lease.renew_at, next(self._sequence), lease))
+        self._cond.notify()
+
+    def _start(self):
+        with self._cond:
+            if self._thread is not None:
+                return
+            self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency,
+                                                thread_name_prefix='vault-lease')
+            self._thread = threading.Thread(target=self._schedule_loop, name='vault-lease-scheduler',
+                                            daemon=True)
+            self._thread.start()
+
+    def _schedule_loop(self):
+        """Wait for the earliest renewal deadline, then renew every lease due in the window"""
+        while True:
+            with self._cond:
+                while not self._stopped:
+                    delay = self._heap[0][0] - time.monotonic() if self._heap else None
+                    if delay is not None and delay <= 0:
+                        break
+                    self._cond.wait(delay)
+                if self._stopped:
+                    return
+                horizon = time.monotonic() + self.batch_window
+                due = []
+                while self._heap and self._heap[0][0] <= horizon:
+                    _, _, lease = heapq.heappop(self._heap)
+                    if self._leases.get(lease.path) is lease:
+                        due.append(lease)
+            if due:
+                logger.debug("Renewing a batch of %s leases", len(due))
+                list(self._executor.map(self._maintain, due))
+
+    def _maintain(self, lease: Lease):
+        """Renew, replace or revoke one due lease"""
+        if self.idle_timeout is not None:
+            # Checked together with the removal, so a concurrent get() either
+            # keeps the lease alive or misses it and reads a new one
+            with self._cond:
+                idle = (self._leases.get(lease.path) is lease
+                        and time.monotonic() - lease.last_used > self.idle_timeout)
+                if idle:
+                    del self._leases[lease.path]
+            if idle:
+                logger.info("Revoking idle lease for %s", lease.path)
+                self._revoke(lease)
+                return
+
+        if lease.renewable and self._renew(lease):
+            return
+        try:
+            self._flight.do(('lease', lease.path), lambda: self._acquire(lease.path))
+        except Exception as e:
+            logger.warning("Could not replace lease for %s: %s", lease.path, e)
+            with self._cond:
+                if self._leases.get(lease.path) is not lease:
+                    return
+                if lease.ttl() <= 0:
+                    del self._leases[lease.path]
+                    return
+                lease.renew_at = time.monotonic() + min(self.retry_interval, lease.ttl())
+                self._push(lease)
+
+    def _renew(self, lease: Lease) -> bool:
+        """
+        Renew a lease by its original duration
+
+        Returns:
+            True if the lease was extended by its full duration, False if it
+            must be replaced (max TTL reached or renewal rejected)
+        """
+        try:
+            response = self.vault._timed('lease_renew', lambda: self.vault.client.sys.renew_lease(
+                lease_id=lease.lease_id, increment=lease.lease_duration))
+        except Exception as e:
+            logger.warning("Could not renew lease for %s: %s", lease.path, e)
+            return False
+        duration = (response or {}).get('lease_duration') or 0
+        now = time.monotonic()
+        with self._cond:
+            lease.expires_at = now + duration
+            self.renewed += 1
+            if duration < lease.lease_duration:
+                # Capped by the max TTL: replace the lease before it runs out
+                logger.info("Lease for %s reached its max TTL, replacing it", lease.path)
+                return False
+            lease.renew_at = now + duration * self.renew_fraction
+            if self._leases.get(lease.path) is lease:
+                self._push(lease)
+        return True
+
+    def _revoke(self, lease: Lease) -> bool:
+        # The lease id in the path lets policies scope revocation to a secrets engine role
+        try:
+            self.vault._timed('lease_revoke', lambda: self.vault.client.adapter.put(
+                f"/v1/sys/leases/revoke/{lease.lease_id}"))
+        except Exception as e:
+            logger.warning("Could not revoke lease for %s: %s", lease.path, e)
+            return False
+        with self._cond:
+            self.revoked += 1
+        return True
+
+    def revoke_all(self) -> int:
+        """
+        Revoke every current and retired lease in parallel
+
+        Returns:
+            Number of leases revoked
+        """
+        with self._cond:
+            leases = list(self._leases.values())
+            leases.extend(l for l in self._retiring if l.ttl() > 0)
+            self._leases.clear()
+            self._retiring.clear()
+            self._heap.clear()
+        if not leases:
+            return 0
+        workers = min(self.max_concurrency, len(leases))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='vault-lease-revoke') as executor:
+            revoked = sum(executor.map(self._revoke, leases))
+        logger.info("Revoked %s of %s leases", revoked, len(leases))
+        return revoked
+
+    def close(self) -> int:
+        """
+        Stop the renewal scheduler and revoke every lease
+
+        Returns:
+            Number of leases revoked
+        """
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        return self.revoke_all()
+
+    def status(self) -> List[Tuple[str, str, float, bool]]:
+        """Return (path, lease_id, seconds left, renewable) for every current lease"""
+        with self._cond:
+            return [(l.path, l.lease_id, l.ttl(), l.renewable) for l in self._leases.values()]
+
+    def stats(self) -> Dict[str, int]:
+        """Return renewal, replacement and revocation counters and current size"""
+        with self._cond:
+            return {
+                'leases': len(self._leases),
+                'retiring': len(self._retiring),
+                'renewed': self.renewed,
+                'replaced': self.replaced,
+                'revoked': self.revoked,
+            }
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+In-process secret cache for VaultAppRoleAuth
+
+A bounded, thread-safe LRU cache for secrets read from Vault. Entries are
+stored JSON-encoded, so callers always get a fresh copy and the byte budget
+reflects the real payload size. Each entry carries its own TTL, taken from
+the lease duration of the read or a default TTL for KV v2 secrets, together
+with the KV v2 metadata version it was read at. Invalidating a path bumps
+its generation, so a read that raced the invalidation is not cached.
+
+NegativeCache remembers, for a short time, paths that were missing or
+forbidden, so repeated reads of them do not each walk every read strategy.
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Hashable, NamedTuple, Tuple
+
+
+class CacheEntry(NamedTuple):
+    """A cached secret payload"""
+    payload: bytes
+    expires_at: float
+    version: Optional[int]
+
+
+class SecretCache:
+    """LRU cache of secret data bounded by entry count and total bytes"""
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        max_bytes: int = 1024 * 1024,
+        default_ttl: float = 60
+    ):
+        """
+        Initialize the secret cache
+
+        Args:
+            max_entries: Maximum number of cached secrets
+            max_bytes: Maximum total size of cached secret payloads in bytes
+            default_ttl: TTL in seconds for secrets read without a lease duration (KV v2)
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        # path -> invalidation counter; clear() bumps _epoch for every path
+        self._generations: Dict[str, int] = {}
+        self._epoch = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def generation(self, path: str) -> int:
+        """Return the invalidation counter of path, to pass to put() after a read"""
+        with self._lock:
+            return self._epoch + self._generations.get(path, 0)
+
+    def get(self, path: str) -> Optional[Dict[str, Any]]:
+        """
+        Return a cached secret, or None on a miss or expired entry
+
+        Args:
+            path: Secret path (e.g., 'watsonxdemo/shared/config')
+
+        Returns:
+            A fresh copy of the cached secret data, or None
+        """
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None or entry.expires_at <= time.monotonic():
+                if entry is not None:
+                    self._remove(path)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(path)
+            self.hits += 1
+        return json.loads(entry.payload)
+
+    def put(
+        self,
+        path: str,
+        secret: Dict[str, Any],
+        ttl: Optional[float] = None,
+        version: Optional[int] = None,
+        generation: Optional[int] = None
+    ):
+        """
+        Cache a secret, evicting least recently used entries to stay in bounds
+
+        Args:
+            path: Secret path
+            secret: Secret data
+            ttl: Seconds the entry stays valid (defaults to default_ttl)
+            version: KV v2 metadata version the secret was read at
+            generation: generation(path) taken before the read started; the
+                secret is dropped if path was invalidated since
+        """
+        payload = json.dumps(secret, separators=(',', ':')).encode()
+        if len(payload) > self.max_bytes:
+            return
+        entry = CacheEntry(payload, time.monotonic() + (ttl or self.default_ttl), version)
+        with self._lock:
+            if generation is not None and generation != self._epoch + self._generations.get(path, 0):
+                return
+            if path in self._entries:
+                self._remove(path)
+            self._entries[path] = entry
+            self._bytes += len(payload)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def version(self, path: str) -> Optional[int]:
+        """Return the KV v2 version a cached secret was read at, if known"""
+        with self._lock:
+            entry = self._entries.get(path)
+        return entry.version if entry else None
+
+    def touch(self, path: str, version: int, ttl: Optional[float] = None) -> bool:
+        """
+        Extend the TTL of a cached secret that is still at version
+
+        Args:
+            path: Secret path
+            version: Current KV v2 metadata version of the secret
+            ttl: Seconds the entry stays valid from now (defaults to default_ttl)
+
+        Returns:
+            True if the entry was extended, False if it is missing, expired
+            or at another version
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None or entry.expires_at <= now or entry.version != version:
+                return False
+            self._entries[path] = entry._replace(expires_at=now + (ttl or self.default_ttl))
+        return True
+
+    def export(self) -> Dict[str, Tuple[Dict[str, Any], Optional[int]]]:
+        """Return every unexpired entry as path -> (secret, version), e.g. for a snapshot"""
+        now = time.monotonic()
+        with self._lock:
+            entries = [(path, e) for path, e in self._entries.items() if e.expires_at > now]
+        return {path: (json.loads(e.payload), e.version) for path, e in entries}
+
+    def invalidate(self, path: str):
+        """Drop a cached secret, e.g. after it was written"""
+        with self._lock:
+            if path in self._entries:
+                self._remove(path)
+            self._generations[path] = self._generations.get(path, 0) + 1
+
+    def clear(self):
+        """Drop every cached secret"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self._epoch += 1
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss/eviction counters and current size"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+            }
+
+    def _remove(self, path: str):
+        """Remove an entry; the caller must hold the lock"""
+        self._bytes -= len(self._entries.pop(path).payload)
+
+
+class NegativeCache:
+    """
+    Short-lived LRU cache of failed secret lookups
+
+    Outcomes are keyed by path and by the token's policy set, since a path
+    forbidden for one set of policies may be readable with another.
+    """
+
+    def __init__(self, ttl: float = 10, max_paths: int = 1024):
+        """
+        Initialize the negative cache
+
+        Args:
+            ttl: Seconds a failed lookup is remembered
+            max_paths: Maximum number of paths remembered
+        """
+        self.ttl = ttl
+        self.max_paths = max_paths
+        # path -> {policy set: (reason, expires_at)}
+        self._entries: "OrderedDict[str, Dict[Hashable, Tuple[str, float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped by every invalidation, so a lookup that raced a write is not remembered
+        self._generation = 0
+        self.hits = 0
+
+    def generation(self) -> int:
+        """Return the invalidation counter, to pass to put() after a lookup"""
+        with self._lock:
+            return self._generation
+
+    def get(self, policies: Hashable, path: str) -> Optional[str]:
+        """
+        Return why path was not readable with policies, or None if unknown
+
+        Args:
+            policies: Hashable policy set of the token (e.g. a sorted tuple)
+            path: Secret path
+
+        Returns:
+            'not_found' or 'forbidden' while the entry is fresh, otherwise None
+        """
+        with self._lock:
+            outcomes = self._entries.get(path)
+            outcome = outcomes.get(policies) if outcomes else None
+            if outcome is None:
+                return None
+            if outcome[1] <= time.monotonic():
+                del outcomes[policies]
+                if not outcomes:
+                    del self._entries[path]
+                return None
+            self._entries.move_to_end(path)
+            self.hits += 1
+            return outcome[0]
+
+    def put(self, policies: Hashable, path: str, reason: str, generation: Optional[int] = None):
+        """
+        Remember that path was not readable with policies
+
+        Args:
+            policies: Hashable policy set of the token
+            path: Secret path
+            reason: 'not_found' or 'forbidden'
+            generation: generation() taken before the lookup started; the
+                outcome is dropped if anything was invalidated since
+        """
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._entries.setdefault(path, {})[policies] = (reason, time.monotonic() + self.ttl)
+            self._entries.move_to_end(path)
+            while len(self._entries) > self.max_paths:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, path: str):
+        """Forget every failed lookup of path, e.g. after it was written"""
+        with self._lock:
+            self._entries.pop(path, None)
+            self._generation += 1
+
+    def clear(self):
+        """Forget every failed lookup"""
+        with self._lock:
+            self._entries.clear()
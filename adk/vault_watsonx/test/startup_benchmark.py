@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark for the Vault tool modules
+
+Every sample runs in a fresh interpreter, like a cold Orchestrate tool
+container, against fake_vault.py. It measures:
+- import time of the module
+- latency of its first Vault call (client setup, login and, for
+  VaultAppRoleAuth, one secret read), which includes deferred imports
+- which heavy dependencies were already loaded right after import
+
+Medians are compared with a fixed budget, and the script exits non-zero
+when a module exceeds it, so it can gate changes in CI.
+
+Usage:
+    python startup_benchmark.py --runs 5 --import-budget-ms 300 --first-call-budget-ms 500
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, NamedTuple, Optional
+
+from _paths import TEST_DIR, TOOLS_DIR
+from fake_vault import FakeVault, start_server
+
+# Modules whose presence after import shows what a cold start pays for
+WATCHED_MODULES = ('hvac', 'jwt', 'requests', 'dotenv', 'ibm_watsonx_orchestrate.run')
+
+# Runs in a fresh interpreter; prints one JSON line
+CHILD = '''
+import json, sys, time
+start = time.perf_counter()
+try:
+    import {module} as m
+except ImportError as e:
+    print(json.dumps({{'skipped': str(e)}}))
+    sys.exit(0)
+imported = time.perf_counter()
+loaded = [name for name in {watched!r} if name in sys.modules]
+result = {call}
+done = time.perf_counter()
+print(json.dumps({{
+    'import': imported - start,
+    'first_call': done - imported,
+    'ok': result not in (None, False),
+    'loaded': loaded,
+}}))
+'''
+
+
+class Target(NamedTuple):
+    """A tool module and the expression making its first Vault call"""
+    name: str
+    module: str
+    call: str
+
+
+class Sample(NamedTuple):
+    """Aggregated measurements for one target"""
+    name: str
+    import_ms: float
+    first_call_ms: float
+    failures: int
+    loaded: List[str]
+    skipped: Optional[str] = None
+
+
+def build_targets(url: str) -> List[Target]:
+    """Build the modules to measure against a fake Vault at url"""
+    targets = [
+        Target('tools/vault_tool.py', 'vault_tool',
+               "m.get_approle_token(m.initialize_client(), 'bench-role', 'bench-secret')"),
+        Target('test_approle.VaultAppRoleAuth', 'test_approle',
+               f"(lambda v: v.authenticate() and v.read_secret('watsonxdemo/shared/config'))"
+               f"(m.VaultAppRoleAuth({url!r}, '', 'bench-role', 'bench-secret'))"),
+    ]
+    try:
+        import jwt
+    except ImportError:
+        print("Skipping tools/vault_oauth_tool.py: PyJWT is not installed", file=sys.stderr)
+        return targets
+    # Unsigned validation is used when VAULT_JWT_JWKS_URL is unset
+    access_token = jwt.encode({'sub': 'bench-user', 'exp': int(time.time()) + 3600},
+                              'startup-benchmark-signing-key-32b', 'HS256')
+    targets.insert(1, Target('tools/vault_oauth_tool.py', 'vault_oauth_tool',
+                             f"m.get_jwt_token(m.initialize_client(), {access_token!r})"))
+    return targets
+
+
+def measure(target: Target, env: Dict[str, str], runs: int) -> Sample:
+    """
+    Run a target in runs fresh interpreters
+
+    Args:
+        target: Module and first call to measure
+        env: Environment for the child interpreters
+        runs: Number of cold starts
+
+    Returns:
+        Sample with median import and first-call latency in milliseconds
+    """
+    code = CHILD.format(module=target.module, watched=WATCHED_MODULES, call=target.call)
+    imports, calls, loaded = [], [], []
+    failures = 0
+    for _ in range(runs):
+        completed = subprocess.run(
+            [sys.executable, '-c', code], env=env, capture_output=True, text=True, timeout=60
+        )
+        lines = completed.stdout.strip().splitlines()
+        if completed.returncode or not lines:
+            failures += 1
+            continue
+        result = json.loads(lines[-1])
+        if 'skipped' in result:
+            return Sample(target.name, 0.0, 0.0, 0, [], skipped=result['skipped'])
+        imports.append(result['import'] * 1000)
+        calls.append(result['first_call'] * 1000)
+        failures += not result['ok']
+        loaded = result['loaded']
+    return Sample(
+        name=target.name,
+        import_ms=statistics.median(imports) if imports else float('nan'),
+        first_call_ms=statistics.median(calls) if calls else float('nan'),
+        failures=failures,
+        loaded=loaded,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold-start cost of the Vault tool modules")
+    parser.add_argument('--runs', type=int, default=5, help="cold starts per module")
+    parser.add_argument('--latency-ms', type=float, default=2.0, help="latency injected per Vault request")
+    parser.add_argument('--import-budget-ms', type=float, default=300.0, help="budget for the median import time")
+    parser.add_argument('--first-call-budget-ms', type=float, default=500.0,
+                        help="budget for the median first-call latency")
+    args = parser.parse_args()
+
+    vault = FakeVault(latency=args.latency_ms / 1000)
+    server, url = start_server(vault)
+    env = dict(os.environ, VAULT_ADDR=url, PYTHONPATH=os.pathsep.join(
+        [TOOLS_DIR, TEST_DIR] + ([os.environ['PYTHONPATH']] if os.environ.get('PYTHONPATH') else [])
+    ))
+    try:
+        samples = [measure(target, env, args.runs) for target in build_targets(url)]
+    finally:
+        server.shutdown()
+
+    header = f"{'module':<32} {'import ms':>10} {'first call ms':>14} {'failures':>9}  loaded at import"
+    print(header)
+    print('-' * len(header))
+    over_budget = False
+    for s in samples:
+        if s.skipped:
+            print(f"{s.name:<32} skipped: {s.skipped}")
+            continue
+        flags = ''
+        if s.import_ms > args.import_budget_ms or s.first_call_ms > args.first_call_budget_ms:
+            over_budget = True
+            flags = '  OVER BUDGET'
+        print(f"{s.name:<32} {s.import_ms:>10.1f} {s.first_call_ms:>14.1f} {s.failures:>9}  "
+              f"{', '.join(s.loaded) or '-'}{flags}")
+    sys.exit(1 if over_budget else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -12,20 +12,91 @@ Requirements:
 - Valid Vault server with AppRole auth method enabled
 """
 
+import base64
+import contextvars
+import hashlib
 import os
 import sys
-import hvac
-from typing import Optional, Dict, Any
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Optional, Dict, Any, Iterable, Iterator, List, Mapping, NamedTuple, Tuple, Union
 import logging
-from dotenv import load_dotenv
+from kv_mounts import KV_MOUNT_POINTS, KV_STRATEGIES, MOUNT_UNKNOWN
 
-# Configure logging
-logging.basicConfig(
-    level=logging.DEBUG,  # Changed to DEBUG for more detailed logging
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+# Makes the transport helpers shared with tools/vault_tool.py importable
+import _paths  # noqa: F401
+
+# hvac, requests and the sibling modules are imported where they are used,
+# so importing this module (e.g. for its constants) stays cheap
+if TYPE_CHECKING:
+    from kv_refresher import KVRefresher, Subscriber
+    from lease_manager import LeaseManager
+    from secret_cache import SecretCache
+    from vault_metrics import VaultMetrics
+    from vault_policy import PolicyEvaluator, PolicyRule
+    from vault_transport import SingleFlight, VaultCluster
+
+# Logging is configured by main() (or the importing application), not on import
 logger = logging.getLogger(__name__)
 
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+
+def give_up_errors() -> Tuple[type, ...]:
+    """
+    Errors that end a read or write at once instead of trying the next
+    strategy: the caller's budget is spent, Vault is unreachable, or it is
+    shedding load and more attempts would only add to it
+    """
+    import hvac
+    from vault_transport import CircuitOpenError, DeadlineExceeded, QueueTimeout
+    
+    return (
+        DeadlineExceeded,
+        CircuitOpenError,
+        QueueTimeout,
+        hvac.exceptions.RateLimitExceeded,
+        hvac.exceptions.VaultDown,
+    )
+
+
+# Default limits of one transit batch request; Vault's default maximum
+# request size is 32 MiB
+TRANSIT_MAX_BATCH_ITEMS = 500
+TRANSIT_MAX_BATCH_BYTES = 1024 * 1024
+
+# Process-wide coalescing of concurrent identical logins and reads, keyed by
+# (operation, vault_url, namespace, path, role_id, secret_id digest) plus the
+# token digest for reads; created on first use
+_single_flight: Optional['SingleFlight'] = None
+_single_flight_lock = threading.Lock()
+
+
+def single_flight() -> 'SingleFlight':
+    """Return the process-wide SingleFlight shared by every client"""
+    global _single_flight
+    if _single_flight is None:
+        from vault_transport import SingleFlight
+        
+        with _single_flight_lock:
+            if _single_flight is None:
+                _single_flight = SingleFlight()
+    return _single_flight
+
+
+class BulkReadResult(NamedTuple):
+    """Partial result of a bulk read: secrets that were read and per-path errors"""
+    secrets: Dict[str, Dict[str, Any]]
+    errors: Dict[str, str]
+
+
+class BulkWriteResult(NamedTuple):
+    """Partial result of a bulk write: paths fully written and per-path errors"""
+    written: List[str]
+    errors: Dict[str, str]
+
 
 class VaultAppRoleAuth:
     """HashiCorp Vault AppRole authentication client"""
@@ -36,18 +107,71 @@ class VaultAppRoleAuth:
         namespace: str,
         role_id: str,
         secret_id: str,
-        verify_ssl: bool = True
+        verify_ssl: bool = True,
+        mount_cache_ttl: float = 300,
+        secret_cache: Optional['SecretCache'] = None,
+        max_concurrency: int = 8,
+        diagnose_on_auth: bool = False,
+        metrics: Optional['VaultMetrics'] = None,
+        max_retries: Optional[int] = None,
+        prefetch_on_auth: bool = False,
+        policy_dir: Optional[str] = None,
+        policy_check: bool = False,
+        policy_identity: Optional[Dict[str, str]] = None,
+        negative_cache_ttl: Optional[float] = None,
+        adaptive_limit: bool = False,
+        snapshot_path: Optional[str] = None,
+        snapshot_max_age: float = 3600,
+        refresh_interval: float = 30,
+        refresh_list_interval: float = 300
     ):
         """
         Initialize Vault client with AppRole authentication
         
         Args:
-            vault_url: Vault server URL (e.g., https://vault.example.com:8200)
+            vault_url: Vault server URL (e.g., https://vault.example.com:8200), or a
+                comma-separated list of cluster node URLs to spread requests over
+                (see vault_transport.VaultCluster)
             namespace: Vault namespace
             role_id: AppRole role ID
             secret_id: AppRole secret ID
             verify_ssl: Whether to verify SSL certificates
+            mount_cache_ttl: Seconds a resolved mount/KV version is reused
+            secret_cache: Optional read-through cache for read_secret()
+            max_concurrency: Default number of parallel requests (and pooled
+                connections) used by the bulk read APIs
+            diagnose_on_auth: Run diagnose() after every authentication
+                (adds lookup-self and mount listing round trips)
+            metrics: Optional VaultMetrics registry; instrumentation is skipped when None
+            max_retries: Optional retries for transient failures of idempotent
+                requests (see vault_transport.ResilientSession); None disables
+                them, except for failing over between cluster nodes
+            prefetch_on_auth: Run prefetch() after every authentication; a
+                SecretCache is created when secret_cache is not given
+            policy_dir: Directory of <policy>.hcl files used by prefetch() and
+                policy_check instead of reading policies from sys/policy
+            policy_check: Compile the token's policies after every authentication
+                and skip requests they are certain to deny (see vault_policy.PolicyEvaluator)
+            policy_identity: ACL templating parameters for policy_check
+                (e.g. {'identity.entity.name': 'alice'}); identity.entity.id
+                is taken from the login response
+            negative_cache_ttl: Optional seconds a missing or forbidden path is
+                remembered per token policy set, so repeated reads of it fail
+                without a round trip; not remembered when None
+            adaptive_limit: Whether to limit requests in flight with a vault_transport.AdaptiveLimiter
+                that backs off when Vault rate-limit quotas answer 429 (or 503)
+            snapshot_path: File for the encrypted warm-start snapshot used by
+                warm_start() and save_snapshot(); a SecretCache is created when
+                secret_cache is not given
+            snapshot_max_age: Seconds after which a snapshot is too old to load
+            refresh_interval: Seconds between KV v2 metadata polls of secrets
+                watched with watch_secret() or watch_tree()
+            refresh_list_interval: Seconds between LISTs of the prefixes
+                watched with watch_tree(), to find secrets created since
         """
+        from secret_cache import NegativeCache, SecretCache
+        from vault_transport import AdaptiveLimiter
+        
         self.vault_url = vault_url
         self.namespace = namespace
         self.role_id = role_id
@@ -55,6 +179,106 @@ class VaultAppRoleAuth:
         self.verify_ssl = verify_ssl
         self.client = None
         self.token = None
+        self.token_policies: List[str] = []
+        self.token_ttl = 0
+        self.token_renewable = False
+        self.token_entity_id = ''
+        self.diagnose_on_auth = diagnose_on_auth
+        self.metrics = metrics
+        self.max_retries = max_retries
+        # Kept across re-authentication, so the learned limit survives new sessions
+        self.limiter = AdaptiveLimiter(initial_limit=max(2 * max_concurrency, 16)) if adaptive_limit else None
+        self._renewal_thread = None
+        self._renewal_stop = threading.Event()
+        self.cluster: Optional['VaultCluster'] = None
+        self.leases: Optional['LeaseManager'] = None
+        self._leases_lock = threading.Lock()
+        self.refresh_interval = refresh_interval
+        self.refresh_list_interval = refresh_list_interval
+        self.refresher: Optional['KVRefresher'] = None
+        self._refresher_lock = threading.Lock()
+        self.mount_cache_ttl = mount_cache_ttl
+        self._mount_versions: Dict[str, Tuple[Any, float]] = {}
+        self._prefix_mounts: Dict[str, Tuple[str, Optional[int], float]] = {}
+        self._mount_cache_lock = threading.Lock()
+        self.prefetch_on_auth = prefetch_on_auth
+        self.policy_dir = policy_dir
+        self.policy_check = policy_check
+        self.policy_identity = policy_identity or {}
+        self.policy_evaluator: Optional['PolicyEvaluator'] = None
+        if (prefetch_on_auth or snapshot_path) and secret_cache is None:
+            secret_cache = SecretCache()
+        self.secret_cache = secret_cache
+        self.negative_cache = NegativeCache(ttl=negative_cache_ttl) if negative_cache_ttl else None
+        self.max_concurrency = max_concurrency
+        self.snapshot_path = snapshot_path
+        self.snapshot_max_age = snapshot_max_age
+        # Cleared while warm_start() authenticates in the background
+        self._warm_ready = threading.Event()
+        self._warm_ready.set()
+        self._warm_thread: Optional[threading.Thread] = None
+        
+    def _timed(self, operation: str, fn, mount: str = '', version: Any = ''):
+        """
+        Run a Vault call, recording its duration and outcome when metrics are enabled
+        
+        Args:
+            operation: Operation name (login, read, write, patch, renew, lookup, list, metadata)
+            fn: Callable performing the request
+            mount: Mount point the request targets
+            version: KV engine version of the mount
+            
+        Returns:
+            The result of fn
+        """
+        if self.metrics is None:
+            return fn()
+        from vault_metrics import outcome_for
+        
+        start = time.perf_counter()
+        try:
+            result = fn()
+        except Exception as e:
+            self.metrics.observe(operation, time.perf_counter() - start, mount, version, outcome_for(e))
+            raise
+        self.metrics.observe(operation, time.perf_counter() - start, mount, version)
+        return result
+    
+    def _count_retry(self, method: str, url: str):
+        """ResilientSession retry hook"""
+        logger.debug("Retrying %s %s", method, url)
+        if self.metrics is not None:
+            self.metrics.inc('retries', method=method)
+    
+    def _secret_digest(self) -> str:
+        """Digest of the secret ID, so single-flight keys never hold the secret itself"""
+        return hashlib.sha256(self.secret_id.encode()).hexdigest()
+    
+    def _login(self) -> Dict[str, Any]:
+        """
+        Perform an AppRole login and install the resulting token on the client
+        
+        Concurrent logins with the same credentials against the same Vault
+        and namespace share one request.
+        
+        Returns:
+            Dict containing the 'auth' block of the login response
+        """
+        auth_response = single_flight().do(
+            ('login', self.vault_url, self.namespace, 'auth/approle/login', self.role_id, self._secret_digest()),
+            lambda: self._timed('login', lambda: self.client.auth.approle.login(
+                role_id=self.role_id,
+                secret_id=self.secret_id
+            ), mount='approle')
+        )
+        auth = auth_response['auth']
+        self.token = auth['client_token']
+        self.client.token = self.token
+        self.token_policies = auth.get('policies') or []
+        self.token_ttl = auth.get('lease_duration', 0)
+        self.token_renewable = auth.get('renewable', False)
+        self.token_entity_id = auth.get('entity_id') or ''
+        return auth
         
     def authenticate(self) -> bool:
         """
@@ -63,64 +287,117 @@ class VaultAppRoleAuth:
         Returns:
             bool: True if authentication successful, False otherwise
         """
+        import hvac
+        from requests.adapters import HTTPAdapter
+        from vault_transport import ClusterSession, ResilientSession, VaultCluster
+
         try:
-            # Initialize Vault client
+            # Initialize Vault client with a connection pool large enough for
+            # the bulk read APIs. The session honours deadline() budgets,
+            # retries safe requests and fails fast while Vault is down.
+            addresses = VaultCluster.parse_addresses(self.vault_url)
+            vault_url = addresses[0]
+            if len(addresses) > 1:
+                # Reads go to healthy standbys, writes and logins to the active node
+                if self.cluster:
+                    self.cluster.stop()
+                self.cluster = VaultCluster(addresses, verify=self.verify_ssl)
+                self.cluster.start()
+                session = ClusterSession(
+                    self.cluster,
+                    max_retries=max(self.max_retries or 0, len(addresses)),
+                    on_retry=self._count_retry,
+                    limiter=self.limiter
+                )
+            else:
+                session = ResilientSession(
+                    max_retries=self.max_retries or 0,
+                    on_retry=self._count_retry,
+                    limiter=self.limiter
+                )
+            adapter = HTTPAdapter(pool_maxsize=self.max_concurrency)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            if vault_url.startswith('unix://'):
+                # A local vault_proxy.py listening on a unix socket
+                from vault_transport import unix_socket_client_url
+                vault_url = unix_socket_client_url(vault_url, session, self.max_concurrency)
             self.client = hvac.Client(
-                url=self.vault_url,
+                url=vault_url,
                 verify=self.verify_ssl,
-                namespace=self.namespace
+                namespace=self.namespace,
+                session=session
             )
             
-            # Authenticate using AppRole
+            # Authenticate using AppRole and set token for subsequent requests
             logger.info("Authenticating with AppRole...")
-            auth_response = self.client.auth.approle.login(
-                role_id=self.role_id,
-                secret_id=self.secret_id
-            )
-            
-            # Debug: Log the auth response
-            logger.debug(f"Auth response: {auth_response}")
+            self._login()
             
-            # Extract token from response
-            self.token = auth_response['auth']['client_token']
-            
-            # Set token for subsequent requests
-            self.client.token = self.token
-            
-            # Verify authentication by checking token
-            if self.client.is_authenticated():
-                logger.info("Successfully authenticated with Vault")
-                self._log_token_info()
-                self._debug_available_mounts()
-                return True
-            else:
-                logger.error("Authentication failed - token invalid")
-                return False
+            # Token details come straight from the login response; no extra
+            # round trips are made unless diagnostics are requested
+            logger.info("Successfully authenticated with Vault")
+            logger.info("Token policies: %s", self.token_policies)
+            logger.info("Token TTL: %s seconds", self.token_ttl)
+            logger.info("Token renewable: %s", self.token_renewable)
+            if self.policy_check:
+                self.compile_policies()
+            if self.diagnose_on_auth:
+                self.diagnose()
+            if self.prefetch_on_auth:
+                try:
+                    self.prefetch()
+                except Exception as e:
+                    logger.warning("Secret prefetch failed: %s", e)
+            return True
                 
         except hvac.exceptions.InvalidRequest as e:
-            logger.error(f"Invalid request during authentication: {e}")
+            logger.error("Invalid request during authentication: %s", e)
             return False
         except hvac.exceptions.Forbidden as e:
-            logger.error(f"Forbidden - check AppRole permissions: {e}")
+            logger.error("Forbidden - check AppRole permissions: %s", e)
             return False
         except hvac.exceptions.VaultError as e:
-            logger.error(f"Vault error during authentication: {e}")
+            logger.error("Vault error during authentication: %s", e)
             return False
         except Exception as e:
-            logger.error(f"Unexpected error during authentication: {e}")
+            logger.error("Unexpected error during authentication: %s", e)
             return False
     
-    def _log_token_info(self):
+    def diagnose(self) -> Dict[str, Any]:
+        """
+        Verify the token and log diagnostic information
+        
+        Makes several round trips (lookup-self, mount listing and possibly a
+        capabilities check), so it is meant for troubleshooting rather than
+        the request path.
+        
+        Returns:
+            Dict with 'authenticated', 'token' (lookup-self data) and
+            'mounts' (mounted secrets engines) entries
+        """
+        if not self.client or not self.token:
+            logger.error("Not authenticated with Vault")
+            return {'authenticated': False, 'token': None, 'mounts': None}
+            
+        return {
+            'authenticated': self.client.is_authenticated(),
+            'token': self._log_token_info(),
+            'mounts': self._debug_available_mounts(),
+        }
+    
+    def _log_token_info(self) -> Optional[Dict[str, Any]]:
         """Log information about the current token"""
         try:
-            token_info = self.client.auth.token.lookup_self()
-            logger.info(f"Token policies: {token_info['data'].get('policies', [])}")
-            logger.info(f"Token TTL: {token_info['data'].get('ttl', 'N/A')} seconds")
-            logger.info(f"Token renewable: {token_info['data'].get('renewable', False)}")
+            token_info = self._timed('lookup', self.client.auth.token.lookup_self)
+            logger.info("Token policies: %s", token_info['data'].get('policies', []))
+            logger.info("Token TTL: %s seconds", token_info['data'].get('ttl', 'N/A'))
+            logger.info("Token renewable: %s", token_info['data'].get('renewable', False))
+            return token_info['data']
         except Exception as e:
-            logger.warning(f"Could not retrieve token info: {e}")
+            logger.warning("Could not retrieve token info: %s", e)
+            return None
     
-    def _debug_available_mounts(self):
+    def _debug_available_mounts(self) -> Optional[Dict[str, Any]]:
         """Debug method to log available secret mounts"""
         try:
             mounts = self.client.sys.list_mounted_secrets_engines()
@@ -129,77 +406,308 @@ class VaultAppRoleAuth:
                 for mount_path, mount_info in mounts.items():
                     if isinstance(mount_info, dict):
                         mount_type = mount_info.get('type', 'unknown')
-                        logger.info(f"  - {mount_path} (type: {mount_type})")
+                        logger.info("  - %s (type: %s)", mount_path, mount_type)
                     else:
-                        logger.info(f"  - {mount_path} (info: {mount_info})")
+                        logger.info("  - %s (info: %s)", mount_path, mount_info)
             else:
-                logger.info(f"Mounts response: {mounts}")
+                logger.info("Mounts response: %s", mounts)
+            return mounts
         except Exception as e:
-            logger.warning(f"Could not retrieve mounted secret engines: {e}")
+            logger.warning("Could not retrieve mounted secret engines: %s", e)
             # Try to get some basic info about the token's capabilities
+            if self.policy_evaluator is not None:
+                capabilities = sorted(self.policy_evaluator.capabilities('secret/'))
+                logger.info("Capabilities for 'secret/' path (local policy check): %s", capabilities)
+                return None
             try:
                 capabilities = self.client.sys.get_capabilities('secret/')
-                logger.info(f"Capabilities for 'secret/' path: {capabilities}")
+                logger.info("Capabilities for 'secret/' path: %s", capabilities)
             except Exception as cap_error:
-                logger.warning(f"Could not check capabilities for 'secret/' path: {cap_error}")
+                logger.warning("Could not check capabilities for 'secret/' path: %s", cap_error)
+            return None
+    
+    def _mount_version(self, mount: str) -> Any:
+        """
+        Return the KV version of a mount, discovering it once per mount_cache_ttl
+        
+        Args:
+            mount: Mount point (e.g., 'kv')
+            
+        Returns:
+            The KV version (1 or 2), None for a non-KV engine, or
+            MOUNT_UNKNOWN if sys/internal/ui/mounts could not answer
+        """
+        with self._mount_cache_lock:
+            cached = self._mount_versions.get(mount)
+        if cached and cached[1] > time.monotonic():
+            return cached[0]
+            
+        version = MOUNT_UNKNOWN
+        try:
+            response = self.client.adapter.get(f"/v1/sys/internal/ui/mounts/{mount}")
+            data = (response or {}).get('data') or {}
+            if data.get('type') == 'kv':
+                version = int((data.get('options') or {}).get('version') or 1)
+            elif data.get('type'):
+                version = None
+            logger.debug("Discovered mount %s/ (type: %s, KV version: %s)", mount, data.get('type'), version)
+        except Exception as e:
+            logger.debug("Could not discover mount %s/: %s", mount, e)
+            
+        with self._mount_cache_lock:
+            self._mount_versions[mount] = (version, time.monotonic() + self.mount_cache_ttl)
+        return version
+    
+    def _strategies_for(self, path: str) -> List[Tuple[str, Optional[int]]]:
+        """
+        Build the ordered (mount point, KV version) strategies for a path
+        
+        The strategy that last succeeded for the path prefix (first path
+        segment) comes first, followed by one strategy per candidate mount
+        whose engine version is known. Mounts that could not be discovered
+        fall back to every KV_STRATEGIES entry for that mount.
+        
+        Args:
+            path: Secret path (e.g., 'myapp/config')
+            
+        Returns:
+            List of (mount point, KV version) tuples to try in order
+        """
+        strategies = []
+        with self._mount_cache_lock:
+            remembered = self._prefix_mounts.get(path.split('/', 1)[0])
+        if remembered and remembered[2] > time.monotonic():
+            strategies.append((remembered[0], remembered[1]))
+            
+        for mount in KV_MOUNT_POINTS:
+            version = self._mount_version(mount)
+            if version is MOUNT_UNKNOWN:
+                candidates = [s for s in KV_STRATEGIES if s[0] == mount]
+            else:
+                candidates = [(mount, version)]
+            strategies.extend(s for s in candidates if s not in strategies)
+        return strategies
+    
+    def _remember_mount(self, path: str, mount: str, version: Optional[int]):
+        """Remember the strategy that served a path for its prefix"""
+        with self._mount_cache_lock:
+            self._prefix_mounts[path.split('/', 1)[0]] = (
+                mount, version, time.monotonic() + self.mount_cache_ttl
+            )
+    
+    @staticmethod
+    def _api_path(mount: str, version: Optional[int], path: str) -> str:
+        """API path (without /v1/) of a secret on a specific mount and KV version"""
+        return f"{mount}/data/{path}" if version == 2 else f"{mount}/{path}"
+    
+    def _read_with(self, mount: str, version: Optional[int], path: str) -> Optional[Dict[str, Any]]:
+        """Read a secret from a specific mount and KV version"""
+        if version == 2:
+            return self.client.secrets.kv.v2.read_secret_version(path=path, mount_point=mount)
+        if version == 1:
+            return self.client.secrets.kv.v1.read_secret(path=path, mount_point=mount)
+        return self.client.read(f"{mount}/{path}")
+    
+    def _write_with(self, mount: str, version: Optional[int], path: str, secret: Dict[str, Any]):
+        """Write a secret to a specific mount and KV version"""
+        if version == 2:
+            return self.client.secrets.kv.v2.create_or_update_secret(path=path, secret=secret, mount_point=mount)
+        if version == 1:
+            return self.client.secrets.kv.v1.create_or_update_secret(path=path, secret=secret, mount_point=mount)
+        return self.client.write(f"{mount}/{path}", **secret)
+    
+    @staticmethod
+    def _unwrap_secret(response: Any) -> Optional[Dict[str, Any]]:
+        """Extract secret data from a KV v1, KV v2 or raw read response"""
+        # Handle different response formats
+        if response and 'data' in response:
+            if 'data' in response['data']:  # KV v2
+                logger.info("Successfully read secret using KV v2")
+                return response['data']['data']
+            else:  # KV v1 or other
+                logger.info("Successfully read secret using KV v1 or direct read")
+                return response['data']
+        elif response:
+            logger.info("Successfully read secret (raw response)")
+            return response
+        return None
+    
+    def _cache_secret(self, path: str, response: Dict[str, Any], secret: Dict[str, Any], generation: int):
+        """
+        Store a read in the secret cache with a lease-aware TTL
+        
+        KV v1 and dynamic reads carry a lease_duration which bounds the TTL;
+        KV v2 reads have none and use the cache default, keyed to the
+        metadata version they were read at. The read is not cached if the
+        path was invalidated after generation was taken.
+        """
+        lease_duration = response.get('lease_duration') or None
+        metadata = (response.get('data') or {}).get('metadata')
+        version = metadata.get('version') if isinstance(metadata, dict) else None
+        ttl = self.secret_cache.default_ttl
+        if lease_duration:
+            ttl = min(ttl, lease_duration)
+        self.secret_cache.put(path, secret, ttl=ttl, version=version, generation=generation)
     
     def read_secret(self, path: str) -> Optional[Dict[str, Any]]:
         """
         Read a secret from Vault
         
+        The engine version of each candidate mount is discovered once and
+        the mount that last served the path prefix is tried first, so a
+        steady-state read costs a single request.
+        
         Args:
             path: Secret path (e.g., 'myapp/config')
             
         Returns:
             Dict containing secret data or None if error
         """
-        if not self.client or not self.client.is_authenticated():
-            logger.error("Not authenticated with Vault")
+        if self.secret_cache:
+            secret = self.secret_cache.get(path)
+            if self.metrics is not None:
+                self.metrics.inc('cache_hits' if secret is not None else 'cache_misses')
+            if secret is not None:
+                logger.debug("Secret cache hit for path: %s", path)
+                return secret
+        if self.negative_cache:
+            reason = self.negative_cache.get(tuple(sorted(self.token_policies)), path)
+            if reason is not None:
+                logger.debug("Negative cache hit for path: %s (%s)", path, reason)
+                if self.metrics is not None:
+                    self.metrics.inc('negative_cache_hits', reason=reason)
+                return None
+                
+        # Concurrent reads of the same path with the same token share one upstream read
+        token_digest = hashlib.sha256(self.token.encode()).hexdigest() if self.token else ''
+        return single_flight().do(
+            ('read', self.vault_url, self.namespace, path, self.role_id, self._secret_digest(), token_digest),
+            lambda: self._read_from_vault(path)
+        )
+    
+    def refresh_secret(self, path: str) -> Optional[Dict[str, Any]]:
+        """
+        Reread a secret from Vault, bypassing the secret and negative caches
+        
+        The secret cache is updated with the fresh copy.
+        
+        Args:
+            path: Secret path (e.g., 'myapp/config')
+            
+        Returns:
+            Dict containing secret data or None if error
+        """
+        if self.negative_cache:
+            self.negative_cache.invalidate(path)
+        return self._read_from_vault(path)
+    
+    def read_secret_metadata(self, path: str) -> Optional[Dict[str, Any]]:
+        """
+        Read the KV v2 metadata of a secret (current_version, versions, ...)
+        
+        Only a path last served by, or first tried on, a KV v2 mount has
+        metadata; each of its KV v2 mounts is tried in turn.
+        
+        Args:
+            path: Secret path (e.g., 'myapp/config')
+            
+        Returns:
+            The metadata, {} when no KV v2 mount holds the path, or None
+            when the path has no readable KV v2 metadata
+            
+        Raises:
+            Exception: If Vault could not answer (e.g. a timeout)
+        """
+        import hvac
+        
+        strategies = self._strategies_for(path)
+        if not strategies or strategies[0][1] != 2:
             return None
+        missing = False
+        for mount in [m for m, version in strategies if version == 2]:
+            if self._denied(f"{mount}/metadata/{path}", 'read'):
+                continue
+            try:
+                response = self._timed('metadata', lambda: self.client.secrets.kv.v2.read_secret_metadata(
+                    path=path, mount_point=mount), mount, 2)
+            except hvac.exceptions.InvalidPath:
+                missing = True
+                continue
+            except hvac.exceptions.Forbidden:
+                continue
+            return (response or {}).get('data') or {}
+        return {} if missing else None
+    
+    def _read_from_vault(self, path: str) -> Optional[Dict[str, Any]]:
+        """Read a secret from Vault, bypassing the secret cache"""
+        return self._read_outcome(path)[0]
+    
+    def _read_outcome(self, path: str) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """
+        Read a secret from Vault, bypassing the secret cache
+        
+        Returns:
+            Tuple of (secret, None) when the read succeeded, (None, 'not_found')
+            or (None, 'forbidden') when every strategy definitely failed, and
+            (None, None) when the outcome is unknown (timeouts, 5xx, not
+            authenticated)
+        """
+        import hvac
+        
+        # Cache misses during a warm start wait for the background login
+        self._warm_ready.wait()
+        if not self.client or not self.token:
+            logger.error("Not authenticated with Vault")
+            return None, None
             
-        # Try different secret engine approaches
-        attempts = [
-            # KV v2 with kv/ mount
-            lambda: self.client.secrets.kv.v2.read_secret_version(path=path, mount_point='kv'),
-            # KV v2 with secret/ mount
-            lambda: self.client.secrets.kv.v2.read_secret_version(path=path),
-            # KV v1 with kv/ mount  
-            lambda: self.client.secrets.kv.v1.read_secret(path=path, mount_point='kv'),
-            # KV v1 with secret/ mount
-            lambda: self.client.secrets.kv.v1.read_secret(path=path),
-            # Direct read (for other engines)
-            lambda: self.client.read(f"secret/{path}"),
-        ]
+        # A write that lands while the read is in flight keeps its result out of the cache
+        cache_generation = self.secret_cache.generation(path) if self.secret_cache else None
+        # Outcomes of the failed attempts; the read is remembered as failed
+        # only if every attempt was a definite not-found or permission denial
+        generation = self.negative_cache.generation() if self.negative_cache else None
+        failures = set()
         
-        for i, attempt in enumerate(attempts):
+        # Try different secret engine approaches
+        for i, (mount, version) in enumerate(self._strategies_for(path)):
+            if self._denied(self._api_path(mount, version, path), 'read'):
+                failures.add('forbidden')
+                continue
+            if i and self.metrics is not None:
+                self.metrics.inc('fallback_attempts', operation='read')
             try:
-                logger.info(f"Reading secret from path: {path} (attempt {i+1})")
-                response = attempt()
-                
-                # Handle different response formats
-                if response and 'data' in response:
-                    if 'data' in response['data']:  # KV v2
-                        logger.info(f"Successfully read secret using KV v2")
-                        return response['data']['data']
-                    else:  # KV v1 or other
-                        logger.info(f"Successfully read secret using KV v1 or direct read")
-                        return response['data']
-                elif response:
-                    logger.info(f"Successfully read secret (raw response)")
-                    return response
+                logger.info("Reading secret from path: %s/%s (attempt %d)", mount, path, i + 1)
+                response = self._timed('read', lambda: self._read_with(mount, version, path), mount, version)
+                secret = self._unwrap_secret(response)
+                if secret is not None:
+                    self._remember_mount(path, mount, version)
+                    if self.secret_cache:
+                        self._cache_secret(path, response, secret, cache_generation)
+                    return secret, None
+                failures.add('not_found')
                     
+            except give_up_errors() as e:
+                logger.error("Giving up reading %s: %s", path, e)
+                return None, None
             except hvac.exceptions.InvalidPath:
-                logger.debug(f"Path not found with attempt {i+1}")
+                logger.debug("Path not found with attempt %d", i + 1)
+                failures.add('not_found')
                 continue
             except hvac.exceptions.Forbidden as e:
-                logger.debug(f"Permission denied with attempt {i+1}: {e}")
+                logger.debug("Permission denied with attempt %d: %s", i + 1, e)
+                failures.add('forbidden')
                 continue
             except Exception as e:
-                logger.debug(f"Error with attempt {i+1}: {e}")
+                logger.debug("Error with attempt %d: %s", i + 1, e)
+                failures.add('error')
                 continue
         
-        logger.error(f"Secret not found at path: {path} (tried all methods)")
-        return None
+        logger.error("Secret not found at path: %s (tried all methods)", path)
+        if not failures or 'error' in failures:
+            return None, None
+        reason = 'not_found' if 'not_found' in failures else 'forbidden'
+        if self.negative_cache:
+            self.negative_cache.put(tuple(sorted(self.token_policies)), path, reason, generation)
+        return None, reason
     
     def write_secret(self, path: str, secret: Dict[str, Any]) -> bool:
         """
@@ -212,40 +720,826 @@ class VaultAppRoleAuth:
         Returns:
             bool: True if successful, False otherwise
         """
-        if not self.client or not self.client.is_authenticated():
+        import hvac
+        
+        if not self.client or not self.token:
             logger.error("Not authenticated with Vault")
             return False
             
         # Try different secret engine approaches
-        attempts = [
-            # KV v2 with kv/ mount
-            lambda: self.client.secrets.kv.v2.create_or_update_secret(path=path, secret=secret, mount_point='kv'),
-            # KV v2 with secret/ mount
-            lambda: self.client.secrets.kv.v2.create_or_update_secret(path=path, secret=secret),
-            # KV v1 with kv/ mount
-            lambda: self.client.secrets.kv.v1.create_or_update_secret(path=path, secret=secret, mount_point='kv'),
-            # KV v1 with secret/ mount
-            lambda: self.client.secrets.kv.v1.create_or_update_secret(path=path, secret=secret),
-            # Direct write (for other engines)
-            lambda: self.client.write(f"secret/{path}", **secret),
-        ]
+        for i, (mount, version) in enumerate(self._strategies_for(path)):
+            if self._denied(self._api_path(mount, version, path), 'create', 'update'):
+                continue
+            if i and self.metrics is not None:
+                self.metrics.inc('fallback_attempts', operation='write')
+            try:
+                logger.info("Writing secret to path: %s/%s (attempt %d)", mount, path, i + 1)
+                self._timed('write', lambda: self._write_with(mount, version, path, secret), mount, version)
+                logger.info("Secret written successfully using method %d", i + 1)
+                self._remember_mount(path, mount, version)
+                if self.secret_cache:
+                    self.secret_cache.invalidate(path)
+                if self.negative_cache:
+                    self.negative_cache.invalidate(path)
+                return True
+            except give_up_errors() as e:
+                logger.error("Giving up writing %s: %s", path, e)
+                return False
+            except hvac.exceptions.Forbidden as e:
+                logger.debug("Permission denied with attempt %d: %s", i + 1, e)
+                continue
+            except Exception as e:
+                logger.debug("Error with attempt %d: %s", i + 1, e)
+                continue
         
-        for i, attempt in enumerate(attempts):
+        logger.error("Failed to write secret to path: %s (tried all methods)", path)
+        return False
+    
+    def _patch_with(self, mount: str, path: str, changes: Dict[str, Any], cas: Optional[int]):
+        """Send a KV v2 JSON merge patch of the changed keys only"""
+        payload: Dict[str, Any] = {'data': changes}
+        if cas is not None:
+            payload['options'] = {'cas': cas}
+        return self.client.adapter.request(
+            'PATCH', f"/v1/{mount}/data/{path}", json=payload,
+            headers={'Content-Type': 'application/merge-patch+json'}
+        )
+    
+    def _merge_write(self, mount: str, path: str, changes: Dict[str, Any], cas: Optional[int]):
+        """
+        Patch a KV v2 secret client-side: read it, merge the changes and
+        write it back with check-and-set on the version that was read
+        """
+        import hvac
+        
+        response = self._timed('read', lambda: self.client.secrets.kv.v2.read_secret_version(
+            path=path, mount_point=mount), mount, 2)
+        current = response['data']['metadata']['version']
+        if cas is not None and cas != current:
+            raise hvac.exceptions.InvalidRequest(
+                f"check-and-set parameter did not match the current version ({current})",
+                method='PUT', url=f"{mount}/data/{path}")
+        merged = dict(response['data']['data'])
+        for key, value in changes.items():
+            if value is None:
+                merged.pop(key, None)
+            else:
+                merged[key] = value
+        self._timed('write', lambda: self.client.secrets.kv.v2.create_or_update_secret(
+            path=path, secret=merged, cas=current, mount_point=mount), mount, 2)
+    
+    def patch_secret(self, path: str, changes: Dict[str, Any], cas: Optional[int] = None) -> bool:
+        """
+        Update some keys of an existing KV v2 secret, leaving the others unchanged
+        
+        Only the changed keys are sent, as a JSON merge patch (keys set to
+        None are removed). Without the `patch` capability, or on Vault
+        releases older than 1.9, the secret is read and written back with
+        check-and-set instead, so concurrent updates are never lost.
+        
+        Args:
+            path: Secret path (e.g., 'myapp/config')
+            changes: Keys to set (or remove, with a None value)
+            cas: Only apply the patch if the secret is at this version
+            
+        Returns:
+            bool: True if successful, False otherwise (including when the
+            secret does not exist or cas did not match its version)
+        """
+        import hvac
+        
+        if not self.client or not self.token:
+            logger.error("Not authenticated with Vault")
+            return False
+            
+        # Patching is a KV v2 feature; a native patch needs the patch
+        # capability, a client-side merge read and update
+        strategies = [
+            (mount, version) for mount, version in self._strategies_for(path)
+            if version == 2 and not self._denied(self._api_path(mount, version, path), 'patch', 'update')
+        ]
+        for i, (mount, version) in enumerate(strategies):
+            if i and self.metrics is not None:
+                self.metrics.inc('fallback_attempts', operation='patch')
             try:
-                logger.info(f"Writing secret to path: {path} (attempt {i+1})")
-                attempt()
-                logger.info(f"Secret written successfully using method {i+1}")
+                logger.info("Patching secret at path: %s/%s (attempt %d)", mount, path, i + 1)
+                try:
+                    self._timed('patch', lambda: self._patch_with(mount, path, changes, cas), mount, version)
+                except (hvac.exceptions.Forbidden, hvac.exceptions.UnexpectedError) as e:
+                    # 403 without the patch capability, 405 before Vault 1.9
+                    logger.debug("Native patch unavailable, merging client-side: %s", e)
+                    self._merge_write(mount, path, changes, cas)
+                logger.info("Secret patched successfully using method %d", i + 1)
+                self._remember_mount(path, mount, version)
+                if self.secret_cache:
+                    self.secret_cache.invalidate(path)
+                if self.negative_cache:
+                    self.negative_cache.invalidate(path)
                 return True
+            except give_up_errors() as e:
+                logger.error("Giving up patching %s: %s", path, e)
+                return False
+            except hvac.exceptions.InvalidRequest as e:
+                # The secret exists on this mount but is at another version
+                logger.warning("Check-and-set failed patching %s: %s", path, e)
+                if self.secret_cache:
+                    self.secret_cache.invalidate(path)
+                return False
+            except hvac.exceptions.InvalidPath:
+                logger.debug("Path not found with attempt %d", i + 1)
+                continue
             except hvac.exceptions.Forbidden as e:
-                logger.debug(f"Permission denied with attempt {i+1}: {e}")
+                logger.debug("Permission denied with attempt %d: %s", i + 1, e)
                 continue
             except Exception as e:
-                logger.debug(f"Error with attempt {i+1}: {e}")
+                logger.debug("Error with attempt %d: %s", i + 1, e)
                 continue
         
-        logger.error(f"Failed to write secret to path: {path} (tried all methods)")
+        logger.error("Failed to patch secret at path: %s (no KV v2 mount holds it)", path)
         return False
     
+    def read_secrets(self, paths: Iterable[str], max_concurrency: Optional[int] = None) -> BulkReadResult:
+        """
+        Read many secrets concurrently
+        
+        Duplicate paths are read once, and a path already being read by any
+        concurrent caller shares that request through read_secret(). Total latency is bounded
+        by the slowest read rather than the sum of all reads.
+        
+        Args:
+            paths: Secret paths (e.g., ['watsonxdemo/shared/config', ...])
+            max_concurrency: Maximum parallel reads (defaults to max_concurrency)
+            
+        Returns:
+            BulkReadResult with the secrets read and an error message per failed path
+        """
+        unique_paths = list(dict.fromkeys(paths))
+        result = BulkReadResult({}, {})
+        if not unique_paths:
+            return result
+            
+        workers = min(max_concurrency or self.max_concurrency, len(unique_paths))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='vault-read') as executor:
+            # Copy the caller's context so deadline() budgets apply to the workers
+            futures = {
+                path: executor.submit(contextvars.copy_context().run, self.read_secret, path)
+                for path in unique_paths
+            }
+            for path, future in futures.items():
+                try:
+                    secret = future.result()
+                except Exception as e:
+                    result.errors[path] = str(e)
+                    continue
+                if secret is None:
+                    result.errors[path] = "Secret not found or permission denied"
+                else:
+                    result.secrets[path] = secret
+        return result
+    
+    def write_secrets(
+        self,
+        writes: Union[Mapping[str, Dict[str, Any]], Iterable[Tuple[str, Dict[str, Any]]]],
+        max_concurrency: Optional[int] = None,
+        patch: bool = False
+    ) -> BulkWriteResult:
+        """
+        Write many secrets concurrently
+        
+        Writes to different paths run in parallel. Writes to the same path
+        run one after another in the order given, so the last one wins; once
+        one of them fails, the later ones for that path are skipped rather
+        than applied on top of an unknown state.
+        
+        Args:
+            writes: Mapping of path -> secret, or (path, secret) pairs when a
+                path is written more than once
+            max_concurrency: Maximum parallel writes (defaults to max_concurrency)
+            patch: Apply each secret as a partial update with patch_secret()
+                instead of replacing it with write_secret()
+            
+        Returns:
+            BulkWriteResult with the paths whose writes all succeeded and an
+            error message per failed path
+        """
+        items = writes.items() if isinstance(writes, Mapping) else writes
+        by_path: Dict[str, List[Dict[str, Any]]] = {}
+        for path, secret in items:
+            by_path.setdefault(path, []).append(secret)
+        result = BulkWriteResult([], {})
+        if not by_path:
+            return result
+            
+        write = self.patch_secret if patch else self.write_secret
+        
+        def write_in_order(path: str, secrets: List[Dict[str, Any]]) -> Optional[str]:
+            for n, secret in enumerate(secrets, 1):
+                if not write(path, secret):
+                    skipped = len(secrets) - n
+                    return f"Write {n} of {len(secrets)} failed" + (
+                        f"; skipped {skipped} later write(s)" if skipped else "")
+            return None
+            
+        workers = min(max_concurrency or self.max_concurrency, len(by_path))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='vault-write') as executor:
+            # Copy the caller's context so deadline() budgets apply to the workers
+            futures = {
+                path: executor.submit(contextvars.copy_context().run, write_in_order, path, secrets)
+                for path, secrets in by_path.items()
+            }
+            for path, future in futures.items():
+                try:
+                    error = future.result()
+                except Exception as e:
+                    error = str(e)
+                if error is None:
+                    result.written.append(path)
+                else:
+                    result.errors[path] = error
+        return result
+    
+    def _list_with(self, mount: str, version: Optional[int], path: str) -> List[str]:
+        """List the keys under a folder on a specific mount and KV version"""
+        if version == 2:
+            response = self._timed('list', lambda: self.client.secrets.kv.v2.list_secrets(
+                path=path, mount_point=mount), mount, version)
+        elif version == 1:
+            response = self._timed('list', lambda: self.client.secrets.kv.v1.list_secrets(
+                path=path, mount_point=mount), mount, version)
+        else:
+            response = self._timed('list', lambda: self.client.list(f"{mount}/{path}"), mount, version)
+        return ((response or {}).get('data') or {}).get('keys', [])
+    
+    def list_tree(
+        self,
+        prefix: str,
+        max_concurrency: Optional[int] = None,
+        errors: Optional[Dict[str, str]] = None,
+        mount: Optional[str] = None
+    ) -> List[str]:
+        """
+        Recursively list every secret path under a prefix
+        
+        Folders on the same level are listed concurrently. A folder that
+        cannot be listed is skipped, so the result may be partial.
+        
+        Args:
+            prefix: Folder path (e.g., 'watsonxdemo/shared')
+            max_concurrency: Maximum parallel LIST requests
+            errors: Optional dict receiving an error message per folder
+                that could not be listed
+            mount: List only on this KV v2 mount instead of trying every
+                mount strategy
+            
+        Returns:
+            List of secret paths under the prefix
+        """
+        prefix = prefix.strip('/')
+        remember = mount is None
+        strategies = self._strategies_for(prefix) if remember else [(mount, 2)]
+        for mount, version in strategies:
+            try:
+                keys = self._list_with(mount, version, prefix)
+            except Exception as e:
+                logger.debug("Could not list %s/%s: %s", mount, prefix, e)
+                continue
+            if remember:
+                self._remember_mount(prefix, mount, version)
+            break
+        else:
+            logger.error("Could not list secrets under: %s", prefix)
+            if errors is not None:
+                errors[f"{prefix}/"] = "Folder not found or permission denied"
+            return []
+            
+        paths = []
+        folders = []
+        for key in keys:
+            (folders if key.endswith('/') else paths).append(f"{prefix}/{key}")
+        with ThreadPoolExecutor(max_workers=max_concurrency or self.max_concurrency,
+                                thread_name_prefix='vault-list') as executor:
+            while folders:
+                listed = [
+                    (folder, executor.submit(contextvars.copy_context().run,
+                                             self._list_with, mount, version, folder.rstrip('/')))
+                    for folder in folders
+                ]
+                folders = []
+                for folder, future in listed:
+                    try:
+                        keys = future.result()
+                    except Exception as e:
+                        logger.warning("Could not list %s/%s: %s", mount, folder, e)
+                        if errors is not None:
+                            errors[folder] = str(e)
+                        continue
+                    for key in keys:
+                        (folders if key.endswith('/') else paths).append(f"{folder}{key}")
+        return paths
+    
+    def read_tree(self, prefix: str, max_concurrency: Optional[int] = None) -> BulkReadResult:
+        """
+        Read every secret under a prefix concurrently
+        
+        Args:
+            prefix: Folder path (e.g., 'watsonxdemo/shared')
+            max_concurrency: Maximum parallel requests
+            
+        Returns:
+            BulkReadResult keyed by full secret path; folders that could not
+            be listed are reported in errors under their path ending in '/'
+        """
+        errors: Dict[str, str] = {}
+        result = self.read_secrets(self.list_tree(prefix, max_concurrency, errors), max_concurrency)
+        result.errors.update(errors)
+        return result
+    
+    def _load_policies(self, policies: Iterable[str]) -> Dict[str, List['PolicyRule']]:
+        """Load the given policies from policy_dir or sys/policy; unreadable ones are left out"""
+        from vault_policy import load_policy_files, parse_policy
+        
+        if self.policy_dir:
+            return load_policy_files(self.policy_dir, policies)
+            
+        loaded = {}
+        for name in policies:
+            try:
+                response = self.client.sys.read_policy(name=name)
+            except Exception as e:
+                logger.debug("Could not read policy %s: %s", name, e)
+                continue
+            document = ((response or {}).get('data') or {}).get('rules') or ''
+            loaded[name] = parse_policy(document)
+        return loaded
+    
+    def _policy_rules(self, policies: Iterable[str]) -> List['PolicyRule']:
+        """Load the rules of the given policies from policy_dir or sys/policy"""
+        return [rule for rules in self._load_policies(policies).values() for rule in rules]
+    
+    def compile_policies(self) -> Optional['PolicyEvaluator']:
+        """
+        Compile the token's policies into a local evaluator
+        
+        Requests the evaluator is certain Vault would deny are then skipped
+        without a round trip. The built-in default policy grants nothing on
+        secrets engine mounts, so it may be missing from policy_dir; if any
+        other policy cannot be loaded, local checks are disabled.
+        
+        Returns:
+            The PolicyEvaluator, or None if local checks are disabled
+        """
+        self.policy_evaluator = None
+        if not self.client or not self.token or 'root' in self.token_policies:
+            return None
+        loaded = self._load_policies(self.token_policies)
+        missing = [name for name in self.token_policies if name not in loaded and name != 'default']
+        if missing:
+            logger.warning("Local policy checks disabled; could not load policies: %s", missing)
+            return None
+        identity = dict(self.policy_identity)
+        if self.token_entity_id:
+            identity.setdefault('identity.entity.id', self.token_entity_id)
+        from vault_policy import PolicyEvaluator
+        
+        self.policy_evaluator = PolicyEvaluator(
+            (rule for rules in loaded.values() for rule in rules), identity
+        )
+        logger.info("Compiled %s policies for local policy checks", len(loaded))
+        return self.policy_evaluator
+    
+    def _denied(self, api_path: str, *capabilities: str) -> bool:
+        """
+        Whether the local policy evaluator is certain Vault would deny all
+        the given capabilities on an API path
+        """
+        if self.policy_evaluator is None:
+            return False
+        granted = self.policy_evaluator.capabilities(api_path)
+        if any(c in granted for c in capabilities):
+            return False
+        logger.debug("Skipping %s: denied by local policy check", api_path)
+        if self.metrics is not None:
+            self.metrics.inc('policy_denied')
+        return True
+    
+    def _read_granted(self, path: str, mounts: List[str]) -> Optional[Dict[str, Any]]:
+        """
+        Read a secret from the first of the given KV v2 mounts that holds it
+        
+        Unlike read_secret(), no other mount strategy is tried. The read is
+        stored in the secret cache.
+        """
+        import hvac
+        
+        cache_generation = self.secret_cache.generation(path) if self.secret_cache else None
+        for mount in mounts:
+            if self._denied(self._api_path(mount, 2, path), 'read'):
+                continue
+            try:
+                response = self._timed('read', lambda: self._read_with(mount, 2, path), mount, 2)
+            except (hvac.exceptions.InvalidPath, hvac.exceptions.Forbidden) as e:
+                logger.debug("Could not read %s/%s: %s", mount, path, e)
+                continue
+            secret = self._unwrap_secret(response)
+            if secret is not None:
+                if self.secret_cache:
+                    self._cache_secret(path, response, secret, cache_generation)
+                return secret
+        return None
+    
+    def prefetch(self, max_secrets: int = 256, max_concurrency: Optional[int] = None) -> BulkReadResult:
+        """
+        Warm the secret cache with every KV secret the token's policies can read
+        
+        The token's policies are parsed for KV v2 read grants on the mounts
+        read_secret() uses. Prefix grants (e.g. kv/data/watsonxdemo/shared/*)
+        are expanded through metadata LIST calls on the grant's mount, paths
+        matching a deny rule on the same mount are dropped, and the remaining
+        secrets are read in parallel from their grant's mount only, so they
+        land in the secret cache. A path granted on several mounts is read
+        from them in read_secret()'s strategy order.
+        
+        Args:
+            max_secrets: Maximum number of secrets to prefetch
+            max_concurrency: Maximum parallel requests (defaults to max_concurrency)
+            
+        Returns:
+            BulkReadResult of the prefetched secrets; folders that could not
+            be listed are reported in errors
+        """
+        if not self.client or not self.token:
+            logger.error("Not authenticated with Vault")
+            return BulkReadResult({}, {})
+        if not self.secret_cache:
+            logger.warning("Prefetching without a secret cache; results are not kept")
+        from vault_policy import is_denied, kv_grants
+            
+        readable, denied = kv_grants(self._policy_rules(self.token_policies))
+        # Secrets on other mounts could never be served by read_secret()
+        readable = [grant for grant in readable if grant.mount in KV_MOUNT_POINTS]
+        list_errors: Dict[str, str] = {}
+        pairs = [(grant.mount, grant.path) for grant in readable if not grant.glob]
+        prefixes = [(grant.mount, grant.path) for grant in readable if grant.glob]
+        if prefixes:
+            workers = min(max_concurrency or self.max_concurrency, len(prefixes))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='vault-prefetch') as executor:
+                # List the folder holding each prefix on its mount, then keep the matching paths
+                listed = [
+                    (mount, prefix, executor.submit(contextvars.copy_context().run, self.list_tree,
+                                                    prefix.rpartition('/')[0], max_concurrency,
+                                                    list_errors, mount))
+                    for mount, prefix in prefixes
+                ]
+                for mount, prefix, future in listed:
+                    pairs.extend((mount, path) for path in future.result() if path.startswith(prefix))
+                    
+        mounts_by_path: Dict[str, List[str]] = {}
+        for mount, path in dict.fromkeys(pairs):
+            if path and not is_denied(path, denied, mount):
+                mounts_by_path.setdefault(path, []).append(mount)
+        paths = list(mounts_by_path)
+        if len(paths) > max_secrets:
+            logger.warning("Prefetching %s of %s readable secrets", max_secrets, len(paths))
+            paths = paths[:max_secrets]
+            
+        result = BulkReadResult({}, list_errors)
+        if paths:
+            workers = min(max_concurrency or self.max_concurrency, len(paths))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='vault-read') as executor:
+                futures = {}
+                for path in paths:
+                    order = [mount for mount, _ in self._strategies_for(path)]
+                    mounts = sorted(mounts_by_path[path], key=order.index)
+                    futures[path] = executor.submit(contextvars.copy_context().run,
+                                                    self._read_granted, path, mounts)
+                for path, future in futures.items():
+                    try:
+                        secret = future.result()
+                    except Exception as e:
+                        result.errors[path] = str(e)
+                        continue
+                    if secret is None:
+                        result.errors[path] = "Secret not found or permission denied"
+                    else:
+                        result.secrets[path] = secret
+        if self.metrics is not None:
+            self.metrics.inc('prefetched', len(result.secrets))
+        logger.info("Prefetched %s secrets (%s failed)", len(result.secrets), len(result.errors))
+        return result
+    
+    @staticmethod
+    def _b64(value: Union[str, bytes]) -> str:
+        """Base64-encode a str (as UTF-8) or bytes value for the transit API"""
+        return base64.b64encode(value.encode() if isinstance(value, str) else value).decode()
+    
+    @staticmethod
+    def _transit_chunks(
+        items: Iterable[Dict[str, str]],
+        max_items: int,
+        max_bytes: int
+    ) -> Iterator[List[Dict[str, str]]]:
+        """Group batch_input items lazily into chunks within the item and byte limits"""
+        chunk, size = [], 0
+        for item in items:
+            item_size = sum(len(k) + len(v) + 6 for k, v in item.items())
+            if chunk and (len(chunk) >= max_items or size + item_size > max_bytes):
+                yield chunk
+                chunk, size = [], 0
+            chunk.append(item)
+            size += item_size
+        if chunk:
+            yield chunk
+    
+    def _transit_request(
+        self,
+        operation: str,
+        mount: str,
+        key_name: str,
+        chunk: List[Dict[str, str]],
+        field: str,
+        offset: int = 0
+    ) -> List[Optional[str]]:
+        """
+        Send one transit batch request
+        
+        Args:
+            operation: encrypt, decrypt or rewrap
+            mount: Transit mount point
+            key_name: Name of the transit key
+            chunk: batch_input items
+            field: Result field to extract from each batch result
+            offset: Input position of the first item, for log messages
+            
+        Returns:
+            The field of each result in input order, None for failed items
+        """
+        import hvac
+        
+        url = f"/v1/{mount}/{operation}/{key_name}"
+        payload = {'batch_input': chunk, 'partial_failure_response_code': 200}
+        
+        def send():
+            response = self.client.adapter.request('POST', url, json=payload, raise_exception=False)
+            if isinstance(response, dict):
+                return response
+            # Vault before 1.15 answers 400 with the batch results when any item failed
+            try:
+                body = response.json()
+            except ValueError:
+                body = {}
+            if response.status_code == 400 and (body.get('data') or {}).get('batch_results'):
+                return body
+            raise hvac.exceptions.VaultError.from_status(
+                response.status_code, '; '.join(body.get('errors') or []) or response.reason,
+                method='POST', url=url)
+                
+        results = (self._timed('transit', send, mount).get('data') or {}).get('batch_results') or []
+        values = []
+        for i, result in enumerate(results):
+            if result.get('error'):
+                logger.warning("Transit %s failed for item %s: %s", operation, offset + i, result['error'])
+                values.append(None)
+            else:
+                # An empty plaintext decrypts to '', which is a result
+                values.append(result.get(field))
+        if len(values) != len(chunk):
+            raise hvac.exceptions.UnexpectedError(
+                f"Transit {operation} returned {len(values)} results for {len(chunk)} items")
+        return values
+    
+    def _transit_batch(
+        self,
+        operation: str,
+        mount: str,
+        key_name: str,
+        items: Iterable[Dict[str, str]],
+        field: str,
+        max_items: int,
+        max_bytes: int,
+        max_concurrency: Optional[int]
+    ) -> Iterator[Optional[str]]:
+        """Send chunks of items concurrently and yield their results in input order"""
+        if not self.client or not self.token:
+            logger.error("Not authenticated with Vault")
+            for _ in items:
+                yield None
+            return
+        workers = max_concurrency or self.max_concurrency
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='vault-transit')
+        pending = deque()
+        
+        def results(future, size):
+            try:
+                return future.result()
+            except Exception as e:
+                logger.error("Transit %s of %s items failed: %s", operation, size, e)
+                return [None] * size
+                
+        offset = 0
+        try:
+            for chunk in self._transit_chunks(items, max_items, max_bytes):
+                # Copy the caller's context so deadline() budgets apply to the workers
+                pending.append((executor.submit(
+                    contextvars.copy_context().run, self._transit_request,
+                    operation, mount, key_name, chunk, field, offset
+                ), len(chunk)))
+                offset += len(chunk)
+                # Bounded read-ahead: results stream out while later chunks are in flight
+                if len(pending) >= 2 * workers:
+                    yield from results(*pending.popleft())
+            while pending:
+                yield from results(*pending.popleft())
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def encrypt_batch(
+        self,
+        key_name: str,
+        plaintexts: Iterable[Union[str, bytes]],
+        context: Optional[Union[str, bytes]] = None,
+        mount: str = 'transit',
+        max_batch_items: int = TRANSIT_MAX_BATCH_ITEMS,
+        max_batch_bytes: int = TRANSIT_MAX_BATCH_BYTES,
+        max_concurrency: Optional[int] = None
+    ) -> Iterator[Optional[str]]:
+        """
+        Encrypt many values with a transit key using batch_input
+        
+        The input is consumed lazily and split into requests of at most
+        max_batch_items items and max_batch_bytes bytes, which are sent
+        concurrently. Ciphertexts are yielded in input order as soon as the
+        request holding them completes, so large inputs stream through with
+        bounded memory.
+        
+        Args:
+            key_name: Name of the transit key
+            plaintexts: Values to encrypt (str values are encoded as UTF-8)
+            context: Key derivation context, for derived keys
+            mount: Transit mount point
+            max_batch_items: Maximum items per request
+            max_batch_bytes: Maximum approximate JSON size of the items of a request
+            max_concurrency: Maximum parallel requests (defaults to max_concurrency)
+            
+        Returns:
+            Iterator of ciphertexts (vault:v1:...), None for values that failed
+        """
+        encoded_context = self._b64(context) if context is not None else None
+        items = (
+            {'plaintext': self._b64(p), **({'context': encoded_context} if encoded_context else {})}
+            for p in plaintexts
+        )
+        return self._transit_batch('encrypt', mount, key_name, items, 'ciphertext',
+                                   max_batch_items, max_batch_bytes, max_concurrency)
+    
+    def decrypt_batch(
+        self,
+        key_name: str,
+        ciphertexts: Iterable[str],
+        context: Optional[Union[str, bytes]] = None,
+        mount: str = 'transit',
+        max_batch_items: int = TRANSIT_MAX_BATCH_ITEMS,
+        max_batch_bytes: int = TRANSIT_MAX_BATCH_BYTES,
+        max_concurrency: Optional[int] = None
+    ) -> Iterator[Optional[bytes]]:
+        """
+        Decrypt many ciphertexts with a transit key using batch_input
+        
+        Batching and ordering are the same as for encrypt_batch().
+        
+        Args:
+            key_name: Name of the transit key
+            ciphertexts: Ciphertexts returned by encrypt_batch()
+            context: Key derivation context, for derived keys
+            mount: Transit mount point
+            max_batch_items: Maximum items per request
+            max_batch_bytes: Maximum approximate JSON size of the items of a request
+            max_concurrency: Maximum parallel requests (defaults to max_concurrency)
+            
+        Returns:
+            Iterator of plaintext bytes, None for ciphertexts that failed
+        """
+        encoded_context = self._b64(context) if context is not None else None
+        items = (
+            {'ciphertext': c, **({'context': encoded_context} if encoded_context else {})}
+            for c in ciphertexts
+        )
+        for plaintext in self._transit_batch('decrypt', mount, key_name, items, 'plaintext',
+                                             max_batch_items, max_batch_bytes, max_concurrency):
+            yield base64.b64decode(plaintext) if plaintext is not None else None
+    
+    def rewrap_batch(
+        self,
+        key_name: str,
+        ciphertexts: Iterable[str],
+        context: Optional[Union[str, bytes]] = None,
+        mount: str = 'transit',
+        max_batch_items: int = TRANSIT_MAX_BATCH_ITEMS,
+        max_batch_bytes: int = TRANSIT_MAX_BATCH_BYTES,
+        max_concurrency: Optional[int] = None
+    ) -> Iterator[Optional[str]]:
+        """
+        Re-encrypt many ciphertexts with the latest version of a transit key
+        
+        The plaintext never leaves Vault. Batching and ordering are the same
+        as for encrypt_batch().
+        
+        Args:
+            key_name: Name of the transit key
+            ciphertexts: Ciphertexts to rewrap
+            context: Key derivation context, for derived keys
+            mount: Transit mount point
+            max_batch_items: Maximum items per request
+            max_batch_bytes: Maximum approximate JSON size of the items of a request
+            max_concurrency: Maximum parallel requests (defaults to max_concurrency)
+            
+        Returns:
+            Iterator of new ciphertexts, None for ciphertexts that failed
+        """
+        encoded_context = self._b64(context) if context is not None else None
+        items = (
+            {'ciphertext': c, **({'context': encoded_context} if encoded_context else {})}
+            for c in ciphertexts
+        )
+        return self._transit_batch('rewrap', mount, key_name, items, 'ciphertext',
+                                   max_batch_items, max_batch_bytes, max_concurrency)
+    
+    def get_credentials(self, path: str, min_ttl: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Get credentials from a dynamic secrets engine, sharing leases
+        
+        The first call starts a LeaseManager (see lease_manager.py). Every
+        caller asking for the same path gets the credentials of one lease,
+        which is renewed in the background and revoked by close().
+        
+        Args:
+            path: Dynamic secret path (e.g., 'database/creds/watsonxdemo')
+            min_ttl: Minimum seconds the credentials must remain valid
+            
+        Returns:
+            Dict containing the credentials or None if error
+        """
+        if not self.client or not self.token:
+            logger.error("Not authenticated with Vault")
+            return None
+        from lease_manager import LeaseManager
+        
+        with self._leases_lock:
+            if self.leases is None:
+                self.leases = LeaseManager(self, max_concurrency=self.max_concurrency)
+        return self.leases.get(path, min_ttl)
+    
+    def _get_refresher(self) -> 'KVRefresher':
+        from kv_refresher import KVRefresher
+        
+        with self._refresher_lock:
+            if self.refresher is None:
+                self.refresher = KVRefresher(self, self.refresh_interval, self.max_concurrency,
+                                             self.refresh_list_interval)
+            return self.refresher
+    
+    def watch_secret(self, path: str, callback: Optional['Subscriber'] = None) -> bool:
+        """
+        Keep a secret current by polling its KV v2 metadata
+        
+        The first call starts a KVRefresher (see kv_refresher.py). Every
+        refresh_interval seconds only the metadata of watched secrets is
+        read; a secret's data is reread only when its version moved, and
+        callback(path, secret, version) is then called (secret is None once
+        deleted). While its version is unchanged the cached copy stays valid.
+        
+        Args:
+            path: Secret path (e.g., 'watsonxdemo/shared/config')
+            callback: Optional function called on every change of the secret
+            
+        Returns:
+            bool: True if the secret is watched, False if not authenticated
+        """
+        if not self.client or not self.token:
+            logger.error("Not authenticated with Vault")
+            return False
+        self._get_refresher().watch(path, callback)
+        return True
+    
+    def watch_tree(self, prefix: str, callback: Optional['Subscriber'] = None) -> bool:
+        """
+        Keep every secret under a prefix current, including secrets created later
+        
+        Like watch_secret(), with the prefix LISTed every
+        refresh_list_interval seconds to find new secrets.
+        
+        Args:
+            prefix: Folder path (e.g., 'watsonxdemo/shared')
+            callback: Optional function called on every change under the prefix
+            
+        Returns:
+            bool: True if the prefix is watched, False if not authenticated
+        """
+        if not self.client or not self.token:
+            logger.error("Not authenticated with Vault")
+            return False
+        self._get_refresher().watch_prefix(prefix, callback)
+        return True
+    
     def renew_token(self) -> bool:
         """
         Renew the current token
@@ -253,22 +1547,252 @@ class VaultAppRoleAuth:
         Returns:
             bool: True if successful, False otherwise
         """
-        if not self.client or not self.client.is_authenticated():
+        if not self.client or not self.token:
             logger.error("Not authenticated with Vault")
             return False
             
         try:
             logger.info("Renewing token...")
-            self.client.auth.token.renew_self()
+            self._timed('renew', self.client.auth.token.renew_self)
             logger.info("Token renewed successfully")
             return True
         except Exception as e:
-            logger.error(f"Error renewing token: {e}")
+            logger.error("Error renewing token: %s", e)
+            return False
+    
+    def start_renewal(self, renew_fraction: float = 2 / 3, retry_interval: float = 5.0) -> bool:
+        """
+        Start a background thread that keeps the token alive
+        
+        The thread reads the token TTL from lookup_self and renews the token
+        once renew_fraction of the TTL has elapsed. When a renewal no longer
+        extends the lease to its original TTL (token_max_ttl reached) or the
+        token is not renewable, the next cycle performs a fresh AppRole login
+        instead. Callers on the request path therefore never pay for renewal.
+        
+        Args:
+            renew_fraction: Fraction of the TTL (0 < fraction < 1) to wait before renewing
+            retry_interval: Seconds to wait before retrying after a failed renewal and login
+            
+        Returns:
+            bool: True if the scheduler was started, False otherwise
+        """
+        if not 0 < renew_fraction < 1:
+            raise ValueError("renew_fraction must be between 0 and 1")
+        if not self.client or not self.token:
+            logger.error("Not authenticated with Vault")
+            return False
+        if self._renewal_thread and self._renewal_thread.is_alive():
+            return True
+            
+        self._renewal_stop.clear()
+        self._renewal_thread = threading.Thread(
+            target=self._renewal_loop,
+            args=(renew_fraction, retry_interval),
+            name="vault-token-renewal",
+            daemon=True
+        )
+        self._renewal_thread.start()
+        logger.info("Token renewal scheduler started")
+        return True
+    
+    def stop_renewal(self, timeout: Optional[float] = None):
+        """
+        Stop the background renewal thread started by start_renewal()
+        
+        Args:
+            timeout: Seconds to wait for the thread to exit
+        """
+        self._renewal_stop.set()
+        if self._renewal_thread:
+            self._renewal_thread.join(timeout)
+            self._renewal_thread = None
+            logger.info("Token renewal scheduler stopped")
+    
+    def save_snapshot(self) -> bool:
+        """
+        Write the secret cache and token and mount metadata to snapshot_path
+        
+        The snapshot is encrypted with a key derived from the AppRole
+        credentials (see warm_snapshot.py). The token itself is not stored.
+        
+        Returns:
+            bool: True if the snapshot was written, False otherwise
+        """
+        if not self.snapshot_path or not self.secret_cache:
+            return False
+        from warm_snapshot import save_snapshot
+        
+        now = time.monotonic()
+        with self._mount_cache_lock:
+            prefix_mounts = {p: [m, v] for p, (m, v, expires) in self._prefix_mounts.items() if expires > now}
+            mount_versions = {
+                m: v for m, (v, expires) in self._mount_versions.items()
+                if expires > now and v is not MOUNT_UNKNOWN
+            }
+        payload = {
+            'token': {'policies': self.token_policies, 'entity_id': self.token_entity_id},
+            'prefix_mounts': prefix_mounts,
+            'mount_versions': mount_versions,
+            'secrets': {path: [secret, version] for path, (secret, version) in self.secret_cache.export().items()},
+        }
+        try:
+            save_snapshot(self.snapshot_path, payload, self.vault_url, self.namespace, self.role_id, self.secret_id)
+        except Exception as e:
+            logger.warning("Could not save snapshot %s: %s", self.snapshot_path, e)
             return False
+        logger.info("Saved snapshot of %s secrets to %s", len(payload['secrets']), self.snapshot_path)
+        return True
+    
+    def _load_snapshot(self) -> int:
+        """Load snapshot_path into the secret cache and mount caches; return the number of secrets"""
+        from warm_snapshot import load_snapshot
+        
+        snapshot = load_snapshot(self.snapshot_path, self.vault_url, self.namespace,
+                                 self.role_id, self.secret_id, self.snapshot_max_age)
+        if not snapshot:
+            return 0
+        token = snapshot.get('token') or {}
+        self.token_policies = token.get('policies') or []
+        self.token_entity_id = token.get('entity_id') or ''
+        expires = time.monotonic() + self.mount_cache_ttl
+        with self._mount_cache_lock:
+            for prefix, (mount, version) in (snapshot.get('prefix_mounts') or {}).items():
+                self._prefix_mounts[prefix] = (mount, version, expires)
+            for mount, version in (snapshot.get('mount_versions') or {}).items():
+                self._mount_versions[mount] = (version, expires)
+        secrets = snapshot.get('secrets') or {}
+        for path, (secret, version) in secrets.items():
+            self.secret_cache.put(path, secret, version=version)
+        return len(secrets)
+    
+    def warm_start(self, max_concurrency: Optional[int] = None) -> bool:
+        """
+        Serve secrets from the warm-start snapshot while authenticating in the background
+        
+        The snapshot at snapshot_path is loaded into the secret cache, so
+        reads of its secrets are answered locally at once. A background
+        thread then logs in, rereads every snapshot secret from Vault
+        (stale-while-revalidate: the snapshot copy is served until then;
+        secrets that are gone or now forbidden are dropped) and saves a
+        fresh snapshot. Cache misses wait for the login. Without a usable
+        snapshot this is a plain authenticate().
+        
+        Args:
+            max_concurrency: Maximum parallel revalidation reads (defaults to max_concurrency)
+            
+        Returns:
+            bool: True if secrets can be served, False otherwise
+        """
+        if not self.snapshot_path:
+            return self.authenticate()
+        try:
+            loaded = self._load_snapshot()
+        except Exception as e:
+            logger.warning("Could not load snapshot %s: %s", self.snapshot_path, e)
+            loaded = 0
+        if not loaded:
+            return self.authenticate()
+            
+        logger.info("Warm start: serving %s secrets from snapshot while revalidating", loaded)
+        self._warm_ready.clear()
+        self._warm_thread = threading.Thread(
+            target=self._revalidate_snapshot,
+            args=(list(self.secret_cache.export()), max_concurrency),
+            name='vault-warm-start',
+            daemon=True
+        )
+        self._warm_thread.start()
+        return True
+    
+    def _revalidate_snapshot(self, paths: List[str], max_concurrency: Optional[int]):
+        """Body of the warm_start() thread"""
+        try:
+            authenticated = self.authenticate()
+        finally:
+            self._warm_ready.set()
+        if not authenticated:
+            logger.warning("Warm start: authentication failed, serving snapshot secrets until they expire")
+            return
+            
+        workers = min(max_concurrency or self.max_concurrency, len(paths))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='vault-revalidate') as executor:
+            for path, (secret, reason) in zip(paths, executor.map(self._read_outcome, paths)):
+                # A definite not-found or denial drops the stale copy; other errors keep it
+                if reason is not None:
+                    self.secret_cache.invalidate(path)
+        if self.metrics is not None:
+            self.metrics.inc('snapshot_revalidated', len(paths))
+        logger.info("Warm start: revalidated %s secrets", len(paths))
+        self.save_snapshot()
+    
+    def close(self):
+        """Stop watching secrets, save the warm-start snapshot, revoke dynamic secret leases, then stop token renewal and cluster health checks"""
+        with self._refresher_lock:
+            refresher, self.refresher = self.refresher, None
+        if refresher:
+            refresher.close()
+        if self.snapshot_path and self.token:
+            self.save_snapshot()
+        with self._leases_lock:
+            leases, self.leases = self.leases, None
+        if leases:
+            leases.close()
+        self.stop_renewal()
+        if self.cluster:
+            self.cluster.stop()
+    
+    def _renewal_loop(self, renew_fraction: float, retry_interval: float):
+        """Body of the renewal thread started by start_renewal()"""
+        try:
+            token_data = self._timed('lookup', self.client.auth.token.lookup_self)['data']
+            ttl = token_data.get('ttl', 0)
+            creation_ttl = token_data.get('creation_ttl') or ttl
+            relogin = not token_data.get('renewable', False)
+        except Exception as e:
+            logger.warning("Could not look up token TTL, re-authenticating: %s", e)
+            ttl, creation_ttl, relogin = 0, 0, True
+            
+        if ttl == 0 and not relogin:
+            logger.info("Token has no TTL, renewal scheduler not needed")
+            return
+            
+        while not self._renewal_stop.wait(ttl * renew_fraction):
+            try:
+                if relogin:
+                    logger.info("Token max TTL reached, re-authenticating with AppRole...")
+                    auth = self._login()
+                    ttl = auth.get('lease_duration', 0)
+                    creation_ttl = ttl
+                    relogin = not auth.get('renewable', False)
+                else:
+                    logger.info("Renewing token...")
+                    auth = self._timed('renew', self.client.auth.token.renew_self)['auth']
+                    ttl = auth.get('lease_duration', 0)
+                    # Vault caps renewals at token_max_ttl; a shorter lease means
+                    # the next cycle has to log in again instead of renewing.
+                    relogin = ttl < creation_ttl or not auth.get('renewable', False)
+                logger.info("Token valid for %s seconds", ttl)
+            except Exception as e:
+                logger.error("Background token refresh failed: %s", e)
+                try:
+                    auth = self._login()
+                    ttl = auth.get('lease_duration', 0)
+                    creation_ttl = ttl
+                    relogin = not auth.get('renewable', False)
+                except Exception as login_error:
+                    logger.error("Re-authentication failed: %s", login_error)
+                    ttl = retry_interval / renew_fraction
+                    relogin = True
+            if ttl == 0:
+                return
 
 
 def main():
     """Main function to demonstrate Vault AppRole authentication"""
+    from dotenv import load_dotenv
+
+    logging.basicConfig(level=logging.DEBUG, format=LOG_FORMAT)
     
     # Load environment variables from .env file (override existing system vars)
     load_dotenv(dotenv_path='.env', override=True)
@@ -288,8 +1812,8 @@ def main():
         logger.error("VAULT_SECRET_ID environment variable is required")
         sys.exit(1)
     
-    logger.info(f"Connecting to Vault at: {vault_url}")
-    logger.info(f"Using namespace: {namespace}")
+    logger.info("Connecting to Vault at: %s", vault_url)
+    logger.info("Using namespace: %s", namespace)
     
     # Initialize and authenticate
     vault_client = VaultAppRoleAuth(
@@ -302,11 +1826,12 @@ def main():
     
     if vault_client.authenticate():
         logger.info("Authentication successful!")
+        vault_client.diagnose()
         
         # Example: Read a secret
         secret_data = vault_client.read_secret('myapp/config')
         if secret_data:
-            logger.info(f"Retrieved secret: {list(secret_data.keys())}")
+            logger.info("Retrieved secret: %s", list(secret_data.keys()))
         
         # Example: Write a secret
         test_secret = {
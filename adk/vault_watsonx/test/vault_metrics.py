@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Instrumentation for Vault client operations
+
+VaultMetrics records a latency histogram per Vault operation (login, read,
+write, renew, lookup) labelled by mount, engine version and outcome, plus
+event counters such as KV fallback attempts, retries and cache hits.
+Metrics can be exported in Prometheus text format or pushed to a callback
+as they are recorded.
+
+Clients hold an optional VaultMetrics instance and skip all timing when it
+is None, so disabled instrumentation costs a single attribute check.
+"""
+
+import threading
+from bisect import bisect_left
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import hvac
+
+# Histogram bucket upper bounds in seconds
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Callback signature: (kind, name, value, labels) where kind is 'histogram' or 'counter'
+MetricsCallback = Callable[[str, str, float, Dict[str, str]], None]
+
+
+def outcome_for(error: Optional[BaseException]) -> str:
+    """Map the exception raised by a Vault call (or None) to an outcome label"""
+    if error is None:
+        return 'ok'
+    if isinstance(error, hvac.exceptions.InvalidPath):
+        return 'not_found'
+    if isinstance(error, hvac.exceptions.Forbidden):
+        return 'forbidden'
+    if isinstance(error, hvac.exceptions.RateLimitExceeded):
+        return 'rate_limited'
+    return 'error'
+
+
+class VaultMetrics:
+    """Thread-safe histograms and counters for Vault client operations"""
+
+    def __init__(
+        self,
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+        callback: Optional[MetricsCallback] = None,
+        prefix: str = 'vault_client'
+    ):
+        """
+        Initialize the metrics registry
+
+        Args:
+            buckets: Histogram bucket upper bounds in seconds
+            callback: Optional exporter called for every observation
+            prefix: Metric name prefix used by render_prometheus()
+        """
+        self.buckets = tuple(sorted(buckets))
+        self.callback = callback
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        # (operation, mount, engine_version, outcome) -> [bucket counts..., +Inf count, sum]
+        self._histograms: Dict[Tuple[str, str, str, str], List[float]] = {}
+        # (name, sorted label items) -> count
+        self._counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+
+    def observe(
+        self,
+        operation: str,
+        seconds: float,
+        mount: str = '',
+        engine_version: Any = '',
+        outcome: str = 'ok'
+    ):
+        """
+        Record the duration of one Vault operation
+
+        Args:
+            operation: Operation name (login, read, write, renew, lookup, ...)
+            seconds: Duration in seconds
+            mount: Mount point the operation targeted
+            engine_version: KV engine version ('' when not applicable)
+            outcome: Outcome label (see outcome_for)
+        """
+        key = (operation, mount or '', '' if engine_version is None else str(engine_version), outcome)
+        index = bisect_left(self.buckets, seconds)
+        with self._lock:
+            series = self._histograms.get(key)
+            if series is None:
+                series = self._histograms[key] = [0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += seconds
+        if self.callback:
+            self.callback('histogram', operation, seconds, {
+                'mount': key[1], 'engine_version': key[2], 'outcome': outcome,
+            })
+
+    def inc(self, name: str, amount: float = 1, **labels: str):
+        """
+        Increment an event counter
+
+        Args:
+            name: Counter name (e.g. 'fallback_attempts', 'retries', 'cache_hits')
+            amount: Increment
+            **labels: Optional labels
+        """
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+        if self.callback:
+            self.callback('counter', name, amount, labels)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Return a point-in-time copy of all metrics
+
+        Returns:
+            Dict with 'operations' ({labels: {'count', 'sum'}}) and 'counters' ({name: value})
+        """
+        with self._lock:
+            operations = {
+                key: {'count': sum(series[:-1]), 'sum': series[-1]}
+                for key, series in self._histograms.items()
+            }
+            counters = {
+                name if not labels else f"{name}{dict(labels)}": value
+                for (name, labels), value in self._counters.items()
+            }
+        return {'operations': operations, 'counters': counters}
+
+    def render_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format"""
+        histogram = f"{self.prefix}_operation_duration_seconds"
+        lines = [
+            f"# HELP {histogram} Duration of Vault operations.",
+            f"# TYPE {histogram} histogram",
+        ]
+        with self._lock:
+            histograms = {key: list(series) for key, series in self._histograms.items()}
+            counters = dict(self._counters)
+
+        for (operation, mount, version, outcome), series in sorted(histograms.items()):
+            labels = (f'operation="{operation}",mount="{mount}",'
+                      f'engine_version="{version}",outcome="{outcome}"')
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                lines.append(f'{histogram}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            cumulative += series[len(self.buckets)]
+            lines.append(f'{histogram}_bucket{{{labels},le="+Inf"}} {cumulative}')
+            lines.append(f'{histogram}_sum{{{labels}}} {series[-1]}')
+            lines.append(f'{histogram}_count{{{labels}}} {cumulative}')
+
+        for name in sorted({name for name, _ in counters}):
+            metric = f"{self.prefix}_{name}_total"
+            lines.append(f"# TYPE {metric} counter")
+            for (counter, labels), value in sorted(counters.items()):
+                if counter != name:
+                    continue
+                rendered = ','.join(f'{k}="{v}"' for k, v in labels)
+                lines.append(f"{metric}{{{rendered}}} {value}" if rendered else f"{metric} {value}")
+        return '\n'.join(lines) + '\n'
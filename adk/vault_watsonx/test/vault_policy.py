@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""
+Vault ACL policy parsing and evaluation
+
+Parses the HCL policy documents under adk/vault_watsonx/policies/ (or as
+returned by sys/policy/<name>) into path rules, and derives from them:
+- the KV secrets a token may read, which VaultAppRoleAuth.prefetch() uses
+  to warm its secret cache
+- a PolicyEvaluator answering which capabilities a token has on a path
+  without a round trip, which VaultAppRoleAuth uses to skip requests Vault
+  would deny
+
+Only the subset of HCL used by Vault ACL policies is supported: `path`
+blocks with a `capabilities` list. Other attributes inside a block are
+ignored.
+"""
+
+import math
+import os
+import re
+from typing import Dict, FrozenSet, Iterable, List, Mapping, NamedTuple, Optional, Tuple
+
+# {{identity.entity.name}} and other ACL templating parameters
+TEMPLATE = re.compile(r'\{\{\s*([^}\s]+)\s*\}\}')
+
+DENY = frozenset({'deny'})
+
+
+class PolicyRule(NamedTuple):
+    """One `path "..." { capabilities = [...] }` block"""
+    path: str
+    capabilities: FrozenSet[str]
+
+
+class KVGrant(NamedTuple):
+    """A KV v2 secret path (relative to its mount) matched by a policy rule"""
+    mount: str
+    path: str
+    glob: bool
+
+
+def _strip_comments(text: str) -> str:
+    """Remove #, // and /* */ comments, leaving quoted strings intact"""
+    out = []
+    i = 0
+    in_string = False
+    while i < len(text):
+        c = text[i]
+        if in_string:
+            out.append(c)
+            if c == '\\' and i + 1 < len(text):
+                out.append(text[i + 1])
+                i += 1
+            elif c == '"':
+                in_string = False
+        elif c == '"':
+            in_string = True
+            out.append(c)
+        elif c == '#' or text.startswith('//', i):
+            end = text.find('\n', i)
+            i = len(text) if end == -1 else end
+            continue
+        elif text.startswith('/*', i):
+            end = text.find('*/', i + 2)
+            i = len(text) if end == -1 else end + 2
+            continue
+        else:
+            out.append(c)
+        i += 1
+    return ''.join(out)
+
+
+def _read_string(text: str, i: int) -> Tuple[str, int]:
+    """Read the quoted string starting at text[i]; return (value, index after it)"""
+    value = []
+    i += 1
+    while i < len(text) and text[i] != '"':
+        if text[i] == '\\' and i + 1 < len(text):
+            i += 1
+        value.append(text[i])
+        i += 1
+    return ''.join(value), i + 1
+
+
+def _block_end(text: str, i: int) -> int:
+    """Return the index just after the block whose opening brace is at text[i]"""
+    depth = 0
+    while i < len(text):
+        c = text[i]
+        if c == '"':
+            _, i = _read_string(text, i)
+            continue
+        if c == '{':
+            depth += 1
+        elif c == '}':
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+    raise ValueError("Unterminated block in policy")
+
+
+def parse_policy(text: str) -> List[PolicyRule]:
+    """
+    Parse an HCL ACL policy document
+
+    Args:
+        text: Policy document
+
+    Returns:
+        Path rules in document order
+
+    Raises:
+        ValueError: If a path block is malformed
+    """
+    text = _strip_comments(text)
+    rules = []
+    i = 0
+    while True:
+        i = text.find('path', i)
+        if i == -1:
+            return rules
+        # Only a bare `path` keyword starts a block
+        if (i and (text[i - 1].isalnum() or text[i - 1] in '_"')) or \
+                not text[i + 4:].lstrip().startswith('"'):
+            i += 4
+            continue
+        j = text.index('"', i + 4)
+        path, j = _read_string(text, j)
+        brace = text.index('{', j)
+        end = _block_end(text, brace)
+        body = text[brace + 1:end - 1]
+        rules.append(PolicyRule(path, frozenset(_capabilities(body))))
+        i = end
+
+
+def _capabilities(body: str) -> List[str]:
+    """Extract the capabilities list of a path block body"""
+    i = body.find('capabilities')
+    if i == -1:
+        return []
+    start = body.index('[', i)
+    end = body.index(']', start)
+    values = []
+    j = start
+    while True:
+        j = body.find('"', j, end)
+        if j == -1:
+            return values
+        value, j = _read_string(body, j)
+        values.append(value)
+
+
+def load_policy_files(directory: str, names: Optional[Iterable[str]] = None) -> Dict[str, List[PolicyRule]]:
+    """
+    Parse the *.hcl policy files of a directory
+
+    Policy names are file names without the .hcl suffix, matching how
+    policies.tf creates them.
+
+    Args:
+        directory: Directory holding the policy files
+        names: Only load these policies (missing files are skipped)
+
+    Returns:
+        Dict of policy name -> rules
+    """
+    if names is None:
+        names = [f[:-len('.hcl')] for f in sorted(os.listdir(directory)) if f.endswith('.hcl')]
+    policies = {}
+    for name in names:
+        file_path = os.path.join(directory, f"{name}.hcl")
+        if os.path.isfile(file_path):
+            with open(file_path) as f:
+                policies[name] = parse_policy(f.read())
+    return policies
+
+
+def kv_grants(rules: Iterable[PolicyRule]) -> Tuple[List[KVGrant], List[KVGrant]]:
+    """
+    Derive the KV v2 secret paths that rules allow and deny reading
+
+    Rules on `<mount>/data/<path>` are KV v2 data paths. A trailing `*`
+    makes the grant a prefix. Rules with `{{identity...}}` templating or
+    `+` segments cannot be resolved to concrete paths here and are skipped,
+    as are KV v1 paths, which are indistinguishable from other engines
+    without mount information.
+
+    Args:
+        rules: Policy rules, from any number of policies
+
+    Returns:
+        Tuple of (readable grants, denied grants)
+    """
+    readable, denied = [], []
+    for rule in rules:
+        if '{{' in rule.path:
+            continue
+        mount, sep, rest = rule.path.partition('/data/')
+        if not sep or '/' in mount or '+' in rest.split('/'):
+            continue
+        glob = rest.endswith('*')
+        grant = KVGrant(mount, rest[:-1] if glob else rest, glob)
+        if 'deny' in rule.capabilities:
+            denied.append(grant)
+        elif 'read' in rule.capabilities:
+            readable.append(grant)
+    return readable, denied
+
+
+def is_denied(path: str, denied: Iterable[KVGrant], mount: Optional[str] = None) -> bool:
+    """
+    Whether a secret path (relative to its mount) matches a deny grant
+
+    When mount is given, only deny grants on that mount are considered.
+    """
+    return any(
+        path.startswith(d.path) if d.glob else path == d.path
+        for d in denied if mount is None or d.mount == mount
+    )
+
+
+def render_template(path: str, identity: Mapping[str, str]) -> Optional[str]:
+    """
+    Substitute ACL templating parameters in a policy path
+
+    Args:
+        path: Policy path (e.g. 'kv/data/users/{{identity.entity.name}}/*')
+        identity: Parameter name -> value (e.g. {'identity.entity.name': 'alice'})
+
+    Returns:
+        The rendered path, or None if a parameter has no value
+    """
+    missing = False
+
+    def substitute(match):
+        nonlocal missing
+        value = identity.get(match.group(1))
+        if value is None:
+            missing = True
+            return ''
+        return value
+
+    rendered = TEMPLATE.sub(substitute, path)
+    return None if missing else rendered
+
+
+def _priority(path: str) -> Tuple:
+    """
+    Sort key of a rule path; of all rules matching a request path, Vault
+    applies the one with the highest key:
+    1. the first `+` or `*` wildcard occurs later (exact paths rank highest)
+    2. the path does not end in `*`
+    3. the path has fewer `+` segments
+    4. the path is longer
+    5. the path is lexicographically greater
+    """
+    segments = path.split('/')
+    plus = [i for i, segment in enumerate(segments) if segment == '+']
+    positions = [len('/'.join(segments[:plus[0]])) + bool(plus[0])] if plus else []
+    if path.endswith('*'):
+        positions.append(len(path) - 1)
+    first = min(positions) if positions else math.inf
+    return (first, not path.endswith('*'), -len(plus), len(path), path)
+
+
+def _path_regex(path: str, identity: Mapping[str, str]) -> 're.Pattern':
+    """Compile a policy path into a regex; unresolved templates match any segment text"""
+    glob = path.endswith('*')
+    segments = []
+    for segment in (path[:-1] if glob else path).split('/'):
+        if segment == '+':
+            segments.append('[^/]+')
+            continue
+        pieces = TEMPLATE.split(segment)
+        segments.append(''.join(
+            ('[^/]+' if identity.get(piece) is None else re.escape(identity[piece])) if i % 2
+            else re.escape(piece)
+            for i, piece in enumerate(pieces)
+        ))
+    return re.compile('/'.join(segments) + ('.*' if glob else '') + r'\Z')
+
+
+class _TrieNode:
+    """One character of a compiled policy path"""
+
+    __slots__ = ('children', 'exact', 'glob')
+
+    def __init__(self):
+        self.children: Dict[str, '_TrieNode'] = {}
+        self.exact: Optional[FrozenSet[str]] = None
+        self.glob: Optional[FrozenSet[str]] = None
+
+
+class PolicyEvaluator:
+    """
+    The ACL of a set of policies, compiled for local capability checks
+
+    Exact and `*` glob rules are stored in a character trie, so a lookup
+    walks the request path once and finds both the exact rule and the
+    longest matching glob. Rules with `+` segments are matched separately,
+    and the highest-priority match applies, as in Vault. Rules with the same
+    path in several policies are merged, with `deny` taking precedence.
+
+    Templated rules are rendered with the identity parameters given. A rule
+    whose parameters are unknown cannot be resolved: its grants are assumed
+    to apply to any value of the parameter and its denials are ignored, so
+    the evaluator never reports a capability as denied unless it is certain.
+    """
+
+    def __init__(self, rules: Iterable[PolicyRule], identity: Optional[Mapping[str, str]] = None):
+        """
+        Compile policy rules
+
+        Args:
+            rules: Rules of all the token's policies
+            identity: ACL templating parameters (e.g. {'identity.entity.name': 'alice'})
+        """
+        identity = identity or {}
+        merged: Dict[str, FrozenSet[str]] = {}
+        unresolved: Dict[str, FrozenSet[str]] = {}
+        for rule in rules:
+            path = render_template(rule.path, identity)
+            if path is None:
+                if 'deny' not in rule.capabilities:
+                    unresolved[rule.path] = unresolved.get(rule.path, frozenset()) | rule.capabilities
+                continue
+            capabilities = merged.get(path, frozenset()) | rule.capabilities
+            merged[path] = DENY if 'deny' in capabilities else capabilities
+
+        self._root = _TrieNode()
+        self._segment_rules: List[Tuple[Tuple, 're.Pattern', FrozenSet[str]]] = []
+        for path, capabilities in merged.items():
+            if '+' in path.split('/'):
+                self._segment_rules.append((_priority(path), _path_regex(path, identity), capabilities))
+                continue
+            glob = path.endswith('*')
+            node = self._root
+            for c in path[:-1] if glob else path:
+                node = node.children.setdefault(c, _TrieNode())
+            if glob:
+                node.glob = capabilities
+            else:
+                node.exact = capabilities
+        self._unresolved = [
+            (_path_regex(path, identity), capabilities) for path, capabilities in unresolved.items()
+        ]
+
+    def _best_rule(self, path: str) -> Optional[FrozenSet[str]]:
+        """Return the capabilities of the highest-priority rule matching path"""
+        best: Optional[Tuple[Tuple, FrozenSet[str]]] = None
+        node = self._root
+        glob_at = -1
+        for i, c in enumerate(path):
+            if node.glob is not None:
+                glob_at, glob = i, node.glob
+            node = node.children.get(c)
+            if node is None:
+                break
+        else:
+            if node.exact is not None:
+                return node.exact
+            if node.glob is not None:
+                glob_at, glob = len(path), node.glob
+        if glob_at >= 0:
+            best = (_priority(path[:glob_at] + '*'), glob)
+        for priority, regex, capabilities in self._segment_rules:
+            if (best is None or priority > best[0]) and regex.match(path):
+                best = (priority, capabilities)
+        return best[1] if best else None
+
+    def capabilities(self, path: str) -> FrozenSet[str]:
+        """
+        Return the capabilities the policies may grant on an API path
+
+        Args:
+            path: API path without the /v1/ prefix (e.g. 'kv/data/watsonxdemo/admin/db')
+
+        Returns:
+            The capabilities, or {'deny'} when every request to path is
+            certain to be denied
+        """
+        granted = self._best_rule(path)
+        maybe = frozenset().union(*(c for regex, c in self._unresolved if regex.match(path)))
+        if granted is None or granted == DENY:
+            return maybe or DENY
+        return granted | maybe
+
+    def allows(self, path: str, capability: str) -> bool:
+        """Whether a capability on an API path may be granted (False only when certainly denied)"""
+        return capability in self.capabilities(path)
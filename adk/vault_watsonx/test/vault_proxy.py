@@ -0,0 +1,528 @@
+#!/usr/bin/env python3
+"""
+Local caching Vault proxy shared by worker processes on a node
+
+Tool workers that each log in and read on their own multiply Vault traffic
+by the number of workers. This proxy runs as one separate process per node
+and is targeted by the workers through VAULT_ADDR:
+- it holds one auto-authenticated AppRole token; AppRole logins presenting
+  the proxy's credentials are answered locally with a proxy-local token,
+  which the proxy swaps for the real token on the way upstream
+- KV GET and LIST responses (and mount discovery reads) are cached per
+  (token, namespace, path) with a lease-aware TTL; any write through the
+  proxy invalidates the mount. Reads of other engines, such as dynamic
+  credentials, and responses carrying a lease or a response wrapping
+  token are never cached
+- requests with other tokens (e.g. per-user JWT logins) are forwarded as is,
+  and their reads are cached under their own token
+- it listens on loopback HTTP or on a unix socket
+
+Usage:
+    VAULT_ADDR=https://vault.example.com:8200 VAULT_ROLE_ID=... VAULT_SECRET_ID=... \\
+        python vault_proxy.py --listen 127.0.0.1:8100
+    python vault_proxy.py --listen unix:///run/vault-proxy.sock
+
+Workers then use VAULT_ADDR=http://127.0.0.1:8100 (or unix:///run/vault-proxy.sock).
+"""
+
+import argparse
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from socketserver import ThreadingMixIn, UnixStreamServer
+from typing import Any, Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Transport helpers shared with tools/vault_tool.py
+import _paths  # noqa: F401
+from vault_transport import ResilientSession
+
+# Request headers forwarded upstream, and response headers passed back
+FORWARDED_HEADERS = ('X-Vault-Token', 'X-Vault-Namespace', 'X-Vault-Request', 'X-Vault-Wrap-TTL', 'Content-Type')
+PASSTHROUGH_HEADERS = ('Content-Type', 'Retry-After')
+
+# sys/ reads that only describe mounts, and are cached like secret reads
+CACHEABLE_SYS_PATHS = ('sys/internal/ui/mounts', 'sys/mounts')
+
+# Response of a forwarded or locally answered request: (status, headers, body)
+Response = Tuple[int, Dict[str, str], bytes]
+
+# (token hash, namespace, path, method and query)
+CacheKey = Tuple[str, str, str, str]
+
+
+class ProxyCache:
+    """Bounded LRU of cached upstream responses with per-entry expiry"""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[CacheKey, Tuple[float, Response]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: CacheKey) -> Optional[Response]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: CacheKey, response: Response, ttl: float):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate_mount(self, namespace: str, mount: str):
+        """Drop every cached response under a mount, for all tokens"""
+        prefix = mount + '/'
+        with self._lock:
+            for key in [k for k in self._entries if k[1] == namespace and
+                        (k[2] == mount or k[2].startswith(prefix))]:
+                del self._entries[key]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
+class VaultProxy:
+    """Forwards requests to Vault with a shared auto-auth token and a read cache"""
+
+    def __init__(
+        self,
+        vault_url: str,
+        role_id: str,
+        secret_id: str,
+        namespace: str = '',
+        verify_ssl: bool = True,
+        cache_ttl: float = 60,
+        max_cache_ttl: float = 300,
+        max_entries: int = 10000,
+        pool_size: int = 32,
+        expiry_margin: float = 30,
+        min_relogin_interval: float = 10,
+        max_retries: int = 0
+    ):
+        """
+        Initialize the proxy
+
+        Args:
+            vault_url: Upstream Vault address
+            role_id: AppRole role ID of the shared token
+            secret_id: AppRole secret ID of the shared token
+            namespace: Namespace the shared token logs in to
+            verify_ssl: Whether to verify the upstream certificate
+            cache_ttl: Seconds a read without a lease (e.g. KV v2) is cached
+            max_cache_ttl: Upper bound for lease-derived cache TTLs
+            max_entries: Maximum cached responses
+            pool_size: Upstream connection pool size
+            expiry_margin: Seconds before expiry at which the shared token is replaced
+            min_relogin_interval: Minimum seconds between logins forced by a
+                rejected shared token, and for which a token confirmed valid
+                is not checked again
+            max_retries: Retries for transient upstream failures of idempotent
+                requests (see vault_transport.ResilientSession)
+        """
+        self.vault_url = vault_url.rstrip('/')
+        self.role_id = role_id
+        self.secret_id = secret_id
+        self.namespace = namespace
+        self.verify_ssl = verify_ssl
+        self.cache_ttl = cache_ttl
+        self.max_cache_ttl = max_cache_ttl
+        self.expiry_margin = expiry_margin
+        self.min_relogin_interval = min_relogin_interval
+        self.cache = ProxyCache(max_entries)
+        # Handed to local clients instead of the real token
+        self.local_token = f"hvp.{secrets.token_urlsafe(24)}"
+        self.session = ResilientSession(max_retries=max_retries)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._auth: Optional[Dict[str, Any]] = None
+        self._token_expires_at = 0.0
+        self._forced_login_at = float('-inf')
+        self._token_checked_at = float('-inf')
+        self._login_lock = threading.Lock()
+        # (namespace, mount) -> (engine type or None, expires_at)
+        self._mount_types: Dict[Tuple[str, str], Tuple[Optional[str], float]] = {}
+        self._mount_types_lock = threading.Lock()
+        # Incremented from every handler thread
+        self._stats_lock = threading.Lock()
+        self.upstream_requests = 0
+
+    def _upstream(self, method: str, path: str, headers: Dict[str, str], body: bytes) -> requests.Response:
+        with self._stats_lock:
+            self.upstream_requests += 1
+        return self.session.request(
+            method, f"{self.vault_url}/v1/{path}", headers=headers, data=body or None,
+            verify=self.verify_ssl, allow_redirects=False
+        )
+
+    def _namespace_headers(self, token: Optional[str] = None) -> Dict[str, str]:
+        headers = {'X-Vault-Namespace': self.namespace} if self.namespace else {}
+        if token:
+            headers['X-Vault-Token'] = token
+        return headers
+
+    def _login(self, stale_token: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Return the shared token's auth block, logging in when it is missing or expiring
+
+        Args:
+            stale_token: Token rejected upstream; it is replaced at most once
+                per min_relogin_interval
+
+        Returns:
+            The auth block of the current shared token
+        """
+        with self._login_lock:
+            auth = self._auth
+            now = time.monotonic()
+            if auth and now < self._token_expires_at:
+                if auth['client_token'] != stale_token:
+                    return auth
+                if now - self._forced_login_at < self.min_relogin_interval:
+                    return auth
+            body = json.dumps({'role_id': self.role_id, 'secret_id': self.secret_id}).encode()
+            response = self._upstream('POST', 'auth/approle/login', self._namespace_headers(), body)
+            response.raise_for_status()
+            self._auth = response.json()['auth']
+            lease = self._auth.get('lease_duration') or 0
+            now = time.monotonic()
+            if stale_token:
+                self._forced_login_at = now
+            self._token_expires_at = (now + lease - self.expiry_margin) if lease else float('inf')
+            self._token_checked_at = now
+            replaced = auth['client_token'] if auth else None
+        if replaced:
+            self._revoke(replaced)
+        return self._auth
+
+    def _revoke(self, token: str):
+        """Revoke a replaced shared token; failures are ignored as it expires anyway"""
+        try:
+            self._upstream('POST', 'auth/token/revoke-self', self._namespace_headers(token), b'').close()
+        except requests.exceptions.RequestException:
+            pass
+
+    def _token_valid(self, token: str) -> bool:
+        """
+        Whether the shared token is still accepted upstream, so a 403 was a policy denial
+
+        A token confirmed valid is not checked again for min_relogin_interval.
+        """
+        with self._login_lock:
+            current = self._auth and self._auth['client_token'] == token
+            if current and time.monotonic() - self._token_checked_at < self.min_relogin_interval:
+                return True
+        response = self._upstream('GET', 'auth/token/lookup-self', self._namespace_headers(token), b'')
+        valid = response.status_code != 403
+        response.close()
+        if valid and current:
+            with self._login_lock:
+                self._token_checked_at = time.monotonic()
+        return valid
+
+    def _redact_token(self, payload: bytes) -> bytes:
+        """Replace the shared token and its accessor in a lookup-self response"""
+        try:
+            document = json.loads(payload)
+        except ValueError:
+            return payload
+        data = document.get('data') if isinstance(document, dict) else None
+        if not isinstance(data, dict):
+            return payload
+        data['id'] = self.local_token
+        data['accessor'] = ''
+        return json.dumps(document).encode()
+
+    def _local_auth_response(self) -> Response:
+        """Answer a login or renew-self with the proxy-local token"""
+        auth = self._login()
+        remaining = self._token_expires_at - time.monotonic()
+        local = {
+            **auth,
+            'client_token': self.local_token,
+            'accessor': '',
+            'lease_duration': int(remaining) if remaining != float('inf') else 0,
+        }
+        return 200, {'Content-Type': 'application/json'}, json.dumps({'auth': local}).encode()
+
+    def _is_own_login(self, path: str, body: bytes) -> bool:
+        if path != 'auth/approle/login':
+            return False
+        try:
+            credentials = json.loads(body or b'{}')
+        except ValueError:
+            return False
+        return (hmac.compare_digest(str(credentials.get('role_id', '')), self.role_id) and
+                hmac.compare_digest(str(credentials.get('secret_id', '')), self.secret_id))
+
+    def _is_kv_mount(self, namespace: str, mount: str, token: str) -> bool:
+        """Whether mount is a KV engine, discovered once per cache_ttl with the caller's token"""
+        with self._mount_types_lock:
+            known = self._mount_types.get((namespace, mount))
+        if known and known[1] > time.monotonic():
+            return known[0] == 'kv'
+        headers = {'X-Vault-Token': token}
+        if namespace:
+            headers['X-Vault-Namespace'] = namespace
+        try:
+            response = self._upstream('GET', f"sys/internal/ui/mounts/{mount}", headers, b'')
+            engine = (response.json().get('data') or {}).get('type') if response.status_code == 200 else None
+        except (requests.exceptions.RequestException, ValueError, AttributeError):
+            return False
+        with self._mount_types_lock:
+            self._mount_types[(namespace, mount)] = (engine, time.monotonic() + self.cache_ttl)
+        return engine == 'kv'
+
+    def _cache_ttl(self, body: bytes) -> Optional[float]:
+        """
+        Lease-aware TTL: a response's lease_duration, capped, or the default TTL
+
+        Returns None for responses that must not be shared: those carrying a
+        lease (each read of a dynamic secret is a new credential) or a
+        response wrapping token.
+        """
+        try:
+            document = json.loads(body)
+        except ValueError:
+            return None
+        if not isinstance(document, dict):
+            return None
+        if document.get('lease_id') or document.get('renewable') or document.get('wrap_info'):
+            return None
+        lease = document.get('lease_duration') or 0
+        return min(lease, self.max_cache_ttl) if lease > 0 else self.cache_ttl
+
+    def handle(self, method: str, path: str, query: str, headers: Dict[str, str], body: bytes) -> Response:
+        """
+        Serve one client request
+
+        Args:
+            method: HTTP method (LIST requests may also arrive as GET ?list=true)
+            path: Vault API path without the /v1/ prefix
+            query: Raw query string
+            headers: Request headers
+            body: Request body
+
+        Returns:
+            Tuple of (status, headers, body)
+        """
+        token = headers.get('X-Vault-Token', '')
+        own_token = bool(token) and hmac.compare_digest(token, self.local_token)
+
+        if method == 'POST' and self._is_own_login(path, body):
+            return self._local_auth_response()
+        if own_token and path == 'auth/token/renew-self':
+            return self._local_auth_response()
+        if own_token and path == 'auth/token/revoke-self':
+            # The shared token outlives any single worker
+            return 204, {}, b''
+
+        target = path + ('?' + query if query else '')
+        namespace = headers.get('X-Vault-Namespace', '')
+        discovery = path.startswith(CACHEABLE_SYS_PATHS)
+        # Wrapped responses are single-use and are never served from the cache
+        readable = method in ('GET', 'LIST') and 'X-Vault-Wrap-TTL' not in headers and (
+            not path.startswith(('auth/', 'sys/')) or discovery)
+        key = None
+        if readable and token:
+            key = (hashlib.sha256(token.encode()).hexdigest(), namespace, path, f"{method} {query}")
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        forward = {name: value for name, value in headers.items() if name in FORWARDED_HEADERS}
+        real_token = None
+        if own_token:
+            real_token = self._login()['client_token']
+            forward['X-Vault-Token'] = real_token
+        response = self._upstream(method, target, forward, body)
+        if own_token and response.status_code == 403 and not self._token_valid(real_token):
+            # The shared token was revoked or expired upstream; retry once with a new one
+            fresh_token = self._login(stale_token=real_token)['client_token']
+            if fresh_token != real_token:
+                forward['X-Vault-Token'] = fresh_token
+                response = self._upstream(method, target, forward, body)
+
+        content = response.content
+        if own_token and path == 'auth/token/lookup-self' and response.status_code == 200:
+            content = self._redact_token(content)
+        result = (
+            response.status_code,
+            {name: response.headers[name] for name in PASSTHROUGH_HEADERS if name in response.headers},
+            content,
+        )
+        if key is not None and response.status_code == 200:
+            ttl = self._cache_ttl(response.content)
+            if ttl is not None and (discovery or self._is_kv_mount(
+                    namespace, path.split('/', 1)[0], real_token or token)):
+                self.cache.put(key, result, ttl)
+        elif method not in ('GET', 'LIST') and response.status_code < 400:
+            self.cache.invalidate_mount(namespace, path.split('/', 1)[0])
+        return result
+
+
+class ProxyHandler(BaseHTTPRequestHandler):
+    """HTTP handler passing every request to the server's VaultProxy"""
+
+    protocol_version = 'HTTP/1.1'
+    server_version = 'VaultProxy/1.0'
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _handle(self, method: str):
+        path, _, query = self.path.partition('?')
+        if not path.startswith('/v1/'):
+            return self._send(404, {}, b'{"errors":[]}')
+        if method == 'GET' and 'list=true' in query:
+            method = 'LIST'
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        # Header lookups are case-insensitive
+        headers = {name: self.headers[name] for name in FORWARDED_HEADERS if name in self.headers}
+        try:
+            status, response_headers, payload = self.server.proxy.handle(
+                method, path[len('/v1/'):], query, headers, body)
+        except Exception as e:
+            payload = json.dumps({'errors': [f"vault proxy: {e}"]}).encode()
+            status, response_headers = 502, {'Content-Type': 'application/json'}
+        self._send(status, response_headers, payload)
+
+    def _send(self, status: int, headers: Dict[str, str], payload: bytes):
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        self._handle('GET')
+
+    def do_POST(self):
+        self._handle('POST')
+
+    def do_PUT(self):
+        self._handle('PUT')
+
+    def do_PATCH(self):
+        self._handle('PATCH')
+
+    def do_DELETE(self):
+        self._handle('DELETE')
+
+    def do_LIST(self):
+        self._handle('LIST')
+
+
+class ProxyHTTPServer(ThreadingHTTPServer):
+    """Loopback HTTP server for the proxy"""
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], proxy: VaultProxy):
+        super().__init__(address, ProxyHandler)
+        self.proxy = proxy
+
+
+class _UnixProxyHandler(ProxyHandler):
+    # TCP_NODELAY does not apply to unix sockets
+    disable_nagle_algorithm = False
+
+
+class ProxyUnixServer(ThreadingMixIn, UnixStreamServer):
+    """Unix socket server for the proxy"""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, proxy: VaultProxy):
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        super().__init__(socket_path, _UnixProxyHandler)
+        # Only the owning user's processes may use the shared token
+        os.chmod(socket_path, 0o600)
+        self.proxy = proxy
+
+
+def start_proxy(proxy: VaultProxy, listen: str = '127.0.0.1:0') -> Tuple[Any, str]:
+    """
+    Start the proxy on a background thread
+
+    Args:
+        proxy: Proxy to serve
+        listen: host:port for loopback HTTP, or unix:///path for a unix socket
+
+    Returns:
+        Tuple of (server, VAULT_ADDR value for clients)
+    """
+    if listen.startswith('unix://'):
+        socket_path = listen[len('unix://'):]
+        server = ProxyUnixServer(socket_path, proxy)
+        address = listen
+    else:
+        host, _, port = listen.removeprefix('http://').rpartition(':')
+        server = ProxyHTTPServer((host or '127.0.0.1', int(port)), proxy)
+        address = f"http://{host or '127.0.0.1'}:{server.server_port}"
+    threading.Thread(target=server.serve_forever, name='vault-proxy', daemon=True).start()
+    return server, address
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local caching Vault proxy")
+    parser.add_argument('--listen', default='127.0.0.1:8100', help="host:port or unix:///path/to/socket")
+    parser.add_argument('--cache-ttl', type=float, default=60, help="TTL for reads without a lease")
+    parser.add_argument('--max-cache-ttl', type=float, default=300, help="cap for lease-derived TTLs")
+    parser.add_argument('--max-entries', type=int, default=10000)
+    parser.add_argument('--max-retries', type=int, default=0,
+                        help="retries for transient upstream failures of idempotent requests")
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+    load_dotenv(dotenv_path='.env', override=True)
+    role_id = os.getenv('VAULT_ROLE_ID')
+    secret_id = os.getenv('VAULT_SECRET_ID')
+    if not role_id or not secret_id:
+        parser.error("VAULT_ROLE_ID and VAULT_SECRET_ID environment variables are required")
+
+    proxy = VaultProxy(
+        vault_url=os.getenv('VAULT_ADDR', 'https://localhost:8200'),
+        role_id=role_id,
+        secret_id=secret_id,
+        namespace=os.getenv('VAULT_NAMESPACE', ''),
+        verify_ssl=os.getenv('VAULT_VERIFY_SSL', 'true').lower() == 'true',
+        cache_ttl=args.cache_ttl,
+        max_cache_ttl=args.max_cache_ttl,
+        max_entries=args.max_entries,
+        max_retries=args.max_retries,
+    )
+    server, address = start_proxy(proxy, args.listen)
+    print(f"Vault proxy for {proxy.vault_url} listening on {address}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Encrypted on-disk warm-start snapshots for VaultAppRoleAuth
+
+A snapshot holds the secret cache and the token and mount metadata of a
+client, so a restarted worker can answer its first requests locally while
+it logs in and revalidates the secrets in the background (see
+VaultAppRoleAuth.warm_start()).
+
+Snapshots are encrypted with AES-256-GCM under a key derived by HKDF from
+the AppRole secret ID, bound to the Vault address, namespace and role ID.
+Only a process holding the same AppRole credentials can read a snapshot,
+and a snapshot written for other credentials, or tampered with, is
+rejected. Files are written atomically with mode 0600 and memory-mapped
+when loaded.
+
+Layout: MAGIC | salt (16 bytes) | nonce (12 bytes) | ciphertext and tag
+"""
+
+import json
+import logging
+import mmap
+import os
+import tempfile
+import time
+from typing import Any, Dict, Optional
+
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'VWS1'
+SALT_SIZE = 16
+NONCE_SIZE = 12
+HEADER_SIZE = len(MAGIC) + SALT_SIZE + NONCE_SIZE
+
+
+def derive_key(salt: bytes, vault_url: str, namespace: str, role_id: str, secret_id: str) -> bytes:
+    """
+    Derive the snapshot key from the AppRole credentials
+
+    Args:
+        salt: Random per-snapshot salt
+        vault_url: Vault address the snapshot belongs to
+        namespace: Vault namespace
+        role_id: AppRole role ID
+        secret_id: AppRole secret ID (the key material)
+
+    Returns:
+        32-byte AES key
+    """
+    info = '\0'.join(('vault-warm-snapshot', vault_url, namespace or '', role_id)).encode()
+    return HKDF(algorithm=hashes.SHA256(), length=32, salt=salt, info=info).derive(secret_id.encode())
+
+
+def save_snapshot(path: str, payload: Dict[str, Any], vault_url: str, namespace: str,
+                  role_id: str, secret_id: str):
+    """
+    Encrypt and atomically write a snapshot
+
+    Args:
+        path: Snapshot file
+        payload: JSON-serializable snapshot content
+        vault_url: Vault address
+        namespace: Vault namespace
+        role_id: AppRole role ID
+        secret_id: AppRole secret ID
+    """
+    salt = os.urandom(SALT_SIZE)
+    nonce = os.urandom(NONCE_SIZE)
+    header = MAGIC + salt + nonce
+    key = derive_key(salt, vault_url, namespace, role_id, secret_id)
+    document = dict(payload, saved_at=time.time())
+    ciphertext = AESGCM(key).encrypt(nonce, json.dumps(document, separators=(',', ':')).encode(), header)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix='.vault-snapshot-', dir=directory)
+    try:
+        os.fchmod(fd, 0o600)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(header)
+            f.write(ciphertext)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def load_snapshot(path: str, vault_url: str, namespace: str, role_id: str, secret_id: str,
+                  max_age: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    """
+    Memory-map, authenticate and decrypt a snapshot
+
+    Args:
+        path: Snapshot file
+        vault_url: Vault address
+        namespace: Vault namespace
+        role_id: AppRole role ID
+        secret_id: AppRole secret ID
+        max_age: Ignore snapshots saved more than this many seconds ago
+
+    Returns:
+        The snapshot content, or None if it is missing, too old, or was
+        written with other credentials or modified
+    """
+    try:
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if len(mapped) <= HEADER_SIZE or mapped[:len(MAGIC)] != MAGIC:
+                logger.warning("Ignoring snapshot %s: not a snapshot file", path)
+                return None
+            header = mapped[:HEADER_SIZE]
+            salt = header[len(MAGIC):len(MAGIC) + SALT_SIZE]
+            nonce = header[len(MAGIC) + SALT_SIZE:]
+            key = derive_key(salt, vault_url, namespace, role_id, secret_id)
+            plaintext = AESGCM(key).decrypt(nonce, mapped[HEADER_SIZE:], header)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning("Could not read snapshot %s: %s", path, e)
+        return None
+    except InvalidTag:
+        logger.warning("Ignoring snapshot %s: written with other credentials or modified", path)
+        return None
+
+    document = json.loads(plaintext)
+    age = time.time() - document.get('saved_at', 0)
+    if max_age is not None and age > max_age:
+        logger.info("Ignoring snapshot %s: %.0fs old", path, age)
+        return None
+    return document
@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+"""
+Streaming analyzer for Vault audit device logs
+
+Reads JSON-lines audit logs (as written by `vault audit enable file ...`),
+pairs each request entry with its response entry by request id and reports:
+- request rates per path, mount, auth method and policy
+- error rates
+- duplicate-read ratios (the same token reading the same path again within
+  a time window), which show where client-side caching would help
+- response latency percentiles, from the request/response timestamps
+
+Files are memory-mapped and stdin is read as a stream. Memory stays
+bounded however large the log is: unmatched requests are held in a
+bounded window, duplicate detection uses a bounded LRU, and the number
+of distinct paths tracked is capped (extra paths are folded into
+"(other)").
+
+Usage:
+    python analyze_audit.py /var/log/vault/audit.log
+    tail -F /var/log/vault/audit.log | python analyze_audit.py - --top 20
+    python analyze_audit.py audit-*.log --json > report.json
+"""
+
+import argparse
+import json
+import mmap
+import sys
+import time
+from bisect import bisect_left
+from calendar import timegm
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+# Latency histogram bucket upper bounds in seconds
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+OTHER = '(other)'
+READ_OPERATIONS = frozenset({'read', 'list'})
+
+
+class Stats:
+    """Counters and a latency histogram for one report key"""
+
+    __slots__ = ('requests', 'errors', 'reads', 'duplicate_reads', 'latency')
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.reads = 0
+        self.duplicate_reads = 0
+        # Bucket counts plus one overflow bucket
+        self.latency = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def add(self, error: bool, read: bool, duplicate: bool, latency: Optional[float]):
+        self.requests += 1
+        self.errors += error
+        self.reads += read
+        self.duplicate_reads += duplicate
+        if latency is not None:
+            self.latency[bisect_left(LATENCY_BUCKETS, latency)] += 1
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Upper bound of the bucket holding the pct-th percentile latency"""
+        total = sum(self.latency)
+        if not total:
+            return None
+        rank = pct / 100 * total
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS + (float('inf'),), self.latency):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float('inf')
+
+
+def _epoch(timestamp: str, _cache: Dict[str, int] = {}) -> float:
+    """
+    Convert an RFC 3339 audit timestamp to epoch seconds
+
+    Audit timestamps carry up to nanosecond precision, which datetime cannot
+    parse, and consecutive entries share the same second; the whole-second
+    prefix is converted once and cached.
+    """
+    prefix = timestamp[:19]
+    base = _cache.get(prefix)
+    if base is None:
+        if len(_cache) > 4096:
+            _cache.clear()
+        base = _cache[prefix] = timegm(time.strptime(prefix, '%Y-%m-%dT%H:%M:%S'))
+    fraction = timestamp[19:].rstrip('Z')
+    if fraction.startswith('.'):
+        digits = fraction[1:].split('+', 1)[0].split('-', 1)[0]
+        return base + int(digits) / 10 ** len(digits) if digits else base
+    return base
+
+
+def _auth_method(path: str, auth: Dict[str, Any]) -> str:
+    """Derive the auth method of a request from its path or token display name"""
+    if path.startswith('auth/') and '/login' in path:
+        return path.split('/', 2)[1]
+    display_name = auth.get('display_name') or ''
+    return display_name.split('-', 1)[0] or 'token'
+
+
+class AuditAnalyzer:
+    """Aggregates paired audit request/response entries in bounded memory"""
+
+    def __init__(
+        self,
+        max_pending: int = 100_000,
+        max_paths: int = 50_000,
+        duplicate_window: float = 60.0,
+        duplicate_capacity: int = 200_000
+    ):
+        """
+        Initialize the analyzer
+
+        Args:
+            max_pending: Requests awaiting their response before the oldest is dropped
+            max_paths: Distinct paths tracked before new ones are folded into "(other)"
+            duplicate_window: Seconds within which a repeated read counts as a duplicate
+            duplicate_capacity: (token, path) pairs remembered for duplicate detection
+        """
+        self.max_pending = max_pending
+        self.max_paths = max_paths
+        self.duplicate_window = duplicate_window
+        self.duplicate_capacity = duplicate_capacity
+
+        self.total = Stats()
+        self.paths: Dict[str, Stats] = {}
+        self.mounts: Dict[str, Stats] = {}
+        self.auth_methods: Dict[str, Stats] = {}
+        self.policies: Dict[str, Stats] = {}
+        self.operations: Dict[str, Stats] = {}
+
+        self.lines = 0
+        self.malformed = 0
+        self.unpaired_responses = 0
+        self.dropped_requests = 0
+        self.first_time: Optional[float] = None
+        self.last_time: Optional[float] = None
+
+        # request id -> request timestamp
+        self._pending: 'OrderedDict[str, float]' = OrderedDict()
+        # (client token HMAC, path) -> time of the last read
+        self._recent_reads: 'OrderedDict[Tuple[str, str], float]' = OrderedDict()
+
+    def feed(self, lines: Iterable[bytes]):
+        """
+        Consume audit log lines
+
+        Args:
+            lines: JSON-lines audit entries (bytes or str)
+        """
+        loads = json.loads
+        for line in lines:
+            self.lines += 1
+            try:
+                entry = loads(line)
+                kind = entry['type']
+                request = entry['request']
+                request_id = request['id']
+            except (ValueError, KeyError, TypeError):
+                if line.strip():
+                    self.malformed += 1
+                continue
+
+            timestamp = entry.get('time')
+            at = _epoch(timestamp) if timestamp else None
+            if at is not None:
+                if self.first_time is None or at < self.first_time:
+                    self.first_time = at
+                if self.last_time is None or at > self.last_time:
+                    self.last_time = at
+
+            if kind == 'request':
+                pending = self._pending
+                pending[request_id] = at
+                if len(pending) > self.max_pending:
+                    pending.popitem(last=False)
+                    self.dropped_requests += 1
+            elif kind == 'response':
+                started = self._pending.pop(request_id, None)
+                if started is None:
+                    self.unpaired_responses += 1
+                latency = at - started if started is not None and at is not None else None
+                self._record(entry, request, at, latency)
+
+    def _record(self, entry: Dict[str, Any], request: Dict[str, Any], at: Optional[float], latency: Optional[float]):
+        """Aggregate one response entry (every request that completed)"""
+        path = request.get('path') or ''
+        operation = request.get('operation') or ''
+        auth = entry.get('auth') or {}
+        error = bool(entry.get('error'))
+        read = operation in READ_OPERATIONS
+
+        duplicate = False
+        if read and not error and at is not None:
+            key = (request.get('client_token') or auth.get('client_token') or '', path)
+            recent = self._recent_reads
+            previous = recent.pop(key, None)
+            duplicate = previous is not None and at - previous <= self.duplicate_window
+            recent[key] = at
+            if len(recent) > self.duplicate_capacity:
+                recent.popitem(last=False)
+
+        mount = request.get('mount_point') or (path.split('/', 1)[0] + '/')
+        auth_method = _auth_method(path, auth)
+        policies = auth.get('policies') or auth.get('token_policies') or ()
+        if path not in self.paths and len(self.paths) >= self.max_paths:
+            path = OTHER
+
+        sample = (error, read, duplicate, latency)
+        self.total.add(*sample)
+        for table, key in (
+            (self.paths, path),
+            (self.mounts, mount),
+            (self.auth_methods, auth_method),
+            (self.operations, operation),
+        ):
+            stats = table.get(key)
+            if stats is None:
+                stats = table[key] = Stats()
+            stats.add(*sample)
+        for policy in policies:
+            stats = self.policies.get(policy)
+            if stats is None:
+                stats = self.policies[policy] = Stats()
+            stats.add(*sample)
+
+    @property
+    def duration(self) -> float:
+        """Seconds between the first and the last audit entry"""
+        if self.first_time is None or self.last_time is None:
+            return 0.0
+        return self.last_time - self.first_time
+
+    def report(self, top: int = 10) -> Dict[str, Any]:
+        """
+        Build the report
+
+        Args:
+            top: Rows per dimension, busiest first (0 for all)
+
+        Returns:
+            Dict with a summary and per-path/mount/auth method/policy/operation rows
+        """
+        duration = self.duration
+
+        def row(key: str, stats: Stats) -> Dict[str, Any]:
+            return {
+                'key': key,
+                'requests': stats.requests,
+                'rate_per_s': stats.requests / duration if duration else None,
+                'error_rate': stats.errors / stats.requests if stats.requests else 0.0,
+                'reads': stats.reads,
+                'duplicate_read_ratio': stats.duplicate_reads / stats.reads if stats.reads else 0.0,
+                'latency_p50_s': stats.percentile(50),
+                'latency_p95_s': stats.percentile(95),
+                'latency_p99_s': stats.percentile(99),
+            }
+
+        def rows(table: Dict[str, Stats]) -> List[Dict[str, Any]]:
+            ranked = sorted(table.items(), key=lambda item: item[1].requests, reverse=True)
+            return [row(key, stats) for key, stats in (ranked[:top] if top else ranked)]
+
+        return {
+            'summary': {
+                **row('total', self.total),
+                'lines': self.lines,
+                'malformed_lines': self.malformed,
+                'unpaired_responses': self.unpaired_responses,
+                'unanswered_requests': len(self._pending) + self.dropped_requests,
+                'duration_s': duration,
+            },
+            'paths': rows(self.paths),
+            'mounts': rows(self.mounts),
+            'auth_methods': rows(self.auth_methods),
+            'policies': rows(self.policies),
+            'operations': rows(self.operations),
+        }
+
+
+def iter_lines(source: str) -> Iterator[bytes]:
+    """
+    Yield the lines of an audit log
+
+    Args:
+        source: File path to memory-map, or '-' to stream stdin
+    """
+    if source == '-':
+        yield from sys.stdin.buffer
+        return
+    with open(source, 'rb') as f:
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be mapped
+            return
+        with mapped:
+            yield from iter(mapped.readline, b'')
+
+
+def _ms(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return '-'
+    if seconds == float('inf'):
+        return f">{LATENCY_BUCKETS[-1] * 1000:.0f}"
+    return f"{seconds * 1000:g}"
+
+
+def print_report(report: Dict[str, Any], out: TextIO = sys.stdout):
+    """Print a report as aligned text tables"""
+    summary = report['summary']
+    rate = summary['rate_per_s']
+    print(f"Lines: {summary['lines']}  malformed: {summary['malformed_lines']}  "
+          f"duration: {summary['duration_s']:.1f}s", file=out)
+    print(f"Requests: {summary['requests']}  rate: {rate:.2f}/s  " if rate is not None
+          else f"Requests: {summary['requests']}  ", end='', file=out)
+    print(f"error rate: {summary['error_rate']:.1%}  "
+          f"duplicate reads: {summary['duplicate_read_ratio']:.1%}  "
+          f"p50/p95/p99 ms: {_ms(summary['latency_p50_s'])}/{_ms(summary['latency_p95_s'])}/"
+          f"{_ms(summary['latency_p99_s'])}", file=out)
+    print(f"Unpaired responses: {summary['unpaired_responses']}  "
+          f"unanswered requests: {summary['unanswered_requests']}", file=out)
+
+    for title, key in (('Path', 'paths'), ('Mount', 'mounts'), ('Auth method', 'auth_methods'),
+                       ('Policy', 'policies'), ('Operation', 'operations')):
+        if not report[key]:
+            continue
+        width = max(len(title), *(len(r['key']) for r in report[key]))
+        header = (f"{title:<{width}} {'requests':>9} {'req/s':>8} {'errors':>7} "
+                  f"{'dup reads':>9} {'p50 ms':>7} {'p95 ms':>7} {'p99 ms':>7}")
+        print(f"\n{header}\n{'-' * len(header)}", file=out)
+        for r in report[key]:
+            req_rate = f"{r['rate_per_s']:.2f}" if r['rate_per_s'] is not None else '-'
+            dup = f"{r['duplicate_read_ratio']:.1%}" if r['reads'] else '-'
+            print(f"{r['key']:<{width}} {r['requests']:>9} {req_rate:>8} {r['error_rate']:>7.1%} "
+                  f"{dup:>9} {_ms(r['latency_p50_s']):>7} {_ms(r['latency_p95_s']):>7} "
+                  f"{_ms(r['latency_p99_s']):>7}", file=out)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze Vault audit logs for hot paths and latency")
+    parser.add_argument('sources', nargs='*', default=['-'], help="audit log files, or - for stdin")
+    parser.add_argument('--top', type=int, default=10, help="rows per table (0 for all)")
+    parser.add_argument('--json', action='store_true', help="print the report as JSON")
+    parser.add_argument('--duplicate-window', type=float, default=60.0,
+                        help="seconds within which a repeated read by the same token is a duplicate")
+    parser.add_argument('--max-pending', type=int, default=100_000,
+                        help="requests awaiting a response before the oldest is dropped")
+    parser.add_argument('--max-paths', type=int, default=50_000,
+                        help="distinct paths tracked before folding into (other)")
+    args = parser.parse_args()
+
+    analyzer = AuditAnalyzer(
+        max_pending=args.max_pending,
+        max_paths=args.max_paths,
+        duplicate_window=args.duplicate_window,
+    )
+    started = time.perf_counter()
+    try:
+        for source in args.sources:
+            analyzer.feed(iter_lines(source))
+    except KeyboardInterrupt:
+        pass
+    elapsed = time.perf_counter() - started
+
+    report = analyzer.report(top=args.top)
+    if args.json:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        print_report(report)
+    print(f"\nProcessed {analyzer.lines} lines in {elapsed:.2f}s "
+          f"({analyzer.lines / elapsed if elapsed else 0:.0f} lines/s)", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
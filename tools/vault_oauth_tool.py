@@ -1,21 +1,44 @@
 # test_tool.py
 from ibm_watsonx_orchestrate.agent_builder.tools import tool, ToolPermission
-from ibm_watsonx_orchestrate.run import connections
 from ibm_watsonx_orchestrate.agent_builder.connections import (
     ConnectionType,
     ExpectedCredentials,
 )
-import hvac
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
 import logging
-from hvac.exceptions import VaultError
-from typing import Optional, Dict, Any
+from typing import TYPE_CHECKING, Optional, Dict, Any, Tuple
 
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
-)
+if TYPE_CHECKING:
+    import hvac
+    import jwt
+
+# Logging is configured by the Orchestrate runtime, not on import.
+logger = logging.getLogger(__name__)
+
+VAULT_ADDR = os.getenv("VAULT_ADDR", "http://VAULT_IP:8200")
+# JWT auth role and mount defined in adk/vault_watsonx/jwt.tf
+VAULT_JWT_ROLE = os.getenv("VAULT_JWT_ROLE", "default")
+VAULT_JWT_MOUNT = os.getenv("VAULT_JWT_MOUNT", "jwt")
+# Expected audience (the role's bound_audiences) and the IdP JWKS endpoint
+# used to pre-validate access tokens locally.
+VAULT_JWT_AUDIENCE = os.getenv("VAULT_JWT_AUDIENCE", "")
+VAULT_JWT_JWKS_URL = os.getenv("VAULT_JWT_JWKS_URL", "")
+VAULT_JWT_CACHE_SIZE = int(os.getenv("VAULT_JWT_CACHE_SIZE", "1024"))
+# Seconds before expiry at which a cached Vault token is no longer handed out.
+VAULT_TOKEN_EXPIRY_MARGIN = float(os.getenv("VAULT_TOKEN_EXPIRY_MARGIN", "30"))
+JWT_ALGORITHMS = ["RS256", "RS384", "RS512", "ES256", "ES384", "PS256"]
 
+# sha256(access token) -> (vault token, expires_at), least recently used first
+_jwt_token_cache: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+_jwt_token_cache_lock = threading.Lock()
+_jwks_client: Optional["jwt.PyJWKClient"] = None
 
-def initialize_client() -> Optional[hvac.Client]:
+
+def initialize_client() -> Optional["hvac.Client"]:
     """
     Sets up and initializes a thread-safe Vault client using HVAC.
 
@@ -25,18 +48,20 @@ def initialize_client() -> Optional[hvac.Client]:
     Returns:
         An initialized hvac.Client instance, or None if the configuration is missing.
     """
+    # Imported on first use so that loading the tool module stays cheap
+    import hvac
 
     try:
-        client = hvac.Client(url="http://VAULT_IP:8200")
-        logging.info("HVAC client initialized successfully.")
+        client = hvac.Client(url=VAULT_ADDR)
+        logger.info("HVAC client initialized successfully.")
         return client
     except Exception as e:
-        logging.error(f"Failed to initialize HVAC client: {e}")
+        logger.error("Failed to initialize HVAC client: %s", e)
         return None
 
 
 def authenticate_approle(
-    client: hvac.Client, role_id: str, secret_id: str
+    client: "hvac.Client", role_id: str, secret_id: str
 ) -> Optional[Dict[str, Any]]:
     """
     Authenticates to Vault using AppRole.
@@ -49,8 +74,10 @@ def authenticate_approle(
     Returns:
         The client token if authentication is successful, None otherwise.
     """
+    from hvac.exceptions import VaultError
+
     try:
-        logging.info("Authenticating to Vault using AppRole...")
+        logger.info("Authenticating to Vault using AppRole...")
         response = client.auth.approle.login(
             role_id=role_id,
             secret_id=secret_id,
@@ -58,15 +85,133 @@ def authenticate_approle(
         return response
 
     except VaultError as e:
-        logging.error(f"Vault error during AppRole authentication: {e}")
+        logger.error("Vault error during AppRole authentication: %s", e)
         return None
     except Exception as e:
-        logging.error(
-            f"An unexpected error occurred during AppRole authentication: {e}"
+        logger.error(
+            "An unexpected error occurred during AppRole authentication: %s", e
         )
         return None
 
 
+def validate_jwt(token: str) -> Dict[str, Any]:
+    """
+    Validates an access token locally before it is sent to Vault.
+
+    Expiry is always checked, and so is the audience when
+    VAULT_JWT_AUDIENCE is set. When VAULT_JWT_JWKS_URL is set the signature
+    is verified too, against signing keys fetched once and cached by
+    PyJWKClient, so only an unknown key id costs a network round trip.
+
+    Args:
+        token: The encoded JWT.
+
+    Returns:
+        The decoded claims.
+
+    Raises:
+        jwt.InvalidTokenError: If the token is expired, malformed, issued for
+            another audience or not signed by the identity provider.
+    """
+    import jwt
+
+    global _jwks_client
+    # PyJWT skips every claim check unless asked when the signature is not
+    # verified, so each check is requested explicitly.
+    options = {
+        "verify_signature": bool(VAULT_JWT_JWKS_URL),
+        "verify_exp": True,
+        "verify_aud": bool(VAULT_JWT_AUDIENCE),
+        "require": ["exp", "sub"],
+    }
+    if not VAULT_JWT_JWKS_URL:
+        return jwt.decode(
+            token,
+            options=options,
+            audience=VAULT_JWT_AUDIENCE or None,
+            algorithms=JWT_ALGORITHMS,
+        )
+
+    if _jwks_client is None:
+        _jwks_client = jwt.PyJWKClient(VAULT_JWT_JWKS_URL, cache_keys=True)
+    signing_key = _jwks_client.get_signing_key_from_jwt(token)
+    return jwt.decode(
+        token,
+        signing_key.key,
+        algorithms=JWT_ALGORITHMS,
+        audience=VAULT_JWT_AUDIENCE or None,
+        options=options,
+    )
+
+
+def get_jwt_token(client: "hvac.Client", access_token: str) -> Optional[str]:
+    """
+    Returns a Vault token for the user behind an access token.
+
+    The token is pre-validated locally, so expired tokens never reach Vault,
+    then looked up in a bounded LRU cache keyed by a hash of the whole token.
+    On a miss a JWT login is made against VAULT_JWT_ROLE and the Vault token
+    is cached until the earlier of the JWT expiry and the Vault token TTL.
+    Only a token Vault has already accepted is cached, so an entry can only
+    be hit by presenting that exact token again.
+
+    Args:
+        client: The hvac.Client instance.
+        access_token: The user's OAuth access token.
+
+    Returns:
+        The Vault client token, or None if validation or login failed.
+    """
+    import jwt
+    from hvac.exceptions import VaultError
+
+    try:
+        claims = validate_jwt(access_token)
+    except jwt.InvalidTokenError as e:
+        logger.error("Rejected access token: %s", e)
+        return None
+
+    # Keyed by the whole token, so a cached Vault token is only handed to
+    # a caller presenting the exact JWT that Vault accepted.
+    key = hashlib.sha256(access_token.encode()).hexdigest()
+
+    now = time.time()
+    with _jwt_token_cache_lock:
+        cached = _jwt_token_cache.get(key)
+        if cached and cached[1] > now:
+            _jwt_token_cache.move_to_end(key)
+            client.token = cached[0]
+            return cached[0]
+
+    try:
+        logger.info("Authenticating to Vault using JWT...")
+        response = client.auth.jwt.jwt_login(
+            role=VAULT_JWT_ROLE, jwt=access_token, path=VAULT_JWT_MOUNT
+        )
+    except VaultError as e:
+        logger.error("Vault error during JWT authentication: %s", e)
+        return None
+    except Exception as e:
+        logger.error("An unexpected error occurred during JWT authentication: %s", e)
+        return None
+
+    token = response["auth"]["client_token"]
+    expires_at = claims["exp"]
+    lease_duration = response["auth"].get("lease_duration") or 0
+    if lease_duration > 0:
+        expires_at = min(expires_at, now + lease_duration)
+    expires_at -= VAULT_TOKEN_EXPIRY_MARGIN
+    client.token = token
+    if expires_at <= now:
+        return token
+    with _jwt_token_cache_lock:
+        _jwt_token_cache[key] = (token, expires_at)
+        _jwt_token_cache.move_to_end(key)
+        while len(_jwt_token_cache) > VAULT_JWT_CACHE_SIZE:
+            _jwt_token_cache.popitem(last=False)
+    return token
+
+
 @tool(
     name="vault_oauth_tool",
     description="Interact with Vault to fetch secrets.",
@@ -82,17 +227,19 @@ def vault_oauth_tool() -> str:
     This is a tool to interact with Vault to fetch secrets.
     :returns: message.
     """
+    from ibm_watsonx_orchestrate.run import connections
+
     conn = connections.oauth2_client_creds("client_creds")
     access_token = conn.access_token
 
-    # response = authenticate_approle(client, role_id, secret_id)
-    # client_token = response["auth"]["client_token"]
-
-    # if client_token:
-    #     # Now that we are authenticated, we can perform other vault operations.
-    #     # For now, just returning a success message.
-    #     return f"Client: {client_token}"
-    # else:
-    #     return "Error: Failed to authenticate to Vault with AppRole."
-    # return f"Role ID: {role_id}, Secret ID: {secret_id}"
-    return f"Message: {access_token}"
+    client = initialize_client()
+    if not client:
+        return "Error: Failed to initialize HVAC client."
+
+    client_token = get_jwt_token(client, access_token)
+    if client_token:
+        # Now that we are authenticated, we can perform other vault operations.
+        # For now, just returning a success message.
+        return f"Client: {client_token}"
+    else:
+        return "Error: Failed to authenticate to Vault with JWT."
@@ -1,42 +1,227 @@
 # test_tool.py
 from ibm_watsonx_orchestrate.agent_builder.tools import tool, ToolPermission
-from ibm_watsonx_orchestrate.run import connections
 from ibm_watsonx_orchestrate.agent_builder.connections import (
     ConnectionType,
     ExpectedCredentials,
 )
-import hvac
+import hashlib
+import os
+import threading
+import time
 import logging
-from hvac.exceptions import VaultError
-from typing import Optional, Dict, Any
+from typing import TYPE_CHECKING, Optional, Dict, Any, Callable, Tuple
+
+# hvac, requests and vault_transport (shipped next to this file; import the
+# tool with tools/ as its package root: orchestrate tools import -k python
+# -f vault_tool.py -p .) are imported on first use, so loading the tool
+# module stays cheap.
+if TYPE_CHECKING:
+    import hvac
+    import requests
+    from vault_transport import AdaptiveLimiter, SingleFlight
+
+# Logging is configured by the Orchestrate runtime, not on import.
+logger = logging.getLogger(__name__)
+
+# An HTTP(S) address, a comma-separated list of cluster node addresses, or
+# unix:///path for a local vault_proxy.py socket.
+VAULT_ADDR = os.getenv("VAULT_ADDR", "http://VAULT_IP:8200")
+VAULT_ADDRS = [address.strip() for address in VAULT_ADDR.split(",") if address.strip()]
+# Seconds between sys/health checks of the cluster nodes.
+VAULT_HEALTH_INTERVAL = float(os.getenv("VAULT_HEALTH_INTERVAL", "5"))
+VAULT_POOL_SIZE = int(os.getenv("VAULT_POOL_SIZE", "10"))
+# Seconds before lease expiry at which a cached token is no longer handed out.
+VAULT_TOKEN_EXPIRY_MARGIN = float(os.getenv("VAULT_TOKEN_EXPIRY_MARGIN", "30"))
+# Time budget in seconds for all Vault calls made by one tool invocation.
+VAULT_CALL_TIMEOUT = float(os.getenv("VAULT_CALL_TIMEOUT", "10"))
+# Retries of transient failures; off by default, but several VAULT_ADDR
+# nodes are still each tried once.
+VAULT_MAX_RETRIES = int(os.getenv("VAULT_MAX_RETRIES", "0"))
+# Consecutive failures that open an endpoint's circuit, and how long it stays open.
+VAULT_BREAKER_THRESHOLD = int(os.getenv("VAULT_BREAKER_THRESHOLD", "5"))
+VAULT_BREAKER_RESET = float(os.getenv("VAULT_BREAKER_RESET", "30"))
+# Whether requests are admitted through an adaptive limiter that backs off
+# on rate-limit responses; off by default, as for VaultAppRoleAuth.
+VAULT_ADAPTIVE_LIMIT = os.getenv("VAULT_ADAPTIVE_LIMIT", "false").lower() == "true"
+# Initial and maximum number of Vault requests in flight under the adaptive
+# limit, and how long a request may wait for a slot.
+VAULT_CONCURRENCY_LIMIT = float(os.getenv("VAULT_CONCURRENCY_LIMIT", str(max(2 * VAULT_POOL_SIZE, 16))))
+VAULT_MAX_CONCURRENCY_LIMIT = float(os.getenv("VAULT_MAX_CONCURRENCY_LIMIT", "256"))
+VAULT_QUEUE_TIMEOUT = float(os.getenv("VAULT_QUEUE_TIMEOUT", "5"))
+
+# Process-wide HTTP session shared by every client so keep-alive connections
+# to Vault are reused across tool invocations.
+_session: Optional["requests.Session"] = None
+_session_lock = threading.Lock()
+
+# role_id -> (secret_id digest, client_token, expires_at or None)
+_token_cache: Dict[str, Tuple[str, str, Optional[float]]] = {}
+_token_cache_lock = threading.Lock()
+
+# Coalesces concurrent identical logins; created on first use.
+_single_flight: Optional["SingleFlight"] = None
+
+# Optional metrics exporter, called as callback(kind, name, value, labels)
+# where kind is "histogram" (value in seconds) or "counter".
+_metrics_callback: Optional[Callable[[str, str, float, Dict[str, str]], None]] = None
+
+
+def set_metrics_callback(
+    callback: Optional[Callable[[str, str, float, Dict[str, str]], None]]
+) -> None:
+    """
+    Installs (or removes, with None) the metrics exporter for Vault calls.
+
+    Login durations are reported as "histogram" observations labelled with
+    mount and outcome; token cache hits and misses as "counter" events.
+    Nothing is timed while no callback is installed.
+    """
+    global _metrics_callback
+    _metrics_callback = callback
+
+
+# Shared by every request of the process, so all tool invocations back off
+# together; created on first use when VAULT_ADAPTIVE_LIMIT is set.
+_limiter: Optional["AdaptiveLimiter"] = None
+
+
+def _get_limiter() -> Optional["AdaptiveLimiter"]:
+    """
+    Returns the process-wide adaptive limiter, creating it on first use, or
+    None when VAULT_ADAPTIVE_LIMIT is off.
+    """
+    global _limiter
+    if not VAULT_ADAPTIVE_LIMIT:
+        return None
+    if _limiter is None:
+        from vault_transport import AdaptiveLimiter
+
+        with _session_lock:
+            if _limiter is None:
+                _limiter = AdaptiveLimiter(
+                    initial_limit=VAULT_CONCURRENCY_LIMIT,
+                    max_limit=VAULT_MAX_CONCURRENCY_LIMIT,
+                    max_wait=VAULT_QUEUE_TIMEOUT,
+                )
+    return _limiter
+
+
+def _get_single_flight() -> "SingleFlight":
+    """Returns the process-wide SingleFlight, creating it on first use."""
+    global _single_flight
+    if _single_flight is None:
+        from vault_transport import SingleFlight
+
+        with _session_lock:
+            if _single_flight is None:
+                _single_flight = SingleFlight()
+    return _single_flight
+
+
+def get_limiter_stats() -> Optional[Dict[str, int]]:
+    """
+    Returns the adaptive concurrency limit, requests in flight, queue depth
+    and throttled/rejected request counts, or None when the limiter is off.
+    """
+    limiter = _get_limiter()
+    return limiter.stats() if limiter else None
 
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
-)
 
+def _count_retry(method: str, url: str) -> None:
+    """Reports a retried Vault request to the metrics exporter."""
+    if _metrics_callback:
+        _metrics_callback("counter", "retries", 1, {"method": method})
 
-def initialize_client() -> Optional[hvac.Client]:
+
+def _get_session() -> "requests.Session":
+    """
+    Returns the shared requests session, creating it on first use.
+
+    The session mounts an HTTPAdapter sized by VAULT_POOL_SIZE so that
+    concurrent tool invocations reuse pooled keep-alive connections, and
+    applies deadlines, retries and circuit breaking (see
+    vault_transport.ResilientSession). With several VAULT_ADDR nodes every
+    attempt is routed by a health-checked VaultCluster.
+    """
+    global _session
+    if _session is None:
+        from requests.adapters import HTTPAdapter
+        from vault_transport import (
+            ClusterSession,
+            ResilientSession,
+            VaultCluster,
+            unix_socket_client_url,
+        )
+
+        limiter = _get_limiter()
+        with _session_lock:
+            if _session is None:
+                options = dict(
+                    max_retries=VAULT_MAX_RETRIES,
+                    failure_threshold=VAULT_BREAKER_THRESHOLD,
+                    reset_timeout=VAULT_BREAKER_RESET,
+                    on_retry=_count_retry,
+                    limiter=limiter,
+                )
+                if len(VAULT_ADDRS) > 1:
+                    cluster = VaultCluster(VAULT_ADDRS, health_interval=VAULT_HEALTH_INTERVAL)
+                    cluster.start()
+                    options["max_retries"] = max(VAULT_MAX_RETRIES, len(cluster.nodes))
+                    session = ClusterSession(cluster, **options)
+                else:
+                    session = ResilientSession(**options)
+                adapter = HTTPAdapter(
+                    pool_connections=VAULT_POOL_SIZE, pool_maxsize=VAULT_POOL_SIZE
+                )
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                unix_socket_client_url(VAULT_ADDR, session, VAULT_POOL_SIZE)
+                _session = session
+    return _session
+
+
+def _outcome_for(error: Exception) -> str:
+    """Maps a Vault exception to the outcome label used in metrics."""
+    from hvac.exceptions import Forbidden, InvalidPath, RateLimitExceeded
+
+    if isinstance(error, InvalidPath):
+        return "not_found"
+    if isinstance(error, Forbidden):
+        return "forbidden"
+    if isinstance(error, RateLimitExceeded):
+        return "rate_limited"
+    return "error"
+
+
+def initialize_client() -> Optional["hvac.Client"]:
     """
     Sets up and initializes a thread-safe Vault client using HVAC.
 
-    The Vault address is read from the VAULT_ADDR environment variable.
-    This function should be called per request to ensure thread safety.
+    The Vault address is read from the VAULT_ADDR environment variable; when
+    it lists several cluster nodes, requests are routed by VaultCluster.
+    This function should be called per request to ensure thread safety;
+    the returned client is cheap to build because it shares the
+    process-wide connection pool.
 
     Returns:
         An initialized hvac.Client instance, or None if the configuration is missing.
     """
+    # Imported on first use so that loading the tool module stays cheap
+    import hvac
+    from vault_transport import UNIX_SOCKET_URL
 
     try:
-        client = hvac.Client(url="http://VAULT_IP:8200")
-        logging.info("HVAC client initialized successfully.")
+        url = UNIX_SOCKET_URL if VAULT_ADDR.startswith("unix://") else VAULT_ADDRS[0]
+        client = hvac.Client(url=url, session=_get_session())
+        logger.info("HVAC client initialized successfully.")
         return client
     except Exception as e:
-        logging.error(f"Failed to initialize HVAC client: {e}")
+        logger.error("Failed to initialize HVAC client: %s", e)
         return None
 
 
 def authenticate_approle(
-    client: hvac.Client, role_id: str, secret_id: str
+    client: "hvac.Client", role_id: str, secret_id: str
 ) -> Optional[Dict[str, Any]]:
     """
     Authenticates to Vault using AppRole.
@@ -49,8 +234,13 @@ def authenticate_approle(
     Returns:
         The client token if authentication is successful, None otherwise.
     """
+    from hvac.exceptions import VaultError
+
+    callback = _metrics_callback
+    start = time.perf_counter() if callback else 0.0
+    outcome = "ok"
     try:
-        logging.info("Authenticating to Vault using AppRole...")
+        logger.info("Authenticating to Vault using AppRole...")
         response = client.auth.approle.login(
             role_id=role_id,
             secret_id=secret_id,
@@ -58,13 +248,76 @@ def authenticate_approle(
         return response
 
     except VaultError as e:
-        logging.error(f"Vault error during AppRole authentication: {e}")
+        outcome = _outcome_for(e)
+        logger.error("Vault error during AppRole authentication: %s", e)
         return None
     except Exception as e:
-        logging.error(
-            f"An unexpected error occurred during AppRole authentication: {e}"
+        outcome = "error"
+        logger.error(
+            "An unexpected error occurred during AppRole authentication: %s", e
         )
         return None
+    finally:
+        if callback:
+            callback(
+                "histogram",
+                "login",
+                time.perf_counter() - start,
+                {"mount": "approle", "outcome": outcome},
+            )
+
+
+def get_approle_token(
+    client: "hvac.Client", role_id: str, secret_id: str
+) -> Optional[str]:
+    """
+    Returns a Vault token for the AppRole, reusing a cached one when possible.
+
+    Tokens are cached per role_id until VAULT_TOKEN_EXPIRY_MARGIN seconds
+    before their lease expires, so steady-state calls never hit
+    auth/approle/login. A cached token is only reused when it was obtained
+    with the same secret_id, and concurrent cache misses for the same role
+    share a single login.
+
+    Args:
+        client: The hvac.Client instance.
+        role_id: The AppRole role_id.
+        secret_id: The AppRole secret_id.
+
+    Returns:
+        The client token, or None if authentication failed.
+    """
+    digest = hashlib.sha256(secret_id.encode()).hexdigest()
+    with _token_cache_lock:
+        cached = _token_cache.get(role_id)
+    if cached:
+        cached_digest, token, expires_at = cached
+        if cached_digest == digest and (
+            expires_at is None or time.monotonic() < expires_at
+        ):
+            client.token = token
+            if _metrics_callback:
+                _metrics_callback("counter", "cache_hits", 1, {"cache": "token"})
+            return token
+
+    if _metrics_callback:
+        _metrics_callback("counter", "cache_misses", 1, {"cache": "token"})
+    response = _get_single_flight().do(
+        ("login", client.adapter.namespace, "auth/approle/login", role_id, digest),
+        lambda: authenticate_approle(client, role_id, secret_id),
+    )
+    if not response:
+        return None
+
+    token = response["auth"]["client_token"]
+    lease_duration = response["auth"].get("lease_duration") or 0
+    expires_at = None
+    if lease_duration > 0:
+        expires_at = time.monotonic() + lease_duration - VAULT_TOKEN_EXPIRY_MARGIN
+    with _token_cache_lock:
+        _token_cache[role_id] = (digest, token, expires_at)
+    client.token = token
+    return token
 
 
 @tool(
@@ -80,6 +333,9 @@ def message_tool() -> str:
     This is a tool to get user message.
     :returns: message.
     """
+    from ibm_watsonx_orchestrate.run import connections
+    from vault_transport import deadline
+
     kv = connections.key_value("kv_demo")
     role_id = kv["role_id"]
     secret_id = kv["secret_id"]
@@ -91,8 +347,9 @@ def message_tool() -> str:
     if not client:
         return "Error: Failed to initialize HVAC client."
 
-    response = authenticate_approle(client, role_id, secret_id)
-    client_token = response["auth"]["client_token"]
+    # Every Vault call below shares this invocation's time budget
+    with deadline(VAULT_CALL_TIMEOUT):
+        client_token = get_approle_token(client, role_id, secret_id)
 
     if client_token:
         # Now that we are authenticated, we can perform other vault operations.
@@ -0,0 +1,795 @@
+#!/usr/bin/env python3
+"""
+HTTP transport for Vault clients: coalescing, deadlines, retries, circuit
+breaking, cluster routing and unix sockets
+
+Shared by tools/vault_tool.py and the VaultAppRoleAuth demo in
+adk/vault_watsonx/test, so both get the same behaviour from one copy.
+
+SingleFlight coalesces concurrent identical operations (e.g. the same
+AppRole login) into one upstream request.
+
+ResilientSession is a drop-in requests.Session for hvac.Client that:
+- caps every request's timeout by the caller's remaining deadline, set with
+  the deadline() context manager and propagated through contextvars
+- retries transient failures with jittered exponential backoff, but only
+  when the request is idempotent (GET/LIST/HEAD), was rate limited, or
+  never reached Vault (connection refused / connect timeout)
+- keeps a circuit breaker per Vault endpoint that fails fast while open
+- optionally admits requests through an AdaptiveLimiter, which adapts the
+  number of requests in flight to Vault's rate-limit quotas (AIMD) and
+  queues callers in arrival order
+
+Errors are raised as requests exceptions, so existing handling of
+connection failures keeps working.
+
+VaultCluster polls sys/health on every node of a cluster, and
+ClusterSession, a ResilientSession, routes every request attempt:
+- KV reads (GET/LIST outside auth/ and sys/) go to the healthy performance
+  standby or active node with the fewest outstanding requests
+- writes, logins and other API calls go to the active node, or to any
+  healthy node when the active one is unknown (standbys forward to it)
+A node that fails a request is taken out of rotation until its next
+successful health check, and the retry goes to another node.
+
+UnixSocketAdapter sends requests to a unix socket, e.g. the one of a local
+vault_proxy.py.
+"""
+
+import random
+import socket
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Deque, Dict, Hashable, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3 import HTTPConnectionPool
+from urllib3.connection import HTTPConnection
+from urllib3.exceptions import NewConnectionError
+
+# HTTP methods that are safe to send twice
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'LIST', 'OPTIONS'})
+
+# Statuses worth retrying for idempotent requests
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# Statuses meaning the request was rejected before it was handled, so any
+# method may be retried; rate-limit quotas reject a request up front
+UNHANDLED_STATUSES = frozenset({429})
+
+# Statuses that count against the health of the endpoint
+FAILURE_STATUSES = frozenset({500, 502, 503, 504})
+
+# Statuses meaning Vault is shedding load, which shrink the adaptive limit
+THROTTLE_STATUSES = frozenset({429, 503})
+
+# Base URL given to hvac for a unix socket address (see unix_socket_client_url())
+UNIX_SOCKET_URL = 'http://vault-proxy'
+
+_deadline: ContextVar[Optional[float]] = ContextVar('vault_deadline', default=None)
+
+
+class SingleFlight:
+    """Coalesces concurrent identical operations into one execution"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+        self.executed = 0
+        self.coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """
+        Run fn once for all concurrent callers using the same key
+
+        Args:
+            key: Operation key, e.g. ('read', namespace, path, role_id)
+            fn: Callable performing the upstream request
+
+        Returns:
+            The result of fn, shared by every caller that joined the flight
+
+        Raises:
+            Whatever fn raised, re-raised in every caller that joined the flight
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                call = Future()
+                self._calls[key] = call
+                self.executed += 1
+                leader = True
+
+        if not leader:
+            return call.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            call.set_exception(e)
+            raise
+        else:
+            call.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    def stats(self) -> Dict[str, int]:
+        """Return how many operations were executed and how many calls were coalesced"""
+        with self._lock:
+            return {
+                'executed': self.executed,
+                'coalesced': self.coalesced,
+                'in_flight': len(self._calls),
+            }
+
+
+class DeadlineExceeded(requests.exceptions.Timeout):
+    """The caller's deadline expired before the Vault call could complete"""
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """The circuit breaker for a Vault endpoint is open"""
+
+
+class QueueTimeout(requests.exceptions.Timeout):
+    """A request waited too long for a slot under the adaptive concurrency limit"""
+
+
+@contextmanager
+def deadline(seconds: float) -> Iterator[float]:
+    """
+    Bound every Vault call made in this context to a shared time budget
+
+    Nested deadlines never extend an outer one.
+
+    Args:
+        seconds: Time budget in seconds
+
+    Yields:
+        The absolute deadline (time.monotonic() based)
+    """
+    at = time.monotonic() + seconds
+    outer = _deadline.get()
+    if outer is not None:
+        at = min(at, outer)
+    token = _deadline.set(at)
+    try:
+        yield at
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Return the seconds left before the current deadline, or None without one"""
+    at = _deadline.get()
+    return None if at is None else at - time.monotonic()
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given in seconds (HTTP dates are ignored)"""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        return None
+
+
+def _never_sent(error: Exception) -> bool:
+    """Whether a transport error happened before the request reached Vault"""
+    if isinstance(error, (requests.exceptions.ConnectTimeout, CircuitOpenError)):
+        return True
+    cause = error.args[0] if error.args else None
+    reason = getattr(cause, 'reason', None)
+    return isinstance(reason, NewConnectionError)
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a half-open probe"""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30):
+        """
+        Initialize the breaker
+
+        Args:
+            failure_threshold: Consecutive failures that open the circuit
+            reset_timeout: Seconds the circuit stays open before a probe is allowed
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Return whether a request may be sent now"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    return False
+                self.state = self.HALF_OPEN
+                self._probing = False
+            # Half-open: let exactly one probe through
+            if self._probing:
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self):
+        """Close the circuit after a successful request"""
+        with self._lock:
+            self.state = self.CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def release(self):
+        """Give back a half-open probe whose request ended without an outcome"""
+        with self._lock:
+            self._probing = False
+
+    def is_open(self) -> bool:
+        """Whether requests are currently rejected (without consuming a half-open probe)"""
+        with self._lock:
+            return self.state == self.OPEN and time.monotonic() - self._opened_at < self.reset_timeout
+    
+    def record_failure(self):
+        """Count a failure, opening the circuit at the threshold or on a failed probe"""
+        with self._lock:
+            self._failures += 1
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._probing = False
+
+
+class AdaptiveLimiter:
+    """
+    AIMD limit on the number of Vault requests in flight
+
+    Every response that is not throttled raises the limit by 1/limit (about
+    one per round trip while the limit is in use). A 429 or 503 halves it,
+    once per congestion event: requests that started before the last
+    decrease do not decrease it again. A Retry-After header also stops
+    admissions until it has passed. Callers over the limit wait in arrival
+    order for at most max_wait seconds (or their deadline).
+    """
+
+    def __init__(
+        self,
+        initial_limit: float = 16,
+        min_limit: float = 1,
+        max_limit: float = 256,
+        decrease_ratio: float = 0.5,
+        max_wait: float = 5.0
+    ):
+        """
+        Initialize the limiter
+
+        Args:
+            initial_limit: Requests allowed in flight at first
+            min_limit: Lowest limit reached by decreases
+            max_limit: Highest limit reached by increases
+            decrease_ratio: Factor applied to the limit on a throttled response
+            max_wait: Maximum seconds a request waits in the queue
+        """
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.decrease_ratio = decrease_ratio
+        self.max_wait = max_wait
+        self.limit = float(initial_limit)
+        self.inflight = 0
+        self.throttled = 0
+        self.rejected = 0
+        self._queue: Deque[threading.Event] = deque()
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+
+    def _admissible(self) -> bool:
+        """Whether another request may start now; the caller must hold the lock"""
+        return self.inflight < max(int(self.limit), 1) and time.monotonic() >= self._paused_until
+
+    def _dispatch(self):
+        """Admit queued requests in arrival order; the caller must hold the lock"""
+        while self._queue and self._admissible():
+            self.inflight += 1
+            self._queue.popleft().set()
+
+    def acquire(self, timeout: Optional[float] = None) -> float:
+        """
+        Wait for a slot under the limit
+
+        Args:
+            timeout: Maximum seconds to wait (defaults to max_wait)
+
+        Returns:
+            The admission time, to pass to release()
+
+        Raises:
+            QueueTimeout: If no slot became free in time
+        """
+        timeout = self.max_wait if timeout is None else min(timeout, self.max_wait)
+        give_up_at = time.monotonic() + timeout
+        with self._lock:
+            if not self._queue and self._admissible():
+                self.inflight += 1
+                return time.monotonic()
+            waiter = threading.Event()
+            self._queue.append(waiter)
+        while True:
+            now = time.monotonic()
+            # Wake when a Retry-After pause ends, as no release will signal it
+            wait = give_up_at - now
+            if self._paused_until > now:
+                wait = min(wait, self._paused_until - now)
+            if waiter.wait(max(wait, 0)):
+                return time.monotonic()
+            with self._lock:
+                self._dispatch()
+                if waiter.is_set():
+                    return time.monotonic()
+                if time.monotonic() >= give_up_at:
+                    self._queue.remove(waiter)
+                    self.rejected += 1
+                    raise QueueTimeout(
+                        f"No Vault request slot within {timeout:.2f}s "
+                        f"(limit {int(self.limit)}, {len(self._queue)} queued)"
+                    )
+
+    def release(self, admitted: float, throttled: bool = False,
+                retry_after: Optional[float] = None, failed: bool = False):
+        """
+        End a request admitted by acquire() and adapt the limit to its outcome
+
+        Args:
+            admitted: Value returned by acquire()
+            throttled: Vault rejected the request with 429 or 503
+            retry_after: Seconds from the Retry-After header of a throttled response
+            failed: The request failed without a response; the limit is unchanged
+        """
+        with self._lock:
+            self.inflight -= 1
+            now = time.monotonic()
+            if throttled:
+                self.throttled += 1
+                if admitted >= self._last_decrease:
+                    self.limit = max(self.min_limit, self.limit * self.decrease_ratio)
+                    self._last_decrease = now
+                if retry_after:
+                    self._paused_until = max(self._paused_until, now + retry_after)
+            elif not failed and self.inflight + 1 >= int(self.limit) / 2:
+                # Only grow while the limit is actually in use
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            self._dispatch()
+
+    def stats(self) -> Dict[str, float]:
+        """Return the current limit, requests in flight, queue depth and counters"""
+        with self._lock:
+            return {
+                'limit': int(self.limit),
+                'inflight': self.inflight,
+                'queued': len(self._queue),
+                'throttled': self.throttled,
+                'rejected': self.rejected,
+            }
+
+
+class ResilientSession(requests.Session):
+    """
+    requests.Session with deadline propagation, safe retries and circuit breaking
+
+    Subclasses can route each attempt to a different endpoint by overriding
+    _route() and _release() (see ClusterSession).
+    """
+
+    unhandled_statuses = UNHANDLED_STATUSES
+    throttle_statuses = THROTTLE_STATUSES
+
+    def __init__(
+        self,
+        max_retries: int = 3,
+        backoff_base: float = 0.1,
+        backoff_max: float = 2.0,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30,
+        on_retry: Optional[Callable[[str, str], None]] = None,
+        limiter: Optional[AdaptiveLimiter] = None
+    ):
+        """
+        Initialize the session
+
+        Args:
+            max_retries: Maximum retries per request
+            backoff_base: Base delay in seconds for exponential backoff
+            backoff_max: Maximum backoff delay in seconds
+            failure_threshold: Consecutive failures that open an endpoint's circuit
+            reset_timeout: Seconds an open circuit waits before probing
+            on_retry: Optional callback(method, url) invoked before each retry
+            limiter: Optional AdaptiveLimiter every attempt is admitted through
+        """
+        super().__init__()
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.on_retry = on_retry
+        self.limiter = limiter
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._breakers_lock = threading.Lock()
+
+    def breaker_for(self, url: str) -> CircuitBreaker:
+        """Return the circuit breaker for the endpoint (scheme://host:port) of a URL"""
+        parts = urlsplit(url)
+        endpoint = f"{parts.scheme}://{parts.netloc}"
+        with self._breakers_lock:
+            breaker = self._breakers.get(endpoint)
+            if breaker is None:
+                breaker = self._breakers[endpoint] = CircuitBreaker(
+                    self.failure_threshold, self.reset_timeout
+                )
+            return breaker
+
+    def _backoff(self, attempt: int, retry_after: Optional[str]) -> float:
+        """Full-jitter exponential backoff, never shorter than Retry-After"""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        return max(delay, parse_retry_after(retry_after) or 0.0)
+
+    def _route(self, method: str, url: str) -> Tuple[str, Any]:
+        """
+        Choose the URL for one attempt of a request
+        
+        Returns:
+            Tuple of (URL to send to, routing handle passed to _release())
+        """
+        return url, None
+    
+    def _release(self, handle: Any, failed: bool):
+        """Report the outcome of an attempt routed by _route()"""
+    
+    def request(self, method, url, *args, **kwargs):
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+        attempt = 0
+        while True:
+            left = remaining()
+            if left is not None and left <= 0:
+                raise DeadlineExceeded(f"Deadline exceeded before {method} {url}")
+            target, handle = self._route(method, url)
+            admitted = None
+            if self.limiter is not None:
+                try:
+                    admitted = self.limiter.acquire(left)
+                except QueueTimeout:
+                    self._release(handle, False)
+                    raise
+            breaker = self.breaker_for(target)
+            if not breaker.allow():
+                self._release(handle, True)
+                if admitted is not None:
+                    self.limiter.release(admitted, failed=True)
+                raise CircuitOpenError(f"Circuit open for {target}")
+            left = remaining()
+            if left is not None:
+                timeout = kwargs.get('timeout')
+                kwargs['timeout'] = left if timeout is None else min(timeout, left)
+
+            # The probe, routing handle and limiter slot taken above are
+            # settled in the finally block, whatever the request raises
+            retry_after = None
+            response = None
+            outcome = None
+            try:
+                response = super().request(method, target, *args, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                outcome = 'failure'
+                if attempt >= self.max_retries or not (idempotent or _never_sent(e)):
+                    raise
+                failure = e
+            else:
+                status = response.status_code
+                # Rate limiting means Vault is healthy but busy
+                outcome = 'failure' if status in FAILURE_STATUSES else 'success'
+                if status not in RETRY_STATUSES:
+                    return response
+                if attempt >= self.max_retries or not (idempotent or status in self.unhandled_statuses):
+                    return response
+                retry_after = response.headers.get('Retry-After')
+                failure = None
+            finally:
+                if outcome == 'failure':
+                    breaker.record_failure()
+                elif outcome == 'success':
+                    breaker.record_success()
+                else:
+                    breaker.release()
+                self._release(handle, outcome != 'success')
+                if admitted is not None:
+                    if response is None:
+                        self.limiter.release(admitted, failed=True)
+                    else:
+                        throttled = response.status_code in self.throttle_statuses
+                        self.limiter.release(admitted, throttled, parse_retry_after(
+                            response.headers.get('Retry-After')) if throttled else None)
+
+            delay = self._backoff(attempt, retry_after)
+            left = remaining()
+            if left is not None and delay >= left:
+                if failure is not None:
+                    raise failure
+                return response
+            if failure is None:
+                response.close()
+            if self.on_retry:
+                self.on_retry(method.upper(), url)
+            time.sleep(delay)
+            attempt += 1
+
+
+# Roles of cluster nodes
+ACTIVE = 'active'
+PERF_STANDBY = 'perfstandby'
+STANDBY = 'standby'
+UNHEALTHY = 'unhealthy'
+UNKNOWN = 'unknown'
+
+# sys/health status codes (without standbyok/perfstandbyok parameters)
+HEALTH_STATUSES = {200: ACTIVE, 429: STANDBY, 473: PERF_STANDBY}
+
+READ_METHODS = frozenset({'GET', 'LIST', 'HEAD'})
+
+
+class VaultNode:
+    """Health and load of one Vault node"""
+
+    __slots__ = ('address', 'role', 'healthy', 'outstanding')
+
+    def __init__(self, address: str):
+        self.address = address.rstrip('/')
+        self.role = UNKNOWN
+        self.healthy = True
+        self.outstanding = 0
+
+    def __repr__(self):
+        return f"VaultNode({self.address!r}, role={self.role!r}, healthy={self.healthy})"
+
+
+class VaultCluster:
+    """Tracks the health of a set of Vault nodes and picks one per request"""
+
+    def __init__(
+        self,
+        addresses: Iterable[str],
+        health_interval: float = 5.0,
+        health_timeout: float = 2.0,
+        verify: Any = True
+    ):
+        """
+        Initialize the cluster
+
+        Args:
+            addresses: Node addresses (e.g. ['https://vault-0:8200', 'https://vault-1:8200'])
+            health_interval: Seconds between background health checks
+            health_timeout: Timeout in seconds of one sys/health request
+            verify: TLS verification setting for the health checks
+        """
+        self.nodes = [VaultNode(address) for address in addresses]
+        if not self.nodes:
+            raise ValueError("At least one Vault address is required")
+        self.health_interval = health_interval
+        self.health_timeout = health_timeout
+        self.verify = verify
+        self._lock = threading.Lock()
+        self._session = requests.Session()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def parse_addresses(cls, vault_url: str) -> List[str]:
+        """Split a comma-separated list of Vault addresses"""
+        return [address.strip() for address in vault_url.split(',') if address.strip()]
+
+    def _check_node(self, node: VaultNode):
+        try:
+            response = self._session.get(
+                f"{node.address}/v1/sys/health", timeout=self.health_timeout, verify=self.verify
+            )
+            role = HEALTH_STATUSES.get(response.status_code, UNHEALTHY)
+        except requests.exceptions.RequestException:
+            role = UNHEALTHY
+        with self._lock:
+            node.role = role
+            node.healthy = role != UNHEALTHY
+
+    def check_health(self):
+        """Poll sys/health on every node concurrently"""
+        with ThreadPoolExecutor(max_workers=len(self.nodes), thread_name_prefix='vault-health') as executor:
+            list(executor.map(self._check_node, self.nodes))
+
+    def start(self):
+        """Check health now, then keep checking on a background thread"""
+        self.check_health()
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._health_loop, name='vault-health', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background health checks"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def _health_loop(self):
+        while not self._stop.wait(self.health_interval):
+            self.check_health()
+
+    def route(self, method: str, path: str, usable=None) -> VaultNode:
+        """
+        Pick the node for a request and count it as outstanding
+
+        Args:
+            method: HTTP method
+            path: Vault API path without the /v1/ prefix
+            usable: Optional predicate excluding nodes (e.g. with an open circuit)
+
+        Returns:
+            The chosen node; release() must be called when the request ends
+        """
+        read = method.upper() in READ_METHODS and not path.startswith(('auth/', 'sys/'))
+        with self._lock:
+            healthy = [n for n in self.nodes if n.healthy and (usable is None or usable(n))]
+            if read:
+                preferred = [n for n in healthy if n.role in (PERF_STANDBY, ACTIVE)]
+            else:
+                preferred = [n for n in healthy if n.role == ACTIVE]
+            # Unknown roles and plain standbys still forward to the active node
+            candidates = preferred or healthy or self.nodes
+            # Least outstanding requests; ties go to standbys to offload the active node
+            node = min(candidates, key=lambda n: (n.outstanding, n.role == ACTIVE))
+            node.outstanding += 1
+            return node
+
+    def release(self, node: VaultNode, failed: bool = False):
+        """
+        End a request routed to node
+
+        Args:
+            node: Node returned by route()
+            failed: Whether the node failed; it leaves rotation until its next
+                successful health check
+        """
+        with self._lock:
+            node.outstanding -= 1
+            if failed:
+                node.healthy = False
+
+    def status(self) -> List[Tuple[str, str, bool, int]]:
+        """Return (address, role, healthy, outstanding) for every node"""
+        with self._lock:
+            return [(n.address, n.role, n.healthy, n.outstanding) for n in self.nodes]
+
+
+class ClusterSession(ResilientSession):
+    """ResilientSession routing each attempt to a node of a VaultCluster"""
+
+    # Sealed or leaderless nodes reject requests before handling them, so
+    # retrying on another node is safe for writes too
+    unhandled_statuses = frozenset({429, 503})
+    # A 503 comes from a sealed node, not load, so only 429 shrinks the limit
+    throttle_statuses = frozenset({429})
+
+    def __init__(self, cluster: VaultCluster, **kwargs):
+        """
+        Initialize the session
+
+        Args:
+            cluster: Cluster whose nodes requests are spread over
+            **kwargs: ResilientSession options; max_retries should allow at
+                least one attempt per node for transparent failover
+        """
+        kwargs.setdefault('max_retries', max(3, len(cluster.nodes)))
+        super().__init__(**kwargs)
+        self.cluster = cluster
+
+    def _route(self, method: str, url: str) -> Tuple[str, Any]:
+        parts = urlsplit(url)
+        path = parts.path[len('/v1/'):] if parts.path.startswith('/v1/') else parts.path.lstrip('/')
+        node = self.cluster.route(
+            method, path, usable=lambda n: not self.breaker_for(n.address).is_open()
+        )
+        target = node.address + parts.path + (f"?{parts.query}" if parts.query else '')
+        return target, node
+
+    def _release(self, handle: Any, failed: bool):
+        if handle is not None:
+            self.cluster.release(handle, failed)
+
+
+class _UnixConnection(HTTPConnection):
+    """urllib3 connection over a unix socket"""
+
+    def __init__(self, socket_path: str, **kwargs):
+        super().__init__('localhost', **kwargs)
+        self.socket_path = socket_path
+
+    def _new_conn(self) -> socket.socket:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.socket_path)
+        return sock
+
+
+class _UnixConnectionPool(HTTPConnectionPool):
+    """urllib3 connection pool over a unix socket"""
+
+    def __init__(self, socket_path: str, **kwargs):
+        super().__init__('localhost', **kwargs)
+        self.socket_path = socket_path
+
+    def _new_conn(self) -> _UnixConnection:
+        self.num_connections += 1
+        return _UnixConnection(self.socket_path, timeout=self.timeout.connect_timeout)
+
+
+class UnixSocketAdapter(HTTPAdapter):
+    """requests adapter sending every request to a unix socket"""
+
+    def __init__(self, socket_path: str, pool_size: int = 10):
+        """
+        Initialize the adapter
+
+        Args:
+            socket_path: Path of the unix socket
+            pool_size: Maximum pooled connections
+        """
+        super().__init__()
+        self._pool = _UnixConnectionPool(socket_path, maxsize=pool_size)
+
+    def get_connection_with_tls_context(self, request, verify, proxies=None, cert=None):
+        return self._pool
+
+    def get_connection(self, url, proxies=None):
+        return self._pool
+
+    def close(self):
+        super().close()
+        self._pool.close()
+
+
+def unix_socket_client_url(vault_url: str, session: requests.Session, pool_size: int = 10) -> str:
+    """
+    Route a session to a unix socket when vault_url is unix:///path
+
+    Args:
+        vault_url: Vault address, possibly unix:///path/to/socket
+        session: Session to mount the unix socket adapter on
+        pool_size: Maximum pooled connections
+
+    Returns:
+        The URL to give hvac.Client (vault_url unchanged for HTTP addresses)
+    """
+    if not vault_url.startswith('unix://'):
+        return vault_url
+    session.mount(UNIX_SOCKET_URL, UnixSocketAdapter(vault_url[len('unix://'):], pool_size))
+    return UNIX_SOCKET_URL